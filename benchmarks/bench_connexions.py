@@ -0,0 +1,116 @@
+"""
+Benchmark : connexions persistantes (pool) contre une connexion par requête
+
+Simule des encaissements (lecture produit, insertion vente, mise à jour du
+stock, entrée de journal) sur une base temporaire et compare le temps moyen
+par panier avec et sans le pool de DatabaseManager.
+
+Utilisation :
+    python -m benchmarks.bench_connexions --paniers 200 --lignes 5
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+
+def _requete_par_appel(db_path, query, params, lecture=False):
+    """Reproduire l'ancien comportement : connexion ouverte puis fermée à chaque appel"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(query, params)
+        if lecture:
+            return cursor.fetchone()
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def _encaisser_par_appel(db_path, produit_ids, utilisateur_id):
+    for produit_id in produit_ids:
+        produit = _requete_par_appel(db_path, "SELECT * FROM produits WHERE id = ?", (produit_id,), lecture=True)
+        _requete_par_appel(
+            db_path,
+            "INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id) VALUES (?, ?, ?, ?, ?, ?)",
+            (produit_id, 1, produit['prix_vente'], produit['prix_vente'], datetime.now().isoformat(), utilisateur_id)
+        )
+        _requete_par_appel(db_path, "UPDATE produits SET quantite = quantite + ? WHERE id = ?", (-1, produit_id))
+        _requete_par_appel(
+            db_path,
+            "INSERT INTO journal (action, date, utilisateur_id, details) VALUES (?, ?, ?, ?)",
+            ("VENTE", datetime.now().isoformat(), utilisateur_id, "benchmark")
+        )
+
+
+def _encaisser_avec_pool(gestionnaire, produit_ids, utilisateur_id):
+    for produit_id in produit_ids:
+        produit = gestionnaire.fetch_one("SELECT * FROM produits WHERE id = ?", (produit_id,))
+        gestionnaire.execute_query(
+            "INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id) VALUES (?, ?, ?, ?, ?, ?)",
+            (produit_id, 1, produit['prix_vente'], produit['prix_vente'], datetime.now().isoformat(), utilisateur_id)
+        )
+        gestionnaire.execute_query("UPDATE produits SET quantite = quantite + ? WHERE id = ?", (-1, produit_id))
+        # Insertion directe comme ci-dessus : le tampon de log_action fausserait la comparaison
+        gestionnaire.execute_query(
+            "INSERT INTO journal (action, date, utilisateur_id, details) VALUES (?, ?, ?, ?)",
+            ("VENTE", datetime.now().isoformat(), utilisateur_id, "benchmark")
+        )
+
+
+def _preparer_base(gestionnaire, nb_produits):
+    conn = gestionnaire.get_connection()
+    conn.executemany(
+        "INSERT INTO produits (nom, code, prix_achat, prix_vente, quantite, date_creation) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"Produit {i}", f"BEN-{i:06d}", 100, 200, 1_000_000, datetime.now().isoformat()) for i in range(nb_produits)]
+    )
+    conn.commit()
+    return [row['id'] for row in gestionnaire.fetch_all("SELECT id FROM produits")]
+
+
+def executer(nb_paniers, nb_lignes, nb_produits=100):
+    """Lancer le benchmark et retourner les temps moyens par panier (ms)"""
+    from database.db_manager import DatabaseManager
+
+    with tempfile.TemporaryDirectory() as dossier:
+        db_path = os.path.join(dossier, 'bench.db')
+        gestionnaire = DatabaseManager(db_path=db_path)
+        ids = _preparer_base(gestionnaire, nb_produits)
+        utilisateur_id = gestionnaire.fetch_one("SELECT id FROM utilisateurs LIMIT 1")['id']
+        paniers = [[ids[(p * nb_lignes + l) % len(ids)] for l in range(nb_lignes)] for p in range(nb_paniers)]
+
+        resultats = {}
+        debut = time.perf_counter()
+        for panier in paniers:
+            _encaisser_par_appel(db_path, panier, utilisateur_id)
+        resultats['par_appel'] = (time.perf_counter() - debut) * 1000 / nb_paniers
+
+        debut = time.perf_counter()
+        for panier in paniers:
+            _encaisser_avec_pool(gestionnaire, panier, utilisateur_id)
+        resultats['pool'] = (time.perf_counter() - debut) * 1000 / nb_paniers
+
+        gestionnaire.close_all()
+        return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparer le pool de connexions à une connexion par requête")
+    parser.add_argument('--paniers', type=int, default=200, help="Nombre de paniers encaissés")
+    parser.add_argument('--lignes', type=int, default=5, help="Nombre de lignes par panier")
+    args = parser.parse_args()
+
+    resultats = executer(args.paniers, args.lignes)
+    print(f"Paniers: {args.paniers} x {args.lignes} lignes")
+    print(f"Connexion par requête : {resultats['par_appel']:.2f} ms / panier")
+    print(f"Pool de connexions    : {resultats['pool']:.2f} ms / panier")
+    print(f"Gain                  : x{resultats['par_appel'] / resultats['pool']:.2f}")
+
+
+if __name__ == '__main__':
+    # Ne pas créer agib.db dans le dossier de l'application lors de l'import
+    os.environ.setdefault('AGIB_DB_PATH', os.path.join(tempfile.gettempdir(), 'agib_benchmark.db'))
+    main()
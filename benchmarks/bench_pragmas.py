@@ -0,0 +1,98 @@
+"""
+Benchmark : profils PRAGMA de la base (config.DB_PRAGMA_PROFILS)
+
+Pour chaque profil, mesure la latence d'une écriture validée (une vente
+simple) et vérifie si un rapport en cours de lecture bloque la caisse.
+
+Utilisation :
+    python -m benchmarks.bench_pragmas --ecritures 300
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def _percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def _mesurer_profil(profil, nb_ecritures):
+    from database.db_manager import DatabaseManager
+
+    with tempfile.TemporaryDirectory() as dossier:
+        gestionnaire = DatabaseManager(db_path=os.path.join(dossier, 'bench.db'), profil_pragma=profil)
+        produit_id = gestionnaire.execute_query(
+            "INSERT INTO produits (nom, code, prix_achat, prix_vente, quantite, date_creation) VALUES (?, ?, ?, ?, ?, ?)",
+            ("Produit", "BEN-1", 100, 200, 10_000_000, datetime.now().isoformat())
+        )
+        gestionnaire.get_connection().executemany(
+            "INSERT INTO journal (action, date, utilisateur_id, details) VALUES ('BENCH', ?, 1, ?)",
+            [(datetime.now().isoformat(), 'x' * 100) for _ in range(50_000)]
+        )
+        gestionnaire.get_connection().commit()
+
+        # Latence de validation d'une écriture
+        latences = []
+        for _ in range(nb_ecritures):
+            debut = time.perf_counter()
+            gestionnaire.execute_query("UPDATE produits SET quantite = quantite - 1 WHERE id = ?", (produit_id,))
+            latences.append((time.perf_counter() - debut) * 1000)
+
+        # Écriture pendant qu'un rapport garde une transaction de lecture ouverte
+        lecture_ouverte = threading.Event()
+        fin_ecriture = threading.Event()
+
+        def lecteur():
+            conn = sqlite3.connect(gestionnaire.db_path)
+            conn.execute("BEGIN")
+            conn.execute("SELECT COUNT(*) FROM journal").fetchone()
+            lecture_ouverte.set()
+            fin_ecriture.wait(timeout=10)
+            conn.rollback()
+            conn.close()
+
+        thread = threading.Thread(target=lecteur)
+        thread.start()
+        lecture_ouverte.wait()
+        debut = time.perf_counter()
+        try:
+            gestionnaire.execute_query("UPDATE produits SET quantite = quantite - 1 WHERE id = ?", (produit_id,))
+            ecriture_bloquee = None
+        except sqlite3.OperationalError as e:
+            ecriture_bloquee = str(e)
+        attente = (time.perf_counter() - debut) * 1000
+        fin_ecriture.set()
+        thread.join()
+        gestionnaire.close_all()
+
+    return {
+        'moyenne_ms': sum(latences) / len(latences),
+        'p95_ms': _percentile(latences, 95),
+        'ecriture_pendant_lecture_ms': attente,
+        'erreur_pendant_lecture': ecriture_bloquee,
+    }
+
+
+def main():
+    from config import DB_PRAGMA_PROFILS
+
+    parser = argparse.ArgumentParser(description="Comparer les profils PRAGMA SQLite")
+    parser.add_argument('--ecritures', type=int, default=300, help="Nombre d'écritures validées mesurées")
+    args = parser.parse_args()
+
+    for profil in DB_PRAGMA_PROFILS:
+        r = _mesurer_profil(profil, args.ecritures)
+        print(f"[{profil}] validation: moyenne {r['moyenne_ms']:.3f} ms, p95 {r['p95_ms']:.3f} ms")
+        etat = r['erreur_pendant_lecture'] or "non bloquée"
+        print(f"[{profil}] écriture pendant un rapport: {r['ecriture_pendant_lecture_ms']:.1f} ms ({etat})")
+
+
+if __name__ == '__main__':
+    # Ne pas créer agib.db dans le dossier de l'application lors de l'import
+    os.environ.setdefault('AGIB_DB_PATH', os.path.join(tempfile.gettempdir(), 'agib_benchmark.db'))
+    main()
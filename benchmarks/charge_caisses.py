@@ -0,0 +1,266 @@
+"""
+Test de charge : plusieurs caisses encaissant en même temps sur la même base
+
+Lance N caissiers simulés (threads du même processus, ou processus séparés
+comme plusieurs postes de caisse) qui rejouent des paniers réalistes via
+Vente.creer_panier et Vente.creer, avec des réapprovisionnements via
+Achat.creer. Rapporte le débit, les latences d'encaissement (p50, p95, p99),
+les erreurs « database is locked » et vérifie la cohérence du stock à la fin.
+
+Utilisation :
+    python -m benchmarks.charge_caisses --caisses 4 --mode threads --paniers 200
+    python -m benchmarks.charge_caisses --caisses 4 --mode processus --sortie charge.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def _percentile(valeurs, p):
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def _caissier(index, params, depart):
+    """
+    Simuler une caisse : encaisser des paniers et mesurer chaque encaissement
+
+    Args:
+        index (int): Numéro de la caisse (graine aléatoire et vendeur)
+        params (dict): Paramètres du test (paniers, pause_ms, part_achats, graine)
+        depart: Barrière partagée, franchie quand toutes les caisses sont prêtes
+
+    Returns:
+        dict: Latences et compteurs d'erreurs de cette caisse
+    """
+    from database.db_manager import db
+    from models.vente import Vente
+    from models.achat import Achat
+
+    rng = random.Random(params['graine'] + index)
+    produits = [(row['id'], row['prix_vente']) for row in db.fetch_all("SELECT id, prix_vente FROM produits")]
+    vendeurs = [row['id'] for row in db.fetch_all("SELECT id FROM utilisateurs ORDER BY id")]
+    vendeur_id = vendeurs[index % len(vendeurs)]
+    # Popularité en loi de Zipf : les caisses se disputent les mêmes produits
+    poids = [1 / (rang + 1) ** 1.07 for rang in range(len(produits))]
+
+    resultat = {'latences_ms': [], 'achats_ms': [], 'verrous': 0, 'stock_insuffisant': 0, 'autres_erreurs': 0}
+    depart.wait()
+
+    for _ in range(params['paniers']):
+        achat = rng.random() < params['part_achats']
+        debut = time.perf_counter()
+        try:
+            if achat:
+                produit_id, _ = rng.choices(produits, poids)[0]
+                Achat.creer(produit_id, rng.choice([12, 24, 48]), "Test de charge", vendeur_id)
+            else:
+                nb_lignes = 1
+                while rng.random() < 0.65 and nb_lignes < 20:
+                    nb_lignes += 1
+                choisis = {pid: prix for pid, prix in rng.choices(produits, poids, k=nb_lignes)}
+                if len(choisis) == 1:
+                    # Article unique : chemin de Vente.creer
+                    (produit_id, prix), = choisis.items()
+                    Vente.creer(produit_id, rng.choice([1, 1, 1, 2]), prix, vendeur_id)
+                else:
+                    Vente.creer_panier([
+                        {'produit_id': pid, 'quantite': rng.choice([1, 1, 1, 2]), 'prix_unitaire': prix}
+                        for pid, prix in choisis.items()
+                    ], vendeur_id)
+            duree = (time.perf_counter() - debut) * 1000
+            resultat['achats_ms' if achat else 'latences_ms'].append(duree)
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                resultat['verrous'] += 1
+            else:
+                resultat['autres_erreurs'] += 1
+        except ValueError:
+            resultat['stock_insuffisant'] += 1
+        except Exception:
+            resultat['autres_erreurs'] += 1
+        if params['pause_ms']:
+            time.sleep(params['pause_ms'] / 1000)
+
+    return resultat
+
+
+def _caissier_processus(index, params, depart, file_resultats):
+    from database.db_manager import db
+
+    file_resultats.put(_caissier(index, params, depart))
+    db.close_all()
+
+
+def _preparer_base(db_path, nb_produits, stock_initial, nb_caisses):
+    from benchmarks.generateur import generer
+    from database.db_manager import db
+
+    # Catalogue et vendeurs seulement : quelques jours d'historique suffisent
+    generer(db_path, produits=nb_produits, vendeurs=nb_caisses, annees=0.02,
+            paniers_par_jour=20, achats_par_jour=2)
+    db.execute_query("UPDATE produits SET quantite = ?", (stock_initial,))
+
+
+def _etat_stock():
+    """Photographie des stocks et des derniers identifiants de mouvements"""
+    from database.db_manager import db
+    return {
+        'stocks': {row['id']: row['quantite'] for row in db.fetch_all("SELECT id, quantite FROM produits")},
+        'derniere_vente': db.fetch_one("SELECT COALESCE(MAX(id), 0) FROM ventes")[0],
+        'dernier_achat': db.fetch_one("SELECT COALESCE(MAX(id), 0) FROM achats")[0],
+    }
+
+
+def verifier_stock(avant):
+    """
+    Comparer les stocks finaux aux mouvements enregistrés pendant le test
+
+    Args:
+        avant (dict): Photographie retournée par _etat_stock avant le test
+
+    Returns:
+        dict: Nombre de produits incohérents et de stocks négatifs
+    """
+    from database.db_manager import db
+
+    mouvements = dict.fromkeys(avant['stocks'], 0)
+    for row in db.fetch_all("SELECT produit_id, SUM(quantite) FROM achats WHERE id > ? GROUP BY produit_id",
+                            (avant['dernier_achat'],)):
+        mouvements[row[0]] += row[1]
+    for row in db.fetch_all("SELECT produit_id, SUM(quantite) FROM ventes WHERE id > ? GROUP BY produit_id",
+                            (avant['derniere_vente'],)):
+        mouvements[row[0]] -= row[1]
+
+    apres = {row['id']: row['quantite'] for row in db.fetch_all("SELECT id, quantite FROM produits")}
+    incoherents = [pid for pid, stock in avant['stocks'].items() if stock + mouvements[pid] != apres[pid]]
+    return {
+        'produits_incoherents': len(incoherents),
+        'stocks_negatifs': sum(1 for quantite in apres.values() if quantite < 0),
+    }
+
+
+def executer(nb_caisses, mode, paniers, pause_ms=0, part_achats=0.05, nb_produits=300,
+             stock_initial=500, graine=42):
+    """
+    Lancer le test de charge sur une base temporaire
+
+    Args:
+        nb_caisses (int): Nombre de caisses simultanées
+        mode (str): 'threads' ou 'processus'
+        paniers (int): Opérations par caisse
+        pause_ms (float): Pause entre deux paniers (0 : caisses saturées)
+        part_achats (float): Proportion de réapprovisionnements
+        nb_produits (int): Taille du catalogue
+        stock_initial (int): Stock de chaque produit au départ
+        graine (int): Graine aléatoire
+
+    Returns:
+        dict: Débit, latences, erreurs et cohérence du stock
+    """
+    from database.db_manager import db
+
+    params = {'paniers': paniers, 'pause_ms': pause_ms, 'part_achats': part_achats, 'graine': graine}
+    with tempfile.TemporaryDirectory() as dossier:
+        db_path = os.path.join(dossier, 'charge.db')
+        _preparer_base(db_path, nb_produits, stock_initial, nb_caisses)
+        avant = _etat_stock()
+
+        if mode == 'threads':
+            depart = threading.Barrier(nb_caisses + 1)
+            resultats = [None] * nb_caisses
+
+            def lancer(i):
+                resultats[i] = _caissier(i, params, depart)
+
+            caisses = [threading.Thread(target=lancer, args=(i,)) for i in range(nb_caisses)]
+            for caisse in caisses:
+                caisse.start()
+            depart.wait()
+            debut = time.perf_counter()
+            for caisse in caisses:
+                caisse.join()
+        else:
+            # Les processus ouvrent la base de test via AGIB_DB_PATH
+            os.environ['AGIB_DB_PATH'] = db_path
+            ctx = multiprocessing.get_context('spawn')
+            depart = ctx.Barrier(nb_caisses + 1)
+            file_resultats = ctx.Queue()
+            caisses = [ctx.Process(target=_caissier_processus, args=(i, params, depart, file_resultats))
+                       for i in range(nb_caisses)]
+            for caisse in caisses:
+                caisse.start()
+            depart.wait()
+            debut = time.perf_counter()
+            resultats = [file_resultats.get() for _ in caisses]
+            for caisse in caisses:
+                caisse.join()
+        duree = time.perf_counter() - debut
+
+        coherence = verifier_stock(avant)
+        db.close_all()
+
+    latences = [l for r in resultats for l in r['latences_ms']]
+    achats = [l for r in resultats for l in r['achats_ms']]
+    return {
+        'date': datetime.now().isoformat(),
+        'caisses': nb_caisses,
+        'mode': mode,
+        'duree_s': round(duree, 3),
+        'encaissements': len(latences),
+        'achats': len(achats),
+        'debit_par_s': round(len(latences) / duree, 1) if duree else 0.0,
+        'p50_ms': round(_percentile(latences, 50), 3),
+        'p95_ms': round(_percentile(latences, 95), 3),
+        'p99_ms': round(_percentile(latences, 99), 3),
+        'achat_p95_ms': round(_percentile(achats, 95), 3),
+        'erreurs_verrou': sum(r['verrous'] for r in resultats),
+        'stock_insuffisant': sum(r['stock_insuffisant'] for r in resultats),
+        'autres_erreurs': sum(r['autres_erreurs'] for r in resultats),
+        **coherence,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simuler plusieurs caisses encaissant sur la même base")
+    parser.add_argument('--caisses', type=int, nargs='+', default=[1, 2, 4, 8], help="Nombres de caisses à tester")
+    parser.add_argument('--mode', choices=['threads', 'processus', 'les-deux'], default='les-deux')
+    parser.add_argument('--paniers', type=int, default=200, help="Opérations par caisse")
+    parser.add_argument('--pause', type=float, default=0, help="Pause entre deux paniers (ms)")
+    parser.add_argument('--achats', type=float, default=0.05, help="Proportion de réapprovisionnements")
+    parser.add_argument('--produits', type=int, default=300, help="Taille du catalogue")
+    parser.add_argument('--stock', type=int, default=500, help="Stock initial de chaque produit")
+    parser.add_argument('--sortie', help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    modes = ['threads', 'processus'] if args.mode == 'les-deux' else [args.mode]
+    tous = []
+    for mode in modes:
+        for nb_caisses in args.caisses:
+            r = executer(nb_caisses, mode, args.paniers, args.pause, args.achats, args.produits, args.stock)
+            tous.append(r)
+            print(f"[{mode} x{nb_caisses}] {r['debit_par_s']:.1f} paniers/s | "
+                  f"p50 {r['p50_ms']:.2f} ms, p95 {r['p95_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms | "
+                  f"verrous {r['erreurs_verrou']}, stock insuffisant {r['stock_insuffisant']}, "
+                  f"autres {r['autres_erreurs']} | incohérences {r['produits_incoherents']}, "
+                  f"stocks négatifs {r['stocks_negatifs']}")
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(tous, f, indent=2, ensure_ascii=False)
+        print(f"Résultats enregistrés dans {args.sortie}")
+
+
+if __name__ == '__main__':
+    # Ne pas créer agib.db dans le dossier de l'application lors de l'import
+    os.environ.setdefault('AGIB_DB_PATH', os.path.join(tempfile.gettempdir(), 'agib_benchmark.db'))
+    main()
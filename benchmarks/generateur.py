@@ -0,0 +1,244 @@
+"""
+Générateur de données synthétiques pour les benchmarks
+
+Remplit une base AGIB avec des volumes configurables : catégories, produits,
+vendeurs et plusieurs années de ventes, d'achats et d'entrées de journal.
+Les distributions imitent une boutique réelle : popularité des produits en
+loi de Zipf, affluence selon l'heure et le jour de la semaine, paniers de
+taille géométrique, prix log-normaux.
+
+Les lignes sont insérées directement par lots (executemany) plutôt que via
+les modèles ; les triggers de la base (index de recherche, statistiques,
+cumul journalier) sont donc alimentés comme en production.
+
+Utilisation :
+    python -m benchmarks.generateur --base /tmp/agib_bench.db --produits 5000 --annees 2
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.monnaie import formater_montant
+
+CATEGORIES = [
+    "Boissons", "Épicerie", "Produits laitiers", "Boulangerie", "Fruits et légumes",
+    "Hygiène", "Entretien", "Surgelés", "Confiserie", "Conserves", "Bébé", "Papeterie",
+]
+NOMS = ["Jus", "Lait", "Riz", "Savon", "Biscuit", "Café", "Thé", "Sucre", "Huile", "Pâtes",
+        "Farine", "Yaourt", "Eau", "Chocolat", "Sardines", "Tomate", "Lessive", "Shampoing"]
+QUALIFICATIFS = ["nature", "bio", "premium", "familial", "léger", "extra", "classique", "vanille",
+                 "citron", "complet", "mini", "maxi"]
+FOURNISSEURS = ["Grossiste Central", "Import Export SA", "Distribution Nord", "Ferme du Sud", "Cash & Carry"]
+
+# Affluence relative par heure d'ouverture (pics à midi et en fin de journée)
+AFFLUENCE_HEURES = {8: 2, 9: 3, 10: 4, 11: 6, 12: 9, 13: 7, 14: 4, 15: 4, 16: 5, 17: 8, 18: 9, 19: 6, 20: 3}
+# Affluence relative par jour de la semaine (lundi = 0)
+AFFLUENCE_JOURS = [0.9, 0.85, 0.95, 1.0, 1.2, 1.4, 0.7]
+
+# Volumes par défaut d'une base « moyenne »
+VOLUMES_DEFAUT = {
+    'categories': 12,
+    'produits': 5000,
+    'vendeurs': 6,
+    'annees': 2,
+    'paniers_par_jour': 150,
+    'achats_par_jour': 15,
+}
+
+
+def _nom_categorie(i):
+    base = CATEGORIES[i % len(CATEGORIES)]
+    return base if i < len(CATEGORIES) else f"{base} {i // len(CATEGORIES) + 1}"
+
+
+def _creer_referentiel(conn, rng, volumes, maintenant):
+    """Insérer catégories, vendeurs et produits ; retourner (produits, vendeurs)"""
+    from utils.security import hash_password
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO categories (nom) VALUES (?)",
+        [(_nom_categorie(i),) for i in range(volumes['categories'])]
+    )
+    categories = [row[0] for row in conn.execute("SELECT id FROM categories")]
+
+    # Un seul hachage bcrypt partagé : le coût de hachage n'est pas l'objet du benchmark
+    mot_de_passe = hash_password('vendeur123')
+    conn.executemany(
+        "INSERT OR IGNORE INTO utilisateurs (nom, role, mot_de_passe, date_creation) VALUES (?, 'Vendeur', ?, ?)",
+        [(f"vendeur{i + 1:02d}", mot_de_passe, maintenant.isoformat()) for i in range(volumes['vendeurs'])]
+    )
+    vendeurs = [row[0] for row in conn.execute("SELECT id FROM utilisateurs WHERE role = 'Vendeur'")]
+
+    # Tailles de catégories inégales (Zipf)
+    poids_categories = [1 / (rang + 1) for rang in range(len(categories))]
+    produits = []
+    for i in range(volumes['produits']):
+        # Prix en centimes
+        prix_achat = max(10, round(min(50000, rng.lognormvariate(math.log(300), 0.8))))
+        prix_vente = round(prix_achat * rng.uniform(1.15, 1.6))
+        # 10 % des produits proches de la rupture
+        quantite = rng.randint(0, 10) if rng.random() < 0.1 else rng.randint(11, 500)
+        expiration = (maintenant + timedelta(days=rng.randint(10, 720))).strftime("%Y-%m-%d") if rng.random() < 0.4 else None
+        produits.append((
+            f"{rng.choice(NOMS)} {rng.choice(QUALIFICATIFS)} {rng.randint(1, 999)}",
+            f"{600000000000 + i:013d}",
+            prix_achat, prix_vente, quantite,
+            rng.choices(categories, poids_categories)[0],
+            expiration, maintenant.isoformat()
+        ))
+    conn.executemany(
+        """INSERT INTO produits (nom, code, prix_achat, prix_vente, quantite, categorie_id, date_expiration, date_creation)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        produits
+    )
+    produits = [tuple(row) for row in conn.execute("SELECT id, nom, prix_vente, prix_achat FROM produits")]
+    return produits, vendeurs
+
+
+def _horodatage(rng, jour):
+    heure = rng.choices(list(AFFLUENCE_HEURES), list(AFFLUENCE_HEURES.values()))[0]
+    return jour.replace(hour=heure, minute=rng.randint(0, 59), second=rng.randint(0, 59),
+                        microsecond=rng.randint(0, 999999))
+
+
+def _generer_jour(rng, jour, volumes, produits, poids_cumules, vendeurs):
+    """Produire les ventes, achats et entrées de journal d'une journée"""
+    # Saisonnalité annuelle et croissance lente de l'activité
+    saison = 1 + 0.2 * math.sin(2 * math.pi * jour.timetuple().tm_yday / 365)
+    attendu = volumes['paniers_par_jour'] * AFFLUENCE_JOURS[jour.weekday()] * saison
+    nb_paniers = max(0, int(rng.gauss(attendu, math.sqrt(attendu) or 1)))
+
+    ventes, achats, journal = [], [], []
+    evenements = []
+    for _ in range(nb_paniers):
+        evenements.append(('vente', _horodatage(rng, jour)))
+    for _ in range(max(0, int(rng.gauss(volumes['achats_par_jour'], 2)))):
+        evenements.append(('achat', _horodatage(rng, jour)))
+    evenements.sort(key=lambda e: e[1])
+
+    for nature, moment in evenements:
+        date = moment.isoformat()
+        vendeur = rng.choice(vendeurs)
+        if nature == 'vente':
+            # Taille de panier géométrique (moyenne ~3 articles)
+            nb_lignes = 1
+            while rng.random() < 0.65 and nb_lignes < 20:
+                nb_lignes += 1
+            montant = 0
+            for produit_id, _, prix, cout in rng.choices(produits, cum_weights=poids_cumules, k=nb_lignes):
+                quantite = rng.choices([1, 2, 3, 4, 5], [70, 18, 6, 4, 2])[0]
+                ventes.append((produit_id, quantite, prix, quantite * prix, date, vendeur, cout))
+                montant += quantite * prix
+            journal.append(("VENTE", date, vendeur, f"Vente panier: {nb_lignes} article(s) - Montant: {formater_montant(montant)}"))
+        else:
+            produit_id, nom, _, _ = rng.choices(produits, cum_weights=poids_cumules)[0]
+            quantite = rng.choice([12, 24, 48, 50, 100, 200])
+            fournisseur = rng.choice(FOURNISSEURS)
+            achats.append((produit_id, quantite, date, fournisseur, vendeur))
+            journal.append(("ACHAT", date, vendeur, f"Achat: {nom} - Quantité: {quantite} - Fournisseur: {fournisseur}"))
+    return ventes, achats, journal
+
+
+def generer(db_path, graine=42, **volumes):
+    """
+    Remplir une base avec des données synthétiques
+
+    Args:
+        db_path (str): Chemin du fichier SQLite (créé s'il n'existe pas)
+        graine (int): Graine aléatoire, pour des bases reproductibles
+        **volumes: Surcharges de VOLUMES_DEFAUT
+
+    Returns:
+        dict: Nombre de lignes de chaque table après génération
+    """
+    from database.db_manager import db
+
+    volumes = {**VOLUMES_DEFAUT, **volumes}
+    rng = random.Random(graine)
+    maintenant = datetime.now()
+    db.utiliser_base(db_path)
+
+    with db.transaction() as conn:
+        produits, vendeurs = _creer_referentiel(conn, rng, volumes, maintenant)
+
+    # Popularité des produits en loi de Zipf, rangs répartis au hasard
+    rangs = list(range(1, len(produits) + 1))
+    rng.shuffle(rangs)
+    poids_cumules = list(itertools.accumulate(1 / rang ** 1.07 for rang in rangs))
+
+    jour = (maintenant - timedelta(days=int(365 * volumes['annees']))).replace(hour=0, minute=0, second=0, microsecond=0)
+    mois_courant = None
+    lot_ventes, lot_achats, lot_journal = [], [], []
+
+    def inserer():
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id, cout_unitaire) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                lot_ventes
+            )
+            conn.executemany(
+                "INSERT INTO achats (produit_id, quantite, date, fournisseur, utilisateur_id) VALUES (?, ?, ?, ?, ?)",
+                lot_achats
+            )
+            conn.executemany(
+                "INSERT INTO journal (action, date, utilisateur_id, details) VALUES (?, ?, ?, ?)",
+                lot_journal
+            )
+        lot_ventes.clear()
+        lot_achats.clear()
+        lot_journal.clear()
+
+    # Une transaction par mois : mémoire bornée quel que soit le nombre d'années
+    while jour.date() <= maintenant.date():
+        if mois_courant is not None and jour.month != mois_courant:
+            inserer()
+        mois_courant = jour.month
+        ventes, achats, journal = _generer_jour(rng, jour, volumes, produits, poids_cumules, vendeurs)
+        lot_ventes.extend(ventes)
+        lot_achats.extend(achats)
+        lot_journal.extend(journal)
+        jour += timedelta(days=1)
+    inserer()
+
+    db.get_connection().execute("ANALYZE")
+    return {table: db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+            for table in ('categories', 'produits', 'utilisateurs', 'ventes', 'achats', 'journal')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remplir une base AGIB avec des données synthétiques")
+    parser.add_argument('--base', default=os.path.join(tempfile.gettempdir(), 'agib_bench.db'),
+                        help="Fichier SQLite à remplir")
+    parser.add_argument('--categories', type=int, default=VOLUMES_DEFAUT['categories'])
+    parser.add_argument('--produits', type=int, default=VOLUMES_DEFAUT['produits'])
+    parser.add_argument('--vendeurs', type=int, default=VOLUMES_DEFAUT['vendeurs'])
+    parser.add_argument('--annees', type=float, default=VOLUMES_DEFAUT['annees'], help="Années d'historique")
+    parser.add_argument('--paniers-par-jour', type=int, default=VOLUMES_DEFAUT['paniers_par_jour'])
+    parser.add_argument('--achats-par-jour', type=int, default=VOLUMES_DEFAUT['achats_par_jour'])
+    parser.add_argument('--graine', type=int, default=42, help="Graine aléatoire")
+    args = parser.parse_args()
+
+    if os.path.exists(args.base):
+        parser.error(f"{args.base} existe déjà : choisir un nouveau fichier")
+
+    debut = time.perf_counter()
+    comptes = generer(
+        args.base, graine=args.graine, categories=args.categories, produits=args.produits,
+        vendeurs=args.vendeurs, annees=args.annees, paniers_par_jour=args.paniers_par_jour,
+        achats_par_jour=args.achats_par_jour
+    )
+    print(f"Base générée en {time.perf_counter() - debut:.1f} s : {args.base}")
+    for table, nombre in comptes.items():
+        print(f"  {table:<13} {nombre:>10}")
+
+
+if __name__ == '__main__':
+    # Ne pas créer agib.db dans le dossier de l'application lors de l'import
+    os.environ.setdefault('AGIB_DB_PATH', os.path.join(tempfile.gettempdir(), 'agib_benchmark.db'))
+    main()
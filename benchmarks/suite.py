@@ -0,0 +1,192 @@
+"""
+Suite de benchmarks de la couche modèles
+
+Pour chaque échelle, génère une base synthétique (benchmarks.generateur)
+puis chronomètre les opérations sensibles : recherche produit, vente,
+ventes du jour, statistiques du tableau de bord et chaque rapport
+d'ExportManager. Les résultats sont enregistrés en JSON et peuvent être
+comparés à une exécution précédente.
+
+Utilisation :
+    python -m benchmarks.suite --echelles petite moyenne --sortie resultats.json
+    python -m benchmarks.suite --comparer resultats.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+# Volumes de chaque échelle (surcharges de generateur.VOLUMES_DEFAUT)
+ECHELLES = {
+    'petite': {'produits': 500, 'vendeurs': 3, 'annees': 0.5, 'paniers_par_jour': 40, 'achats_par_jour': 5},
+    'moyenne': {'produits': 5000, 'vendeurs': 6, 'annees': 2, 'paniers_par_jour': 150, 'achats_par_jour': 15},
+    'grande': {'produits': 20000, 'vendeurs': 12, 'annees': 5, 'paniers_par_jour': 600, 'achats_par_jour': 40},
+}
+
+TERMES_RECHERCHE = ["jus", "bio", "lait nat", "6000000001", "zzz"]
+
+
+class _Neant:
+    """Fichier factice : mesure la génération des rapports sans l'écriture disque"""
+
+    def write(self, texte):
+        return len(texte)
+
+
+def _chronometrer(fonction, repetitions, preparer=None):
+    durees = []
+    for _ in range(repetitions):
+        if preparer is not None:
+            preparer()  # hors chronométrage
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return {
+        'repetitions': repetitions,
+        'min_ms': round(durees[0], 3),
+        'mediane_ms': round(statistics.median(durees), 3),
+        'p95_ms': round(durees[min(len(durees) - 1, int(len(durees) * 0.95))], 3),
+    }
+
+
+def mesurer(repetitions=20, repetitions_rapports=3):
+    """
+    Chronométrer les opérations de la couche modèles sur la base courante
+
+    Args:
+        repetitions (int): Répétitions des opérations unitaires
+        repetitions_rapports (int): Répétitions des rapports complets
+
+    Returns:
+        dict: Mesures par opération
+    """
+    from database.db_manager import db
+    from models.produit import Produit
+    from models.vente import Vente
+    from models.statistiques import Statistiques
+    from utils.export import ExportManager
+    from config import SEUIL_STOCK_FAIBLE
+
+    # Jour le plus chargé et produit avec assez de stock pour les ventes mesurées
+    jour = db.fetch_one("SELECT jour FROM ventes_journalieres GROUP BY jour ORDER BY SUM(nb_ventes) DESC LIMIT 1")
+    jour = jour['jour'] if jour else datetime.now().strftime("%Y-%m-%d")
+    vendeur_id = db.fetch_one("SELECT id FROM utilisateurs ORDER BY id LIMIT 1")['id']
+    produit = db.fetch_one("SELECT id, prix_vente FROM produits ORDER BY quantite DESC LIMIT 1")
+    db.execute_query("UPDATE produits SET quantite = quantite + ? WHERE id = ?", (repetitions * 10, produit['id']))
+
+    mesures = {}
+    for terme in TERMES_RECHERCHE:
+        mesures[f"Produit.rechercher[{terme}]"] = _chronometrer(lambda: Produit.rechercher(terme), repetitions)
+    mesures["Vente.creer"] = _chronometrer(
+        lambda: Vente.creer(produit['id'], 1, produit['prix_vente'], vendeur_id), repetitions)
+    mesures["Vente.obtenir_par_jour"] = _chronometrer(lambda: Vente.obtenir_par_jour(jour), repetitions)
+    mesures["Vente.calculer_total_jour"] = _chronometrer(lambda: Vente.calculer_total_jour(jour), repetitions)
+    # Requêtes du tableau de bord (cache vidé à chaque répétition, comparable
+    # aux mesures antérieures au cache), puis lecture depuis le cache
+    mesures["Statistiques.obtenir_tableau_de_bord"] = _chronometrer(
+        lambda: Statistiques.obtenir_tableau_de_bord(jour, SEUIL_STOCK_FAIBLE), repetitions, db.cache.vider)
+    mesures["Statistiques.obtenir_tableau_de_bord[cache]"] = _chronometrer(
+        lambda: Statistiques.obtenir_tableau_de_bord(jour, SEUIL_STOCK_FAIBLE), repetitions)
+
+    rapports = {
+        'inventaire': lambda: ExportManager.ecrire_inventaire(_Neant()),
+        'ventes_journalieres': lambda: ExportManager.ecrire_ventes_journalieres(_Neant(), jour),
+        'produits_rupture': lambda: ExportManager.ecrire_produits_rupture(_Neant(), SEUIL_STOCK_FAIBLE),
+        'journal': lambda: ExportManager.ecrire_journal(_Neant()),
+    }
+    for nom, fonction in rapports.items():
+        mesures[f"ExportManager.{nom}"] = _chronometrer(fonction, repetitions_rapports)
+    return mesures
+
+
+def executer(echelles, dossier=None, repetitions=20):
+    """
+    Générer (ou réutiliser) une base par échelle et la mesurer
+
+    Args:
+        echelles (list): Noms d'échelles de ECHELLES
+        dossier (str, optional): Dossier des bases générées, conservées entre
+            deux exécutions ; dossier temporaire sinon
+        repetitions (int): Répétitions des opérations unitaires
+
+    Returns:
+        dict: Résultats complets, sérialisables en JSON
+    """
+    from benchmarks.generateur import generer
+    from database.db_manager import db
+
+    resultats = {
+        'date': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plateforme': platform.platform(),
+        'echelles': {},
+    }
+    temporaire = tempfile.TemporaryDirectory() if dossier is None else None
+    dossier = dossier or temporaire.name
+    os.makedirs(dossier, exist_ok=True)
+    try:
+        for echelle in echelles:
+            db_path = os.path.join(dossier, f"bench_{echelle}.db")
+            if os.path.exists(db_path):
+                db.utiliser_base(db_path)
+            else:
+                print(f"[{echelle}] génération de la base...")
+                generer(db_path, **ECHELLES[echelle])
+            volumes = {table: db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+                       for table in ('produits', 'ventes', 'achats', 'journal')}
+            print(f"[{echelle}] mesures sur {volumes}")
+            resultats['echelles'][echelle] = {'volumes': volumes, 'mesures': mesurer(repetitions)}
+        db.close_all()
+    finally:
+        if temporaire is not None:
+            temporaire.cleanup()
+    return resultats
+
+
+def comparer(actuels, precedents):
+    """Afficher le rapport des médianes entre deux exécutions"""
+    for echelle, resultat in actuels['echelles'].items():
+        anciens = precedents.get('echelles', {}).get(echelle, {}).get('mesures', {})
+        print(f"\n[{echelle}]")
+        for operation, mesure in resultat['mesures'].items():
+            ligne = f"  {operation:<45} {mesure['mediane_ms']:>10.3f} ms"
+            if operation in anciens and anciens[operation]['mediane_ms'] > 0:
+                rapport = mesure['mediane_ms'] / anciens[operation]['mediane_ms']
+                ligne += f"   x{rapport:.2f} ({anciens[operation]['mediane_ms']:.3f} ms avant)"
+            print(ligne)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de la couche modèles à plusieurs échelles")
+    parser.add_argument('--echelles', nargs='+', choices=list(ECHELLES), default=['petite', 'moyenne'])
+    parser.add_argument('--dossier', help="Dossier où conserver les bases générées (réutilisées ensuite)")
+    parser.add_argument('--repetitions', type=int, default=20, help="Répétitions des opérations unitaires")
+    parser.add_argument('--sortie', help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument('--comparer', help="Fichier JSON d'une exécution précédente")
+    args = parser.parse_args()
+
+    resultats = executer(args.echelles, args.dossier, args.repetitions)
+
+    precedents = {}
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as f:
+            precedents = json.load(f)
+    comparer(resultats, precedents)
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés dans {args.sortie}")
+
+
+if __name__ == '__main__':
+    # Ne pas créer agib.db dans le dossier de l'application lors de l'import
+    os.environ.setdefault('AGIB_DB_PATH', os.path.join(tempfile.gettempdir(), 'agib_benchmark.db'))
+    main()
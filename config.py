@@ -3,7 +3,7 @@ import os
 
 # Chemins
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, 'agib.db')
+DB_PATH = os.environ.get('AGIB_DB_PATH', os.path.join(BASE_DIR, 'agib.db'))
 EXPORT_DIR = os.path.join(BASE_DIR, 'exports')
 
 # Créer le dossier d'export s'il n'existe pas
@@ -16,10 +16,64 @@ BOUTIQUE_ADRESSE = "Votre adresse"
 
 # Paramètres de sécurité
 MIN_PASSWORD_LENGTH = 4
+BCRYPT_ROUNDS = 12  # coût du hachage ; un mot de passe d'un autre coût est re-haché à la connexion
+CONNEXION_ECHECS_TOLERES = 3  # échecs consécutifs avant d'imposer une attente
+CONNEXION_ATTENTE_INITIALE = 2.0  # secondes, doublées à chaque échec suivant
+CONNEXION_ATTENTE_MAX = 300.0  # secondes
 
 # Paramètres d'alerte stock
 SEUIL_STOCK_FAIBLE = 10
 
+# Nombre maximum de produits affichés pour une recherche
+LIMITE_RESULTATS_RECHERCHE = 200
+
+# Nombre de lignes chargées par page dans les historiques (achats, ventes, journal)
+TAILLE_PAGE_HISTORIQUE = 50
+
 # Format d'export
 EXPORT_ENCODING = 'utf-8'
 EXPORT_SEPARATOR = '\t'
+EXPORT_TAILLE_LOT = 1000  # lignes lues à la fois lors de l'écriture d'un rapport
+TAILLE_PAGE_APERCU = 100  # lignes affichées par page dans l'aperçu d'un rapport
+
+# Pool de connexions (une connexion persistante par thread)
+DB_POOL_VERIFICATION_INTERVALLE = 30  # secondes d'inactivité avant un test de santé
+DB_TIMEOUT = 5.0  # secondes d'attente si la base est verrouillée
+DB_CACHE_INSTRUCTIONS = 256  # instructions préparées conservées par connexion
+DB_CACHE_RESULTATS = 128  # résultats de rapports et du tableau de bord conservés en mémoire
+
+# Instrumentation des requêtes SQL (écran de diagnostic, journal des requêtes lentes)
+DB_PROFILAGE = os.environ.get('AGIB_PROFILAGE') == '1'  # activable aussi depuis l'écran de diagnostic
+DB_SEUIL_REQUETE_LENTE_MS = 50.0
+DB_JOURNAL_REQUETES_LENTES = os.path.join(BASE_DIR, 'requetes_lentes.log')
+
+# Journal des opérations hors transaction : écrit par lots en arrière-plan
+JOURNAL_TAILLE_LOT = 100  # entrées écrites en une transaction
+JOURNAL_DELAI_MAX = 2.0  # secondes avant l'écriture d'un lot incomplet
+# Mois du journal gardés dans la base principale, mois en cours compris ; les plus
+# anciens sont déplacés au démarrage dans archives/<base>_journal_AAAA_MM.db
+JOURNAL_MOIS_ACTIFS = 3
+
+# Profil PRAGMA appliqué à chaque nouvelle connexion SQLite
+# 'performance' : journal WAL (les lectures des rapports ne bloquent plus la caisse)
+# 'securite'    : comportement SQLite par défaut (journal de rollback, sync complète)
+DB_PRAGMA_PROFIL = 'performance'
+DB_PRAGMA_PROFILS = {
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,       # en Kio quand négatif (~20 Mo)
+        'mmap_size': 268435456,     # 256 Mo
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,       # en millisecondes
+        'wal_autocheckpoint': 1000,  # checkpoint passif toutes les 1000 pages
+    },
+    'securite': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+
+# Checkpoint du journal WAL à la fermeture (PASSIVE, FULL, RESTART ou TRUNCATE)
+DB_CHECKPOINT_FERMETURE = 'TRUNCATE'
@@ -1,4 +1,12 @@
 """Module de gestion de la base de données"""
-from .db_manager import db, DatabaseManager
 
 __all__ = ['db', 'DatabaseManager']
+
+
+def __getattr__(nom):
+    # Import différé : database.migrations s'utilise en ligne de commande
+    # sans ouvrir (ni migrer) la base de l'application
+    if nom in __all__:
+        from . import db_manager
+        return getattr(db_manager, nom)
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
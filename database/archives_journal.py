@@ -0,0 +1,276 @@
+"""
+Archivage mensuel du journal des opérations (une base SQLite par mois)
+
+La base principale ne garde que les JOURNAL_MOIS_ACTIFS derniers mois du
+journal ; les mois plus anciens sont déplacés au démarrage dans des
+fichiers archives/<base>_journal_AAAA_MM.db, à côté de la base. Les
+lectures sur une période n'attachent que les archives des mois concernés.
+
+Utilisation en ligne de commande :
+    python -m database.archives_journal --statut
+    python -m database.archives_journal --archiver
+    python -m database.archives_journal --compacter
+    python -m database.archives_journal --exporter 2024-01-01 2024-03-31
+"""
+import argparse
+import itertools
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date
+
+_RE_ARCHIVE = re.compile(r"^(?P<base>.+)_journal_(?P<annee>\d{4})_(?P<mois>\d{2})\.db$")
+
+_SCHEMA_ARCHIVE = """
+    CREATE TABLE IF NOT EXISTS {alias}.journal (
+        id INTEGER PRIMARY KEY,
+        action TEXT NOT NULL,
+        date TEXT NOT NULL,
+        utilisateur_id INTEGER,
+        details TEXT
+    )
+"""
+_INDEX_ARCHIVE = "CREATE INDEX IF NOT EXISTS {alias}.idx_journal_date ON journal(date)"
+
+
+def debut_mois(mois):
+    """Premier jour d'un mois 'AAAA-MM' ('AAAA-MM-01')"""
+    return f"{mois}-01"
+
+
+def mois_suivant(mois):
+    """Mois suivant un mois 'AAAA-MM'"""
+    annee, numero = map(int, mois.split('-'))
+    annee, numero = divmod(annee * 12 + numero, 12)
+    return f"{annee:04d}-{numero + 1:02d}"
+
+
+class ArchivesJournal:
+    """Partitions mensuelles du journal hors de la base principale
+
+    Invariant : toute entrée archivée est plus ancienne que toute entrée
+    restée dans la base principale (les mois sont archivés entiers, du
+    plus ancien au plus récent). Un parcours par date décroissante lit
+    donc la base principale puis les archives, de la plus récente à la
+    plus ancienne, sans tri global.
+    """
+
+    def __init__(self, db, mois_actifs=3):
+        self._db = db
+        self.mois_actifs = mois_actifs
+        self._alias = itertools.count(1)
+
+    @property
+    def dossier(self):
+        """Dossier des archives, à côté du fichier de la base"""
+        return os.path.join(os.path.dirname(os.path.abspath(self._db.db_path)), 'archives')
+
+    def _prefixe(self):
+        return os.path.splitext(os.path.basename(self._db.db_path))[0]
+
+    def chemin(self, mois):
+        """Fichier d'archive d'un mois 'AAAA-MM'"""
+        annee, numero = mois.split('-')
+        return os.path.join(self.dossier, f"{self._prefixe()}_journal_{annee}_{numero}.db")
+
+    def mois_archives(self):
+        """
+        Lister les mois archivés de la base courante
+
+        Returns:
+            list: Mois 'AAAA-MM' disposant d'un fichier d'archive, du plus ancien au plus récent
+        """
+        if not os.path.isdir(self.dossier):
+            return []
+        prefixe = self._prefixe()
+        mois = []
+        for fichier in os.listdir(self.dossier):
+            correspondance = _RE_ARCHIVE.match(fichier)
+            if correspondance and correspondance.group('base') == prefixe:
+                mois.append(f"{correspondance.group('annee')}-{correspondance.group('mois')}")
+        return sorted(mois)
+
+    def mois_periode(self, date_debut=None, date_fin=None):
+        """
+        Mois archivés ayant des entrées possibles entre deux dates
+
+        Args:
+            date_debut (str, optional): Date ISO de début (incluse)
+            date_fin (str, optional): Date ISO de fin (incluse)
+
+        Returns:
+            list: Mois 'AAAA-MM', du plus récent au plus ancien
+        """
+        return [
+            mois for mois in reversed(self.mois_archives())
+            if (date_fin is None or debut_mois(mois) <= date_fin)
+            and (date_debut is None or debut_mois(mois_suivant(mois)) > date_debut)
+        ]
+
+    def limite_active(self, aujourd_hui=None):
+        """
+        Date à partir de laquelle les entrées restent dans la base principale
+
+        Args:
+            aujourd_hui (date, optional): Date de référence (aujourd'hui par défaut)
+
+        Returns:
+            str: Premier jour du plus ancien mois conservé ('AAAA-MM-01')
+        """
+        aujourd_hui = aujourd_hui or date.today()
+        annee, numero = divmod(aujourd_hui.year * 12 + aujourd_hui.month - self.mois_actifs, 12)
+        return f"{annee:04d}-{numero + 1:02d}-01"
+
+    @contextmanager
+    def attacher(self, mois):
+        """
+        Attacher l'archive d'un mois à la connexion du thread courant
+
+        À utiliser hors transaction (SQLite refuse ATTACH dans une transaction).
+
+        Args:
+            mois (str): Mois 'AAAA-MM'
+
+        Yields:
+            str: Nom du schéma attaché (requêtes sur <alias>.journal)
+        """
+        conn = self._db.get_connection()
+        alias = f"archive_{next(self._alias)}"
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (self.chemin(mois),))
+        try:
+            yield alias
+        finally:
+            conn.execute(f"DETACH DATABASE {alias}")
+
+    def a_archiver(self):
+        """Indiquer si la base principale contient des mois à archiver"""
+        return self._db.fetch_one(
+            "SELECT 1 FROM journal WHERE date < ? LIMIT 1", (self.limite_active(),)
+        ) is not None
+
+    def archiver(self):
+        """
+        Déplacer les mois antérieurs à la limite active dans leurs archives
+
+        Pour chaque mois, les entrées sont d'abord copiées dans l'archive
+        (transaction validée), puis supprimées de la base principale si
+        elles y figurent bien : une interruption entre les deux laisse des
+        doublons, retirés au prochain archivage, jamais de perte.
+
+        Returns:
+            list: (mois, nombre d'entrées déplacées) pour chaque mois archivé
+        """
+        limite = self.limite_active()
+        mois_a_archiver = [row[0] for row in self._db.fetch_all(
+            "SELECT DISTINCT substr(date, 1, 7) FROM journal WHERE date < ? ORDER BY 1", (limite,)
+        )]
+        if not mois_a_archiver:
+            return []
+
+        os.makedirs(self.dossier, exist_ok=True)
+        rapport = []
+        for mois in mois_a_archiver:
+            bornes = (debut_mois(mois), debut_mois(mois_suivant(mois)))
+            with self.attacher(mois) as alias:
+                self._db.execute_query(_SCHEMA_ARCHIVE.format(alias=alias))
+                self._db.execute_query(_INDEX_ARCHIVE.format(alias=alias))
+                with self._db.transaction() as conn:
+                    conn.execute(f"""
+                        INSERT OR IGNORE INTO {alias}.journal (id, action, date, utilisateur_id, details)
+                        SELECT id, action, date, utilisateur_id, details
+                        FROM main.journal WHERE date >= ? AND date < ?
+                    """, bornes)
+                with self._db.transaction() as conn:
+                    nb = conn.execute(f"""
+                        DELETE FROM main.journal
+                        WHERE date >= ? AND date < ?
+                          AND id IN (SELECT id FROM {alias}.journal WHERE date >= ? AND date < ?)
+                    """, bornes + bornes).rowcount
+            rapport.append((mois, nb))
+        return rapport
+
+    def compacter(self):
+        """
+        Reconstruire (VACUUM) la base principale et les archives
+
+        À lancer application fermée : l'espace libéré par l'archivage est
+        rendu au système et les fichiers sont défragmentés.
+
+        Returns:
+            list: (fichier, taille avant, taille après) en octets
+        """
+        conn = self._db.get_connection()
+        self._db.checkpoint('TRUNCATE')
+        avant = os.path.getsize(self._db.db_path)
+        conn.execute("VACUUM")
+        self._db.checkpoint('TRUNCATE')
+        resultats = [(self._db.db_path, avant, os.path.getsize(self._db.db_path))]
+        for mois in self.mois_archives():
+            chemin = self.chemin(mois)
+            avant = os.path.getsize(chemin)
+            with self.attacher(mois) as alias:
+                conn.execute(f"VACUUM {alias}")
+            resultats.append((chemin, avant, os.path.getsize(chemin)))
+        return resultats
+
+    def statut(self):
+        """
+        Décrire la répartition du journal
+
+        Returns:
+            dict: 'actif' (nombre, plus ancienne date) et 'archives' (liste de (mois, nombre, taille))
+        """
+        nb, plus_ancienne = self._db.fetch_one("SELECT COUNT(*), MIN(date) FROM journal")
+        archives = []
+        for mois in self.mois_archives():
+            with self.attacher(mois) as alias:
+                nb_archive = self._db.fetch_one(f"SELECT COUNT(*) FROM {alias}.journal")[0]
+            archives.append((mois, nb_archive, os.path.getsize(self.chemin(mois))))
+        return {'actif': (nb, plus_ancienne), 'archives': archives}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivage mensuel du journal des opérations")
+    parser.add_argument('--base', help="Fichier de la base (AGIB_DB_PATH ou agib.db par défaut)")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--statut', action='store_true', help="Afficher la répartition du journal (par défaut)")
+    action.add_argument('--archiver', action='store_true', help="Archiver les mois échus sans attendre le démarrage")
+    action.add_argument('--compacter', action='store_true', help="Reconstruire la base et les archives (application fermée)")
+    action.add_argument('--exporter', nargs=2, metavar=('DEBUT', 'FIN'),
+                        help="Exporter le journal entre deux dates AAAA-MM-JJ, archives comprises")
+    args = parser.parse_args()
+
+    if args.base:
+        os.environ['AGIB_DB_PATH'] = os.path.abspath(args.base)
+    # Import après le choix de la base : l'instance globale l'ouvre à l'import
+    from database.db_manager import db
+    archives = db.archives_journal
+
+    if args.archiver:
+        debut = time.perf_counter()
+        rapport = archives.archiver()
+        for mois, nb in rapport:
+            print(f"  {mois}  {nb:>8} entrée(s) archivée(s)")
+        print(f"{sum(nb for _, nb in rapport)} entrée(s) archivée(s) en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    elif args.compacter:
+        for chemin, avant, apres in archives.compacter():
+            print(f"  {os.path.basename(chemin):<40} {avant / 1024:>10.0f} Kio -> {apres / 1024:.0f} Kio")
+    elif args.exporter:
+        from utils.export import ExportManager
+        date_debut, date_fin = args.exporter
+        chemin = ExportManager.exporter_journal(f"{date_debut}T00:00:00", f"{date_fin}T23:59:59.999999")
+        print(f"Journal exporté : {chemin}")
+    else:
+        statut = archives.statut()
+        nb, plus_ancienne = statut['actif']
+        print(f"Base {db.db_path} : {nb} entrée(s) depuis {plus_ancienne or '-'} "
+              f"(mois conservés : {archives.mois_actifs})")
+        for mois, nb_archive, taille in statut['archives']:
+            print(f"  {mois}  {nb_archive:>8} entrée(s)  {taille / 1024:>8.0f} Kio")
+        if not statut['archives']:
+            print("Aucune archive")
+
+
+if __name__ == '__main__':
+    main()
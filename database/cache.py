@@ -0,0 +1,76 @@
+"""
+Cache des résultats de lecture (rapports, tableau de bord) invalidé par les écritures
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheResultats:
+    """Résultats de lecture conservés tant que les tables lues n'ont pas changé
+
+    Chaque résultat est enregistré avec les compteurs de modification
+    (table versions_donnees, incrémentée par triggers) des tables qu'il
+    lit. Un résultat dont un compteur a changé depuis est recalculé :
+    l'invalidation vaut pour toutes les écritures, y compris celles des
+    autres caisses sur la même base. Les compteurs sont relus avant le
+    calcul : une écriture concurrente rend le résultat périmé, jamais
+    faussement à jour.
+
+    Les résultats sont partagés entre les appelants et ne doivent pas
+    être modifiés.
+    """
+
+    def __init__(self, db, taille_max=128):
+        self._db = db
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()  # clé -> (versions des tables, résultat)
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+
+    def versions(self, tables):
+        """
+        Lire les compteurs de modification de tables
+
+        Args:
+            tables (tuple): Noms des tables
+
+        Returns:
+            tuple: Compteur de chaque table, dans l'ordre demandé
+        """
+        compteurs = dict(self._db.fetch_all("SELECT nom_table, version FROM versions_donnees"))
+        return tuple(compteurs[table] for table in tables)
+
+    def obtenir(self, cle, tables, calcul):
+        """
+        Obtenir un résultat du cache, ou le calculer et le conserver
+
+        Args:
+            cle (tuple): Identifiant du résultat (requête et paramètres)
+            tables (tuple): Tables lues par le calcul
+            calcul (callable): Fonction sans argument produisant le résultat
+
+        Returns:
+            Résultat de calcul(), éventuellement issu du cache
+        """
+        versions = self.versions(tables)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] == versions:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return entree[1]
+            self.echecs += 1
+
+        resultat = calcul()
+        with self._verrou:
+            self._entrees[cle] = (versions, resultat)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+        return resultat
+
+    def vider(self):
+        """Oublier tous les résultats (changement de base)"""
+        with self._verrou:
+            self._entrees.clear()
@@ -1,40 +1,213 @@
 """
 Gestionnaire de base de données SQLite pour l'application AGIB
 """
+import atexit
+import importlib
 import sqlite3
-import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
 from datetime import datetime
-from config import DB_PATH
+from itertools import starmap
+from config import (DB_PATH, DB_POOL_VERIFICATION_INTERVALLE, DB_TIMEOUT, DB_CACHE_INSTRUCTIONS, EXPORT_TAILLE_LOT,
+                    DB_PRAGMA_PROFIL, DB_PRAGMA_PROFILS, DB_CHECKPOINT_FERMETURE, DB_CACHE_RESULTATS,
+                    DB_PROFILAGE, DB_SEUIL_REQUETE_LENTE_MS, DB_JOURNAL_REQUETES_LENTES,
+                    JOURNAL_TAILLE_LOT, JOURNAL_DELAI_MAX, JOURNAL_MOIS_ACTIFS)
+from database.profiler import QueryProfiler, ConnexionProfilee
+from database.enregistrements import classe_enregistrement
+from database.cache import CacheResultats
+from database.tampon_journal import TamponJournal
+from database.archives_journal import ArchivesJournal
+from database.migrations import migrer
 
 
 class DatabaseManager:
-    """Classe pour gérer toutes les opérations de base de données"""
+    """Classe pour gérer toutes les opérations de base de données
 
-    def __init__(self):
-        self.db_path = DB_PATH
+    Les connexions sont conservées dans un pool : chaque thread possède sa
+    propre connexion persistante, créée à la première utilisation puis
+    réutilisée par toutes les requêtes de ce thread.
+    """
+
+    def __init__(self, db_path=None, profil_pragma=None):
+        self.db_path = db_path or DB_PATH
+        self.pragmas = DB_PRAGMA_PROFILS[profil_pragma or DB_PRAGMA_PROFIL]
+        self._local = threading.local()
+        # Clé : l'objet Thread, jamais réutilisé (un ident peut l'être par un
+        # nouveau thread et masquer la connexion d'un thread terminé)
+        self._connexions = {}  # thread -> connexion
+        self._verrou = threading.Lock()
+        self.fts_disponible = False
+        self.profiler = QueryProfiler(DB_PROFILAGE, DB_SEUIL_REQUETE_LENTE_MS, DB_JOURNAL_REQUETES_LENTES)
+        self.cache = CacheResultats(self, DB_CACHE_RESULTATS)
+        self.tampon_journal = TamponJournal(self, JOURNAL_TAILLE_LOT, JOURNAL_DELAI_MAX)
+        atexit.register(self.tampon_journal.arreter)  # Sortie sans close_all (scripts)
+        self.archives_journal = ArchivesJournal(self, JOURNAL_MOIS_ACTIFS)
         self.init_database()
 
-    def get_connection(self):
-        """Créer une connexion à la base de données"""
-        conn = sqlite3.connect(self.db_path)
+    def _creer_connexion(self):
+        """Ouvrir une nouvelle connexion SQLite"""
+        # check_same_thread=False permet seulement à close_all() de fermer les
+        # connexions depuis le thread principal ; chaque connexion reste
+        # utilisée exclusivement par le thread qui l'a créée.
+        # cached_statements : une requête au texte identique réutilise son
+        # instruction préparée au lieu d'être recompilée
+        conn = sqlite3.connect(self.db_path, timeout=DB_TIMEOUT, check_same_thread=False,
+                               factory=ConnexionProfilee, cached_statements=DB_CACHE_INSTRUCTIONS)
+        conn.profiler = self.profiler  # Inactif par défaut : un simple test par instruction
         conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        # journal_mode en premier : les autres réglages en dépendent
+        for nom, valeur in self.pragmas.items():
+            conn.execute(f"PRAGMA {nom} = {valeur}")
         return conn
 
-    def init_database(self):
-        """Initialiser la base de données avec le schéma"""
-        # Lire le schéma SQL
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
+    def _connexion_valide(self, conn):
+        """Vérifier qu'une connexion du pool est toujours utilisable"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _liberer_threads_termines(self):
+        """Fermer les connexions appartenant à des threads terminés"""
+        for thread in [t for t in self._connexions if not t.is_alive()]:
+            try:
+                self._connexions.pop(thread).close()
+            except sqlite3.Error:
+                pass
+
+    def get_connection(self):
+        """Obtenir la connexion persistante du thread courant"""
+        conn = getattr(self._local, 'conn', None)
+        maintenant = time.monotonic()
+
+        if conn is not None:
+            inactif = maintenant - self._local.derniere_utilisation
+            if inactif > DB_POOL_VERIFICATION_INTERVALLE and not self._connexion_valide(conn):
+                self._fermer_connexion_locale()
+                conn = None
+
+        if conn is None:
+            conn = self._creer_connexion()
+            self._local.conn = conn
+            with self._verrou:
+                self._liberer_threads_termines()
+                self._connexions[threading.current_thread()] = conn
+
+        self._local.derniere_utilisation = maintenant
+        return conn
+
+    def _fermer_connexion_locale(self):
+        """Fermer et retirer du pool la connexion du thread courant"""
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        with self._verrou:
+            self._connexions.pop(threading.current_thread(), None)
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def checkpoint(self, mode='PASSIVE'):
+        """
+        Reporter le journal WAL dans le fichier principal de la base
 
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema_sql = f.read()
+        Args:
+            mode (str): PASSIVE, FULL, RESTART ou TRUNCATE
+
+        Returns:
+            tuple: (bloqué, pages du WAL, pages reportées), ou None hors mode WAL
+        """
+        if str(self.pragmas.get('journal_mode', '')).upper() != 'WAL':
+            return None
+        result = self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return tuple(result)
+
+    def close_all(self):
+        """Fermer toutes les connexions du pool (à appeler à l'arrêt)"""
+        try:
+            self.tampon_journal.arreter()
+        except sqlite3.Error:
+            traceback.print_exc()  # Entrées conservées en mémoire, réécrites à la sortie (atexit)
+        try:
+            self.checkpoint(DB_CHECKPOINT_FERMETURE)
+        except sqlite3.Error:
+            pass  # Une autre caisse lit encore la base : le prochain checkpoint s'en chargera
+        with self._verrou:
+            connexions = list(self._connexions.values())
+            self._connexions.clear()
+        for conn in connexions:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # Les threads retrouveront une référence fermée : forcer la réouverture
+        self._local = threading.local()
+
+    def utiliser_base(self, db_path):
+        """
+        Fermer le pool et basculer sur un autre fichier de base
+
+        Les modèles utilisant l'instance globale travaillent ensuite sur la
+        nouvelle base (outils de génération de données et benchmarks).
+
+        Args:
+            db_path (str): Chemin du fichier SQLite
+        """
+        self.close_all()
+        self.cache.vider()
+        self.db_path = db_path
+        self.init_database()
+
+    def _dans_transaction(self):
+        """Indiquer si le thread courant est dans un bloc transaction()"""
+        return getattr(self._local, 'profondeur', 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Regrouper plusieurs écritures dans une seule transaction
 
-        # Créer les tables
+        Les appels à execute_query et log_action effectués dans le bloc ne
+        valident plus individuellement : tout est validé en une fois à la
+        sortie du bloc, ou annulé si une exception est levée. Un bloc imbriqué
+        rejoint la transaction englobante.
+
+        Yields:
+            sqlite3.Connection: Connexion du thread courant
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.executescript(schema_sql)
-        conn.commit()
+        if self._dans_transaction():
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.profondeur = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.profondeur = 0
+
+    def init_database(self):
+        """Mettre le schéma à jour (migrations en attente) et vérifier les données dérivées"""
+        conn = self.get_connection()
+        for etape in migrer(conn):
+            print(f"Migration {etape['version']:03d} appliquée ({etape['description']}) "
+                  f"en {etape['duree_ms']:.0f} ms")
+
+        self.init_recherche()
+        self.init_statistiques()
+        self.init_archives_journal()
 
         # Vérifier si un utilisateur admin existe, sinon le créer
+        cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) as count FROM utilisateurs WHERE role = 'Administrateur'")
         result = cursor.fetchone()
 
@@ -49,7 +222,90 @@ class DatabaseManager:
             conn.commit()
             print("Utilisateur administrateur par défaut créé (admin/admin123)")
 
-        conn.close()
+        cursor.close()
+
+    def init_archives_journal(self):
+        """Déplacer dans leurs archives les mois du journal sortis de la période active"""
+        if not self.archives_journal.a_archiver():
+            return
+        debut = time.perf_counter()
+        rapport = self.archives_journal.archiver()
+        print(f"Journal : {sum(nb for _, nb in rapport)} entrée(s) archivée(s) "
+              f"({', '.join(mois for mois, _ in rapport)}) en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+    def init_recherche(self):
+        """Vérifier l'index plein texte des produits et le resynchroniser si nécessaire"""
+        conn = self.get_connection()
+        index_present = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'produits_fts'"
+        ).fetchone() is not None
+
+        if not index_present:
+            # FTS5 indisponible lors de la migration : SQLite a pu être mis à jour depuis
+            recherche = importlib.import_module('database.migrations.003_recherche_plein_texte')
+            with self.transaction() as conn:
+                self.fts_disponible = recherche.creer_index(conn)
+            return
+
+        # Base modifiée hors de l'application ou index désynchronisé : reconstruire l'index
+        nb_produits = conn.execute("SELECT COUNT(*) FROM produits").fetchone()[0]
+        nb_indexes = conn.execute("SELECT COUNT(*) FROM produits_fts").fetchone()[0]
+        if nb_produits != nb_indexes:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM produits_fts")
+                conn.execute("""
+                    INSERT INTO produits_fts (rowid, nom, code, categorie_nom)
+                    SELECT p.id, p.nom, p.code, c.nom
+                    FROM produits p
+                    LEFT JOIN categories c ON p.categorie_id = c.id
+                """)
+        self.fts_disponible = True
+
+    def init_statistiques(self):
+        """Vérifier les statistiques maintenues par triggers, les recalculer si besoin"""
+        # Contrôle en lecture seule (un parcours du catalogue, sans verrou) :
+        # le recalcul, sous verrou d'écriture, n'a lieu que si le résumé manque
+        # ou ne correspond plus (produits modifiés sans les triggers)
+        conn = self.get_connection()
+        resume = conn.execute("SELECT nb_produits, valeur_stock FROM resume_stock WHERE id = 1").fetchone()
+        reel = conn.execute("SELECT COUNT(*), COALESCE(SUM(quantite * prix_achat), 0) FROM produits").fetchone()
+        if resume is None or tuple(resume) != tuple(reel):
+            self.reconstruire_resume_stock()
+
+        # Base existante sans cumul journalier : le construire une fois
+        cumul_vide = conn.execute("SELECT 1 FROM ventes_journalieres LIMIT 1").fetchone() is None
+        if cumul_vide and conn.execute("SELECT 1 FROM ventes LIMIT 1").fetchone() is not None:
+            self.reconstruire_ventes_journalieres()
+
+    def reconstruire_resume_stock(self):
+        """Recalculer entièrement le résumé du stock à partir de la table produits"""
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO resume_stock (id, nb_produits, valeur_stock)
+                SELECT 1, COUNT(*), COALESCE(SUM(quantite * prix_achat), 0)
+                FROM produits
+            """)
+
+    def reconstruire_ventes_journalieres(self):
+        """
+        Reconstruire entièrement le cumul journalier à partir de la table ventes
+
+        Le coût est celui enregistré sur chaque vente (cout_unitaire, prix
+        d'achat au moment de la vente).
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM ventes_journalieres")
+            conn.execute("""
+                INSERT INTO ventes_journalieres
+                    (jour, produit_id, utilisateur_id, nb_ventes, quantite, chiffre_affaires, cout)
+                SELECT substr(v.date, 1, 10), v.produit_id, v.utilisateur_id,
+                       COUNT(*), SUM(v.quantite), SUM(v.montant_total),
+                       SUM(v.quantite * COALESCE(v.cout_unitaire, 0))
+                FROM ventes v
+                GROUP BY substr(v.date, 1, 10), v.produit_id, v.utilisateur_id
+            """)
+            # Le cumul change sans écriture dans ventes : invalider les résultats en cache
+            conn.execute("UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'ventes'")
 
     def execute_query(self, query, params=None):
         """Exécuter une requête SQL (INSERT, UPDATE, DELETE)"""
@@ -61,13 +317,15 @@ class DatabaseManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            conn.commit()
-            last_id = cursor.lastrowid
-            conn.close()
-            return last_id
+            if not self._dans_transaction():
+                conn.commit()
+            return cursor.lastrowid
         except sqlite3.Error as e:
-            conn.close()
+            if not self._dans_transaction():
+                conn.rollback()
             raise e
+        finally:
+            cursor.close()
 
     def fetch_all(self, query, params=None):
         """Récupérer tous les résultats d'une requête SELECT"""
@@ -79,12 +337,9 @@ class DatabaseManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            results = cursor.fetchall()
-            conn.close()
-            return results
-        except sqlite3.Error as e:
-            conn.close()
-            raise e
+            return cursor.fetchall()
+        finally:
+            cursor.close()
 
     def fetch_one(self, query, params=None):
         """Récupérer un seul résultat d'une requête SELECT"""
@@ -96,20 +351,137 @@ class DatabaseManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            result = cursor.fetchone()
-            conn.close()
-            return result
-        except sqlite3.Error as e:
-            conn.close()
-            raise e
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def iterer(self, query, params=None, taille_lot=EXPORT_TAILLE_LOT):
+        """
+        Parcourir les résultats d'une requête SELECT par lots
+
+        Seul un lot de lignes est en mémoire à la fois, quelle que soit la
+        taille du résultat.
+
+        Args:
+            query (str): Requête SELECT
+            params (tuple, optional): Paramètres de la requête
+            taille_lot (int): Nombre de lignes lues à chaque appel à fetchmany
+
+        Yields:
+            sqlite3.Row: Lignes du résultat
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                lignes = cursor.fetchmany(taille_lot)
+                if not lignes:
+                    break
+                yield from lignes
+        finally:
+            cursor.close()
+
+    def lire_enregistrements(self, query, params=None, entite='Enregistrement', paresseux=False):
+        """
+        Récupérer les résultats d'une requête SELECT sous forme d'enregistrements
+
+        Les lignes sont lues en tuples puis converties en enregistrements à
+        attributs fixes (database.enregistrements), bien plus légers que des
+        dicts, sans passer par sqlite3.Row.
+
+        Args:
+            query (str): Requête SELECT (expressions nommées par un alias)
+            params (tuple, optional): Paramètres de la requête
+            entite (str): Nom de la classe d'enregistrement (Vente, Produit, ...)
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
+                plutôt qu'une liste ; à parcourir dans le thread appelant
+
+        Returns:
+            list: Enregistrements (itérateur si paresseux)
+        """
+        if paresseux:
+            return self._iterer_enregistrements(query, params, entite)
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            classe = classe_enregistrement(entite, tuple(d[0] for d in cursor.description))
+            return list(starmap(classe, cursor))
+        finally:
+            cursor.close()
+
+    def _iterer_enregistrements(self, query, params, entite):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            classe = classe_enregistrement(entite, tuple(d[0] for d in cursor.description))
+            while True:
+                lignes = cursor.fetchmany(EXPORT_TAILLE_LOT)
+                if not lignes:
+                    break
+                yield from starmap(classe, lignes)
+        finally:
+            cursor.close()
+
+    def lire_enregistrement(self, query, params=None, entite='Enregistrement'):
+        """
+        Récupérer un seul résultat d'une requête SELECT sous forme d'enregistrement
+
+        Returns:
+            Enregistrement: Première ligne du résultat, None si aucune
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            ligne = cursor.fetchone()
+            if ligne is None:
+                return None
+            return classe_enregistrement(entite, tuple(d[0] for d in cursor.description))(*ligne)
+        finally:
+            cursor.close()
 
     def log_action(self, action, utilisateur_id, details=""):
-        """Enregistrer une action dans le journal"""
-        query = """
-            INSERT INTO journal (action, date, utilisateur_id, details)
-            VALUES (?, ?, ?, ?)
         """
-        self.execute_query(query, (action, datetime.now().isoformat(), utilisateur_id, details))
+        Enregistrer une action dans le journal
+
+        Dans un bloc transaction(), l'entrée est écrite dans la transaction
+        en cours : elle est validée ou annulée avec l'opération. Hors
+        transaction, elle est confiée au tampon du journal, écrite par lots
+        en arrière-plan (JOURNAL_TAILLE_LOT, JOURNAL_DELAI_MAX) et au plus
+        tard par close_all.
+        """
+        date = datetime.now().isoformat()
+        if self._dans_transaction():
+            query = """
+                INSERT INTO journal (action, date, utilisateur_id, details)
+                VALUES (?, ?, ?, ?)
+            """
+            self.execute_query(query, (action, date, utilisateur_id, details))
+        else:
+            self.tampon_journal.ajouter(action, date, utilisateur_id, details)
 
 
 # Instance globale du gestionnaire de base de données
@@ -0,0 +1,121 @@
+"""
+Enregistrements compacts retournés par les modèles (à la place de dict)
+"""
+import keyword
+import sys
+import threading
+
+# Libellés issus des jointures, répétés d'une ligne à l'autre : une seule
+# chaîne en mémoire par valeur distincte (sys.intern)
+COLONNES_PARTAGEES = frozenset({'produit_nom', 'produit_code', 'categorie_nom', 'utilisateur_nom'})
+
+_classes = {}
+_verrou = threading.Lock()
+
+
+class Enregistrement:
+    """Ligne de résultat à attributs fixes (__slots__), accessible comme un dict
+
+    Les sous-classes sont générées par classe_enregistrement() pour chaque
+    jeu de colonnes : une instance ne porte que ses valeurs, sans dict par
+    ligne. L'accès enreg['colonne'], get(), keys(), items(), `in` et dict(enreg)
+    fonctionnent comme avec les dicts retournés auparavant ; seules les
+    colonnes existantes peuvent être modifiées.
+    """
+
+    __slots__ = ()
+    _champs = ()
+
+    def __getitem__(self, cle):
+        try:
+            return getattr(self, cle)
+        except (AttributeError, TypeError):
+            raise KeyError(cle) from None
+
+    def __setitem__(self, cle, valeur):
+        if cle not in self._champs:
+            raise KeyError(cle)
+        setattr(self, cle, valeur)
+
+    def __contains__(self, cle):
+        return cle in self._champs
+
+    def __iter__(self):
+        return iter(self._champs)
+
+    def __len__(self):
+        return len(self._champs)
+
+    def __eq__(self, autre):
+        if isinstance(autre, Enregistrement):
+            return self._champs == autre._champs and self.values() == autre.values()
+        if isinstance(autre, dict):
+            return self.en_dict() == autre
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        valeurs = ', '.join(f"{champ}={getattr(self, champ)!r}" for champ in self._champs)
+        return f"{type(self).__name__}({valeurs})"
+
+    def keys(self):
+        return self._champs
+
+    def values(self):
+        return [getattr(self, champ) for champ in self._champs]
+
+    def items(self):
+        return [(champ, getattr(self, champ)) for champ in self._champs]
+
+    def get(self, cle, defaut=None):
+        return getattr(self, cle, defaut) if cle in self._champs else defaut
+
+    def en_dict(self):
+        """Copie sous forme de dict (sérialisation, modification libre)"""
+        return dict(self.items())
+
+
+def classe_enregistrement(nom, colonnes):
+    """
+    Obtenir la classe d'enregistrement d'un jeu de colonnes
+
+    Les classes sont mises en cache : une requête exécutée plusieurs fois
+    réutilise la même classe.
+
+    Args:
+        nom (str): Nom de l'entité (Vente, Produit, ...), pour repr()
+        colonnes (tuple): Noms des colonnes, dans l'ordre du résultat
+
+    Returns:
+        type: Sous-classe d'Enregistrement construite par Classe(*ligne)
+    """
+    cle = (nom, colonnes)
+    classe = _classes.get(cle)
+    if classe is not None:
+        return classe
+
+    for colonne in colonnes:
+        if not colonne.isidentifier() or keyword.iskeyword(colonne) or colonne.startswith('_'):
+            raise ValueError(f"Colonne '{colonne}' : nommer l'expression avec un alias (AS ...)")
+    if len(set(colonnes)) != len(colonnes):
+        raise ValueError(f"Colonnes en double dans le résultat : {colonnes}")
+
+    # Constructeur positionnel généré, comme collections.namedtuple : une
+    # affectation d'attribut par colonne, sans boucle Python par ligne
+    parametres = ', '.join(f"_{i}" for i in range(len(colonnes)))
+    affectations = '\n'.join(
+        f"    self.{colonne} = _intern(_{i}) if _{i}.__class__ is str else _{i}"
+        if colonne in COLONNES_PARTAGEES else f"    self.{colonne} = _{i}"
+        for i, colonne in enumerate(colonnes)
+    ) or "    pass"
+    espace = {'_intern': sys.intern}
+    exec(f"def __init__(self, {parametres}):\n{affectations}", espace)
+
+    classe = type(nom, (Enregistrement,), {
+        '__slots__': colonnes,
+        '_champs': colonnes,
+        '__init__': espace['__init__'],
+    })
+    with _verrou:
+        return _classes.setdefault(cle, classe)
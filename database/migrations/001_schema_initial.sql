@@ -1,5 +1,6 @@
 -- Schéma de base de données pour l'application AGIB
 -- Base de données SQLite
+-- Les montants (prix, totaux) sont des entiers en centimes
 
 -- Table des catégories
 CREATE TABLE IF NOT EXISTS categories (
@@ -12,8 +13,8 @@ CREATE TABLE IF NOT EXISTS produits (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     nom TEXT NOT NULL,
     code TEXT UNIQUE NOT NULL,
-    prix_achat REAL NOT NULL,
-    prix_vente REAL NOT NULL,
+    prix_achat INTEGER NOT NULL,  -- centimes
+    prix_vente INTEGER NOT NULL,  -- centimes
     quantite INTEGER NOT NULL DEFAULT 0,
     categorie_id INTEGER,
     date_expiration TEXT,
@@ -47,8 +48,8 @@ CREATE TABLE IF NOT EXISTS ventes (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     produit_id INTEGER NOT NULL,
     quantite INTEGER NOT NULL,
-    prix_unitaire REAL NOT NULL,
-    montant_total REAL NOT NULL,
+    prix_unitaire INTEGER NOT NULL,  -- centimes
+    montant_total INTEGER NOT NULL,  -- centimes
     date TEXT NOT NULL,
     utilisateur_id INTEGER NOT NULL,
     FOREIGN KEY (produit_id) REFERENCES produits(id),
@@ -68,6 +69,7 @@ CREATE TABLE IF NOT EXISTS journal (
 -- Index pour améliorer les performances
 CREATE INDEX IF NOT EXISTS idx_produits_code ON produits(code);
 CREATE INDEX IF NOT EXISTS idx_produits_categorie ON produits(categorie_id);
+CREATE INDEX IF NOT EXISTS idx_produits_nom ON produits(nom);
 CREATE INDEX IF NOT EXISTS idx_ventes_date ON ventes(date);
 CREATE INDEX IF NOT EXISTS idx_achats_date ON achats(date);
 CREATE INDEX IF NOT EXISTS idx_journal_date ON journal(date);
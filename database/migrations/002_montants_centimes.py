@@ -0,0 +1,86 @@
+"""
+Montants REAL convertis en centimes entiers (INTEGER)
+
+SQLite ne sait pas changer le type d'une colonne : les tables produits et
+ventes sont recopiées dans des tables aux colonnes INTEGER puis renommées.
+Les tables de statistiques, dérivées des montants, sont supprimées ; la
+migration 004 les recrée et le démarrage les recalcule. Sans effet sur une
+base créée directement avec des montants entiers.
+"""
+
+
+def _montants_en_reel(conn):
+    colonnes = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(produits)")}
+    return colonnes.get('prix_achat', '').upper() == 'REAL'
+
+
+def appliquer(conn):
+    if not _montants_en_reel(conn):
+        return
+
+    conn.execute("""
+        CREATE TABLE produits_centimes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom TEXT NOT NULL,
+            code TEXT UNIQUE NOT NULL,
+            prix_achat INTEGER NOT NULL,
+            prix_vente INTEGER NOT NULL,
+            quantite INTEGER NOT NULL DEFAULT 0,
+            categorie_id INTEGER,
+            date_expiration TEXT,
+            date_creation TEXT NOT NULL,
+            FOREIGN KEY (categorie_id) REFERENCES categories(id)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO produits_centimes
+        SELECT id, nom, code, CAST(ROUND(prix_achat * 100) AS INTEGER),
+               CAST(ROUND(prix_vente * 100) AS INTEGER), quantite, categorie_id,
+               date_expiration, date_creation
+        FROM produits
+    """)
+    conn.execute("""
+        CREATE TABLE ventes_centimes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produit_id INTEGER NOT NULL,
+            quantite INTEGER NOT NULL,
+            prix_unitaire INTEGER NOT NULL,
+            montant_total INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            utilisateur_id INTEGER NOT NULL,
+            FOREIGN KEY (produit_id) REFERENCES produits(id),
+            FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO ventes_centimes
+        SELECT id, produit_id, quantite, CAST(ROUND(prix_unitaire * 100) AS INTEGER),
+               CAST(ROUND(montant_total * 100) AS INTEGER), date, utilisateur_id
+        FROM ventes
+    """)
+
+    # Conserver les compteurs AUTOINCREMENT (IDs de lignes supprimées)
+    sequences = conn.execute(
+        "SELECT name, seq FROM sqlite_sequence WHERE name IN ('produits', 'ventes')"
+    ).fetchall()
+
+    # Les triggers de categories référencent produits pendant qu'elle est
+    # remplacée : désactiver la vérification du schéma au renommage
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        for table in ('produits', 'ventes'):
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_centimes RENAME TO {table}")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+    for nom, seq in sequences:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, nom))
+
+    # Index supprimés avec les anciennes tables
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_produits_code ON produits(code)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_produits_categorie ON produits(categorie_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_produits_nom ON produits(nom)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventes_date ON ventes(date)")
+
+    conn.execute("DROP TABLE IF EXISTS resume_stock")
+    conn.execute("DROP TABLE IF EXISTS ventes_journalieres")
@@ -0,0 +1,84 @@
+"""
+Index de recherche plein texte des produits (FTS5, tokenizer trigram)
+
+L'index nécessite SQLite >= 3.34 compilé avec FTS5. Sinon la migration
+est tout de même enregistrée, sans index : la recherche se fait par LIKE
+et la création est retentée au démarrage (DatabaseManager.init_recherche).
+"""
+import sqlite3
+from database.migrations import executer_script
+
+SCRIPT = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS produits_fts USING fts5(
+        nom, code, categorie_nom,
+        tokenize = 'trigram'
+    );
+
+    -- Synchronisation avec la table produits
+    CREATE TRIGGER IF NOT EXISTS trg_produits_fts_insert AFTER INSERT ON produits
+    BEGIN
+        INSERT INTO produits_fts (rowid, nom, code, categorie_nom)
+        VALUES (new.id, new.nom, new.code, (SELECT nom FROM categories WHERE id = new.categorie_id));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_produits_fts_update AFTER UPDATE OF nom, code, categorie_id ON produits
+    BEGIN
+        UPDATE produits_fts
+        SET nom = new.nom,
+            code = new.code,
+            categorie_nom = (SELECT nom FROM categories WHERE id = new.categorie_id)
+        WHERE rowid = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_produits_fts_delete AFTER DELETE ON produits
+    BEGIN
+        DELETE FROM produits_fts WHERE rowid = old.id;
+    END;
+
+    -- Synchronisation avec la table categories
+    CREATE TRIGGER IF NOT EXISTS trg_categories_fts_update AFTER UPDATE OF nom ON categories
+    BEGIN
+        UPDATE produits_fts SET categorie_nom = new.nom
+        WHERE rowid IN (SELECT id FROM produits WHERE categorie_id = new.id);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_categories_fts_delete AFTER DELETE ON categories
+    BEGIN
+        UPDATE produits_fts SET categorie_nom = NULL
+        WHERE rowid IN (SELECT id FROM produits WHERE categorie_id = old.id);
+    END;
+"""
+
+
+def creer_index(conn):
+    """
+    Créer l'index, ses triggers de synchronisation, et l'alimenter
+
+    Args:
+        conn (sqlite3.Connection): Connexion en transaction
+
+    Returns:
+        bool: False si FTS5 ou le tokenizer trigram est indisponible
+    """
+    conn.execute("SAVEPOINT recherche")
+    try:
+        executer_script(conn, SCRIPT)
+    except sqlite3.OperationalError as e:
+        conn.execute("ROLLBACK TO recherche")
+        conn.execute("RELEASE recherche")
+        print(f"Index de recherche indisponible ({e}), recherche par LIKE")
+        return False
+    conn.execute("RELEASE recherche")
+
+    conn.execute("DELETE FROM produits_fts")
+    conn.execute("""
+        INSERT INTO produits_fts (rowid, nom, code, categorie_nom)
+        SELECT p.id, p.nom, p.code, c.nom
+        FROM produits p
+        LEFT JOIN categories c ON p.categorie_id = c.id
+    """)
+    return True
+
+
+def appliquer(conn):
+    creer_index(conn)
@@ -0,0 +1,80 @@
+-- Statistiques maintenues par triggers pour le tableau de bord
+-- Le tableau de bord lit une seule ligne au lieu de parcourir le catalogue
+
+-- Résumé du stock (une seule ligne, id = 1)
+CREATE TABLE IF NOT EXISTS resume_stock (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    nb_produits INTEGER NOT NULL DEFAULT 0,
+    valeur_stock INTEGER NOT NULL DEFAULT 0  -- centimes
+);
+
+-- Comptage des produits en stock faible par parcours d'index
+CREATE INDEX IF NOT EXISTS idx_produits_quantite ON produits(quantite);
+
+CREATE TRIGGER IF NOT EXISTS trg_resume_stock_insert AFTER INSERT ON produits
+BEGIN
+    UPDATE resume_stock
+    SET nb_produits = nb_produits + 1,
+        valeur_stock = valeur_stock + new.quantite * new.prix_achat
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_resume_stock_update AFTER UPDATE OF quantite, prix_achat ON produits
+BEGIN
+    UPDATE resume_stock
+    SET valeur_stock = valeur_stock - old.quantite * old.prix_achat + new.quantite * new.prix_achat
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_resume_stock_delete AFTER DELETE ON produits
+BEGIN
+    UPDATE resume_stock
+    SET nb_produits = nb_produits - 1,
+        valeur_stock = valeur_stock - old.quantite * old.prix_achat
+    WHERE id = 1;
+END;
+
+-- Cumul journalier des ventes par produit et par vendeur
+-- Les rapports sur une période lisent ce cumul plutôt que la table ventes
+CREATE TABLE IF NOT EXISTS ventes_journalieres (
+    jour TEXT NOT NULL,
+    produit_id INTEGER NOT NULL,
+    utilisateur_id INTEGER NOT NULL,
+    nb_ventes INTEGER NOT NULL DEFAULT 0,
+    quantite INTEGER NOT NULL DEFAULT 0,
+    chiffre_affaires INTEGER NOT NULL DEFAULT 0,  -- centimes
+    cout INTEGER NOT NULL DEFAULT 0,  -- centimes
+    PRIMARY KEY (jour, produit_id, utilisateur_id)
+) WITHOUT ROWID;
+
+-- Le coût retenu est le prix d'achat du produit au moment de la vente
+CREATE TRIGGER IF NOT EXISTS trg_ventes_journalieres_insert AFTER INSERT ON ventes
+BEGIN
+    INSERT INTO ventes_journalieres (jour, produit_id, utilisateur_id, nb_ventes, quantite, chiffre_affaires, cout)
+    VALUES (
+        substr(new.date, 1, 10), new.produit_id, new.utilisateur_id, 1, new.quantite, new.montant_total,
+        new.quantite * COALESCE((SELECT prix_achat FROM produits WHERE id = new.produit_id), 0)
+    )
+    ON CONFLICT (jour, produit_id, utilisateur_id) DO UPDATE SET
+        nb_ventes = nb_ventes + 1,
+        quantite = quantite + excluded.quantite,
+        chiffre_affaires = chiffre_affaires + excluded.chiffre_affaires,
+        cout = cout + excluded.cout;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ventes_journalieres_delete AFTER DELETE ON ventes
+BEGIN
+    UPDATE ventes_journalieres
+    SET nb_ventes = nb_ventes - 1,
+        quantite = quantite - old.quantite,
+        chiffre_affaires = chiffre_affaires - old.montant_total,
+        cout = cout - old.quantite * COALESCE((SELECT prix_achat FROM produits WHERE id = old.produit_id), 0)
+    WHERE jour = substr(old.date, 1, 10)
+      AND produit_id = old.produit_id
+      AND utilisateur_id = old.utilisateur_id;
+    DELETE FROM ventes_journalieres
+    WHERE jour = substr(old.date, 1, 10)
+      AND produit_id = old.produit_id
+      AND utilisateur_id = old.utilisateur_id
+      AND nb_ventes <= 0;
+END;
@@ -0,0 +1,99 @@
+-- Compteurs de modification par table, incrémentés par triggers
+-- Un résultat mis en cache (rapports, tableau de bord) reste valide tant que
+-- les compteurs des tables qu'il lit n'ont pas changé
+CREATE TABLE IF NOT EXISTS versions_donnees (
+    nom_table TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO versions_donnees (nom_table) VALUES
+    ('produits'),
+    ('categories'),
+    ('ventes'),
+    ('achats'),
+    ('journal'),
+    ('utilisateurs');
+
+-- produits
+CREATE TRIGGER IF NOT EXISTS trg_versions_produits_insert AFTER INSERT ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'produits';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_produits_update AFTER UPDATE ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'produits';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_produits_delete AFTER DELETE ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'produits';
+END;
+
+-- categories
+CREATE TRIGGER IF NOT EXISTS trg_versions_categories_insert AFTER INSERT ON categories
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_categories_update AFTER UPDATE ON categories
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_categories_delete AFTER DELETE ON categories
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'categories';
+END;
+
+-- ventes
+CREATE TRIGGER IF NOT EXISTS trg_versions_ventes_insert AFTER INSERT ON ventes
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'ventes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_ventes_update AFTER UPDATE ON ventes
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'ventes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_ventes_delete AFTER DELETE ON ventes
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'ventes';
+END;
+
+-- achats
+CREATE TRIGGER IF NOT EXISTS trg_versions_achats_insert AFTER INSERT ON achats
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'achats';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_achats_update AFTER UPDATE ON achats
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'achats';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_achats_delete AFTER DELETE ON achats
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'achats';
+END;
+
+-- journal
+CREATE TRIGGER IF NOT EXISTS trg_versions_journal_insert AFTER INSERT ON journal
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'journal';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_journal_update AFTER UPDATE ON journal
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'journal';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_journal_delete AFTER DELETE ON journal
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'journal';
+END;
+
+-- utilisateurs
+CREATE TRIGGER IF NOT EXISTS trg_versions_utilisateurs_insert AFTER INSERT ON utilisateurs
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'utilisateurs';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_utilisateurs_update AFTER UPDATE ON utilisateurs
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'utilisateurs';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_utilisateurs_delete AFTER DELETE ON utilisateurs
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'utilisateurs';
+END;
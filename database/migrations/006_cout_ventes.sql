@@ -0,0 +1,58 @@
+-- Coût unitaire (prix d'achat au moment de la vente) enregistré sur chaque vente
+-- La suppression d'une vente retire du cumul journalier le coût ajouté à sa
+-- création, même si le prix d'achat du produit a changé entre-temps
+ALTER TABLE ventes ADD COLUMN cout_unitaire INTEGER;  -- centimes
+
+-- Ventes existantes : faute d'historique, prix d'achat actuel (comme le recalcul complet)
+UPDATE ventes
+SET cout_unitaire = COALESCE((SELECT prix_achat FROM produits WHERE id = ventes.produit_id), 0);
+
+-- Ventes insérées sans coût (scripts, outils) : prix d'achat actuel du produit
+CREATE TRIGGER IF NOT EXISTS trg_ventes_cout_unitaire AFTER INSERT ON ventes
+WHEN new.cout_unitaire IS NULL
+BEGIN
+    UPDATE ventes
+    SET cout_unitaire = COALESCE((SELECT prix_achat FROM produits WHERE id = new.produit_id), 0)
+    WHERE id = new.id;
+END;
+
+DROP TRIGGER IF EXISTS trg_ventes_journalieres_insert;
+CREATE TRIGGER trg_ventes_journalieres_insert AFTER INSERT ON ventes
+BEGIN
+    INSERT INTO ventes_journalieres (jour, produit_id, utilisateur_id, nb_ventes, quantite, chiffre_affaires, cout)
+    VALUES (
+        substr(new.date, 1, 10), new.produit_id, new.utilisateur_id, 1, new.quantite, new.montant_total,
+        new.quantite * COALESCE(new.cout_unitaire, (SELECT prix_achat FROM produits WHERE id = new.produit_id), 0)
+    )
+    ON CONFLICT (jour, produit_id, utilisateur_id) DO UPDATE SET
+        nb_ventes = nb_ventes + 1,
+        quantite = quantite + excluded.quantite,
+        chiffre_affaires = chiffre_affaires + excluded.chiffre_affaires,
+        cout = cout + excluded.cout;
+END;
+
+DROP TRIGGER IF EXISTS trg_ventes_journalieres_delete;
+CREATE TRIGGER trg_ventes_journalieres_delete AFTER DELETE ON ventes
+BEGIN
+    UPDATE ventes_journalieres
+    SET nb_ventes = nb_ventes - 1,
+        quantite = quantite - old.quantite,
+        chiffre_affaires = chiffre_affaires - old.montant_total,
+        cout = cout - old.quantite * COALESCE(old.cout_unitaire, 0)
+    WHERE jour = substr(old.date, 1, 10)
+      AND produit_id = old.produit_id
+      AND utilisateur_id = old.utilisateur_id;
+    DELETE FROM ventes_journalieres
+    WHERE jour = substr(old.date, 1, 10)
+      AND produit_id = old.produit_id
+      AND utilisateur_id = old.utilisateur_id
+      AND nb_ventes <= 0;
+END;
+
+-- Cumul recalculé avec les coûts enregistrés ci-dessus
+DELETE FROM ventes_journalieres;
+INSERT INTO ventes_journalieres (jour, produit_id, utilisateur_id, nb_ventes, quantite, chiffre_affaires, cout)
+SELECT substr(date, 1, 10), produit_id, utilisateur_id,
+       COUNT(*), SUM(quantite), SUM(montant_total), SUM(quantite * cout_unitaire)
+FROM ventes
+GROUP BY substr(date, 1, 10), produit_id, utilisateur_id;
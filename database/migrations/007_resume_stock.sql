@@ -0,0 +1,5 @@
+-- Ligne unique du résumé du stock, calculée une fois ; les triggers de la
+-- migration 004 la tiennent ensuite à jour (plus de recalcul à chaque démarrage)
+INSERT OR REPLACE INTO resume_stock (id, nb_produits, valeur_stock)
+SELECT 1, COUNT(*), COALESCE(SUM(quantite * prix_achat), 0)
+FROM produits;
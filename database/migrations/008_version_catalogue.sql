@@ -0,0 +1,19 @@
+-- Compteur de la définition des produits (tout sauf la quantité)
+-- Les ventes et achats changent le compteur 'produits' mais pas celui-ci :
+-- l'index du catalogue en caisse n'est reconstruit que si un produit est
+-- créé, supprimé ou modifié, les stocks étant seulement relus
+INSERT OR IGNORE INTO versions_donnees (nom_table) VALUES ('catalogue');
+
+CREATE TRIGGER IF NOT EXISTS trg_versions_catalogue_insert AFTER INSERT ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'catalogue';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_catalogue_update
+AFTER UPDATE OF nom, code, prix_achat, prix_vente, categorie_id, date_expiration ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'catalogue';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_versions_catalogue_delete AFTER DELETE ON produits
+BEGIN
+    UPDATE versions_donnees SET version = version + 1 WHERE nom_table = 'catalogue';
+END;
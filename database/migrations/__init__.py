@@ -0,0 +1,169 @@
+"""
+Migrations versionnées du schéma de la base (PRAGMA user_version)
+
+Chaque migration est un fichier NNN_description.sql (script SQL) ou
+NNN_description.py (fonction appliquer(conn)) de ce dossier. La version
+de la base est le numéro de la dernière migration appliquée, conservé
+dans PRAGMA user_version : au démarrage, seules les migrations de numéro
+supérieur sont exécutées, chacune dans sa propre transaction avec la
+mise à jour de la version.
+
+Une migration publiée ne se modifie plus : toute évolution du schéma
+(index, table, colonne) fait l'objet d'un nouveau fichier.
+
+Utilisation en ligne de commande :
+    python -m database.migrations --statut
+    python -m database.migrations --simulation
+    python -m database.migrations --base /chemin/agib.db
+"""
+import importlib
+import os
+import re
+import sqlite3
+import time
+
+DOSSIER_MIGRATIONS = os.path.dirname(os.path.abspath(__file__))
+
+_RE_FICHIER = re.compile(r"^(\d{3})_(\w+)\.(sql|py)$")
+
+
+class Migration:
+    """Une migration : version, nom et moyen de l'appliquer"""
+
+    def __init__(self, version, nom, chemin):
+        self.version = version
+        self.nom = nom
+        self.chemin = chemin
+
+    @property
+    def description(self):
+        return self.nom.replace('_', ' ')
+
+    def appliquer(self, conn):
+        """Exécuter la migration sur une connexion déjà en transaction"""
+        if self.chemin.endswith('.sql'):
+            with open(self.chemin, 'r', encoding='utf-8') as f:
+                executer_script(conn, f.read())
+        else:
+            module = importlib.import_module(f"{__name__}.{self.version:03d}_{self.nom}")
+            module.appliquer(conn)
+
+
+def charger_migrations():
+    """
+    Lister les migrations du dossier, par version croissante
+
+    Returns:
+        list: Migrations
+
+    Raises:
+        ValueError: Si deux fichiers portent le même numéro
+    """
+    migrations = {}
+    for fichier in os.listdir(DOSSIER_MIGRATIONS):
+        correspondance = _RE_FICHIER.match(fichier)
+        if not correspondance:
+            continue
+        version = int(correspondance.group(1))
+        if version in migrations:
+            raise ValueError(f"Deux migrations portent le numéro {version:03d}")
+        migrations[version] = Migration(version, correspondance.group(2), os.path.join(DOSSIER_MIGRATIONS, fichier))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def version_courante(conn):
+    """Version du schéma de la base (0 pour une base vierge ou antérieure aux migrations)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrations_en_attente(conn):
+    """Migrations dont le numéro dépasse la version de la base"""
+    version = version_courante(conn)
+    return [m for m in charger_migrations() if m.version > version]
+
+
+def executer_script(conn, script):
+    """
+    Exécuter un script SQL instruction par instruction
+
+    Contrairement à executescript, qui valide la transaction en cours
+    avant de commencer, le script s'exécute dans la transaction de la
+    migration et peut être annulé avec elle. Les corps de triggers
+    (plusieurs « ; ») sont reconnus avec sqlite3.complete_statement.
+
+    Args:
+        conn (sqlite3.Connection): Connexion en transaction
+        script (str): Instructions SQL séparées par des « ; »
+    """
+    instruction = ''
+    for ligne in script.splitlines(keepends=True):
+        instruction += ligne
+        if sqlite3.complete_statement(instruction):
+            conn.execute(instruction)
+            instruction = ''
+    if instruction.strip():
+        conn.execute(instruction)  # Commentaires finaux, ou « incomplete input »
+
+
+def migrer(conn, simulation=False):
+    """
+    Appliquer les migrations en attente
+
+    Chaque migration s'exécute dans une transaction BEGIN IMMEDIATE qui
+    porte aussi la nouvelle valeur de user_version : une migration qui
+    échoue est annulée entièrement et les suivantes ne sont pas tentées.
+    Une autre caisse qui démarre en même temps attend le verrou puis
+    constate que la migration est déjà faite.
+
+    En simulation, toutes les migrations en attente s'exécutent dans une
+    seule transaction, annulée à la fin : la base n'est pas modifiée mais
+    les durées mesurées sont réelles.
+
+    Args:
+        conn (sqlite3.Connection): Connexion hors transaction
+        simulation (bool): Mesurer les migrations sans les conserver
+
+    Returns:
+        list: Dicts version, description, duree_ms des migrations exécutées
+    """
+    rapport = []
+    en_attente = migrations_en_attente(conn)
+    if not en_attente:
+        return rapport
+
+    if simulation:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for migration in en_attente:
+                rapport.append(_executer(conn, migration))
+        finally:
+            conn.rollback()
+        return rapport
+
+    for migration in en_attente:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version_courante(conn) >= migration.version:
+                conn.rollback()  # Appliquée entre-temps par un autre processus
+                continue
+            rapport.append(_executer(conn, migration))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return rapport
+
+
+def _executer(conn, migration):
+    debut = time.perf_counter()
+    try:
+        migration.appliquer(conn)
+    except sqlite3.Error as e:
+        raise sqlite3.OperationalError(f"Migration {migration.version:03d} ({migration.description}) : {e}") from e
+    # PRAGMA n'accepte pas de paramètre lié ; la version est un entier
+    conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+    return {
+        'version': migration.version,
+        'description': migration.description,
+        'duree_ms': (time.perf_counter() - debut) * 1000,
+    }
@@ -0,0 +1,58 @@
+"""
+Consulter, simuler ou appliquer les migrations du schéma
+
+Utilisation :
+    python -m database.migrations --statut
+    python -m database.migrations --simulation
+    python -m database.migrations --base /chemin/agib.db
+"""
+import argparse
+import os
+import sqlite3
+
+from config import DB_PATH, DB_TIMEOUT
+from database.migrations import charger_migrations, migrer, version_courante
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrations du schéma de la base AGIB")
+    parser.add_argument('--base', default=DB_PATH, help="Fichier SQLite (par défaut celui de l'application)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--statut', action='store_true', help="Lister les migrations appliquées et en attente")
+    mode.add_argument('--simulation', action='store_true',
+                      help="Exécuter les migrations en attente puis les annuler, pour mesurer leur durée")
+    args = parser.parse_args()
+
+    if (args.statut or args.simulation) and not os.path.exists(args.base):
+        parser.error(f"{args.base} n'existe pas")
+
+    conn = sqlite3.connect(args.base, timeout=DB_TIMEOUT)
+    try:
+        version = version_courante(conn)
+        migrations = charger_migrations()
+        print(f"Base {args.base} : version {version} (dernière migration disponible : "
+              f"{migrations[-1].version if migrations else 0})")
+
+        if args.statut:
+            for migration in migrations:
+                etat = "appliquée" if migration.version <= version else "en attente"
+                print(f"  {migration.version:03d}  {migration.description:<30} {etat}")
+            return
+
+        rapport = migrer(conn, simulation=args.simulation)
+        if not rapport:
+            print("Aucune migration en attente")
+            return
+        for etape in rapport:
+            print(f"  {etape['version']:03d}  {etape['description']:<30} {etape['duree_ms']:>10.1f} ms")
+        print(f"  Total : {sum(e['duree_ms'] for e in rapport):.1f} ms")
+        if args.simulation:
+            print("Simulation : migrations annulées, base inchangée")
+        else:
+            print(f"Base migrée en version {version_courante(conn)}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
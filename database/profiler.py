@@ -0,0 +1,283 @@
+"""
+Instrumentation des requêtes SQL (temps, lignes, appelants, requêtes lentes)
+"""
+import contextlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+# Nombre de durées conservées par requête pour le calcul du p95
+_ECHANTILLON_DUREES = 1000
+
+_DOSSIER_DATABASE = os.path.dirname(os.path.abspath(__file__))
+# Cadres ignorés pour trouver l'appelant (décorateur de db.transaction)
+_FICHIERS_IGNORES = {os.path.abspath(contextlib.__file__)}
+
+_RE_CHAINE = re.compile(r"'(?:[^']|'')*'")
+_RE_NOMBRE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_CAS = re.compile(r"(?:WHEN \? THEN \?\s*)+")
+_RE_ESPACES = re.compile(r"\s+")
+
+
+def normaliser(sql):
+    """
+    Réduire une requête à sa forme générique, clé des statistiques
+
+    Les littéraux deviennent ?, les listes de paramètres de longueur variable
+    (IN (?, ?, ...), CASE WHEN ? THEN ? ...) sont repliées.
+    """
+    sql = _RE_CHAINE.sub('?', sql)
+    sql = _RE_NOMBRE.sub('?', sql)
+    sql = _RE_ESPACES.sub(' ', sql).strip()
+    sql = _RE_LISTE.sub('(?, ...)', sql)
+    return _RE_CAS.sub('WHEN ? THEN ? ... ', sql)
+
+
+def _appelant():
+    """Premier cadre de pile hors du paquet database (fichier:ligne fonction)"""
+    cadre = sys._getframe(2)
+    while cadre is not None:
+        fichier = os.path.abspath(cadre.f_code.co_filename)
+        if os.path.dirname(fichier) != _DOSSIER_DATABASE and fichier not in _FICHIERS_IGNORES:
+            break
+        cadre = cadre.f_back
+    if cadre is None:
+        return '?'
+    fichier = os.path.relpath(cadre.f_code.co_filename, os.path.dirname(_DOSSIER_DATABASE))
+    return f"{fichier}:{cadre.f_lineno} {cadre.f_code.co_name}"
+
+
+class QueryProfiler:
+    """Statistiques d'exécution agrégées par requête normalisée
+
+    Désactivé, le profileur ne coûte qu'un test de booléen par curseur.
+    Activé, chaque instruction est chronométrée (exécution et lecture des
+    lignes), rattachée à son appelant, et celles qui dépassent le seuil sont
+    écrites dans le journal des requêtes lentes avec leur plan d'exécution.
+    """
+
+    def __init__(self, actif=False, seuil_lent_ms=50.0, fichier_lent=None):
+        self.actif = actif
+        self.seuil_lent_ms = seuil_lent_ms
+        self.fichier_lent = fichier_lent
+        self._stats = {}
+        self._verrou = threading.Lock()
+        self._journal_lent = None
+
+    def activer(self, actif=True):
+        """Activer ou désactiver l'instrumentation"""
+        self.actif = actif
+
+    def reinitialiser(self):
+        """Effacer les statistiques accumulées"""
+        with self._verrou:
+            self._stats = {}
+
+    def _logger_lent(self):
+        if self._journal_lent is None:
+            logger = logging.getLogger('agib.requetes_lentes')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            if self.fichier_lent and not logger.handlers:
+                handler = logging.FileHandler(self.fichier_lent, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                logger.addHandler(handler)
+            self._journal_lent = logger
+        return self._journal_lent
+
+    def enregistrer(self, mesure, conn):
+        """
+        Ajouter une exécution terminée aux statistiques
+
+        Args:
+            mesure (dict): sql, params, duree_ms, lignes, appelant, multiple
+            conn (sqlite3.Connection): Connexion utilisée, pour le plan d'exécution
+        """
+        cle = normaliser(mesure['sql'])
+        duree = mesure['duree_ms']
+        with self._verrou:
+            stats = self._stats.get(cle)
+            if stats is None:
+                stats = self._stats[cle] = {
+                    'nb': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'lignes': 0,
+                    'durees': deque(maxlen=_ECHANTILLON_DUREES), 'appelants': Counter(),
+                }
+            stats['nb'] += 1
+            stats['total_ms'] += duree
+            stats['max_ms'] = max(stats['max_ms'], duree)
+            stats['lignes'] += max(mesure['lignes'], 0)
+            stats['durees'].append(duree)
+            stats['appelants'][mesure['appelant']] += 1
+
+        if duree >= self.seuil_lent_ms:
+            self._journaliser_lente(cle, mesure, conn)
+
+    def _journaliser_lente(self, cle, mesure, conn):
+        plan = ''
+        if not mesure['multiple'] and cle.split(' ', 1)[0].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+            try:
+                # Curseur de base : le plan n'est pas lui-même instrumenté
+                lignes = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {mesure['sql']}", mesure['params']).fetchall()
+                plan = ' | '.join(str(ligne[-1]) for ligne in lignes)
+            except sqlite3.Error as e:
+                plan = f"(plan indisponible: {e})"
+        self._logger_lent().info(
+            f"{mesure['duree_ms']:.1f} ms, {mesure['lignes']} ligne(s), {mesure['appelant']}\n"
+            f"    {cle}\n    PLAN: {plan}"
+        )
+
+    def statistiques(self, tri='total_ms', limite=None):
+        """
+        Obtenir les statistiques agrégées par requête
+
+        Args:
+            tri (str): Clé de tri décroissant (total_ms, nb, p95_ms, max_ms, lignes)
+            limite (int, optional): Nombre maximum de requêtes retournées
+
+        Returns:
+            list: Dicts requete, nb, total_ms, moyenne_ms, p95_ms, max_ms, lignes, appelants
+        """
+        with self._verrou:
+            instantane = [(cle, dict(s, durees=sorted(s['durees']), appelants=s['appelants'].most_common(3)))
+                          for cle, s in self._stats.items()]
+        resultats = []
+        for cle, s in instantane:
+            durees = s['durees']
+            resultats.append({
+                'requete': cle,
+                'nb': s['nb'],
+                'total_ms': s['total_ms'],
+                'moyenne_ms': s['total_ms'] / s['nb'],
+                'p95_ms': durees[min(len(durees) - 1, int(len(durees) * 0.95))],
+                'max_ms': s['max_ms'],
+                'lignes': s['lignes'],
+                'appelants': s['appelants'],
+            })
+        resultats.sort(key=lambda r: r[tri], reverse=True)
+        return resultats[:limite] if limite else resultats
+
+
+class CurseurProfile(sqlite3.Cursor):
+    """Curseur qui chronomètre ses instructions quand le profileur est actif
+
+    La mesure couvre l'exécution et la lecture des lignes (fetch* ou
+    itération) ; elle est enregistrée quand le résultat est épuisé, à
+    l'instruction suivante ou à la fermeture du curseur.
+    """
+
+    _mesure = None
+
+    def _terminer(self):
+        mesure = self._mesure
+        if mesure is not None:
+            self._mesure = None
+            self.connection.profiler.enregistrer(mesure, self.connection)
+
+    def _executer(self, methode, sql, params, multiple):
+        profiler = self.connection.profiler
+        if not profiler.actif:
+            return methode(self, sql, params)
+        self._terminer()
+        appelant = _appelant()
+        debut = time.perf_counter()
+        try:
+            methode(self, sql, params)
+        finally:
+            duree = (time.perf_counter() - debut) * 1000
+            self._mesure = {'sql': sql, 'params': params, 'duree_ms': duree, 'lignes': self.rowcount,
+                            'appelant': appelant, 'multiple': multiple}
+        if self.description is None:
+            self._terminer()  # Pas de lignes à lire (INSERT, UPDATE, ...)
+        return self
+
+    def execute(self, sql, params=()):
+        return self._executer(sqlite3.Cursor.execute, sql, params, False)
+
+    def executemany(self, sql, params):
+        return self._executer(sqlite3.Cursor.executemany, sql, params, True)
+
+    def _lire(self, methode, *args):
+        mesure = self._mesure
+        if mesure is None:
+            return methode(self, *args)
+        debut = time.perf_counter()
+        resultat = methode(self, *args)
+        mesure['duree_ms'] += (time.perf_counter() - debut) * 1000
+        if isinstance(resultat, list):
+            mesure['lignes'] = max(mesure['lignes'], 0) + len(resultat)
+            if not resultat or methode is sqlite3.Cursor.fetchall:
+                self._terminer()
+        elif resultat is None:
+            self._terminer()
+        else:
+            mesure['lignes'] = max(mesure['lignes'], 0) + 1
+        return resultat
+
+    def fetchone(self):
+        return self._lire(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._lire(sqlite3.Cursor.fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._lire(sqlite3.Cursor.fetchall)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        mesure = self._mesure
+        if mesure is None:
+            return super().__next__()
+        debut = time.perf_counter()
+        try:
+            ligne = super().__next__()
+        except StopIteration:
+            mesure['duree_ms'] += (time.perf_counter() - debut) * 1000
+            self._terminer()
+            raise
+        mesure['duree_ms'] += (time.perf_counter() - debut) * 1000
+        mesure['lignes'] = max(mesure['lignes'], 0) + 1
+        return ligne
+
+    def close(self):
+        self._terminer()
+        super().close()
+
+    def __del__(self):
+        if self._mesure is not None:
+            try:
+                self._terminer()
+            except Exception:
+                pass
+
+
+class ConnexionProfilee(sqlite3.Connection):
+    """Connexion dont les curseurs sont instrumentés quand le profileur est actif
+
+    Profileur inactif, les curseurs créés sont des curseurs sqlite3 ordinaires :
+    seul l'appel à cursor() ou execute() passe par Python.
+    """
+
+    profiler = None
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = CurseurProfile if self.profiler.actif else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        if not self.profiler.actif:
+            return super().execute(sql, params)
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, params):
+        if not self.profiler.actif:
+            return super().executemany(sql, params)
+        return self.cursor().executemany(sql, params)
@@ -0,0 +1,110 @@
+"""
+Écriture différée et groupée des entrées du journal des opérations
+"""
+import threading
+import time
+import traceback
+
+_INSERTION = "INSERT INTO journal (action, date, utilisateur_id, details) VALUES (?, ?, ?, ?)"
+
+
+class TamponJournal:
+    """Entrées de journal en attente, écrites par lots par un thread dédié
+
+    Une entrée ajoutée hors transaction n'est pas validée seule : elle
+    rejoint un lot écrit en une transaction dès que taille_lot entrées
+    attendent, ou au plus tard delai secondes après la première. vider()
+    écrit immédiatement les entrées en attente ; arreter() le fait aussi
+    après avoir arrêté le thread, ce qui garantit qu'aucune entrée n'est
+    perdue à une fermeture normale. En cas d'arrêt brutal, seules les
+    entrées des dernières secondes peuvent manquer.
+    """
+
+    def __init__(self, db, taille_lot=100, delai=2.0):
+        self._db = db
+        self.taille_lot = taille_lot
+        self.delai = delai
+        self._entrees = []
+        self._condition = threading.Condition()
+        self._ecriture = threading.Lock()  # Un seul lot écrit à la fois
+        self._thread = None
+        self._arret = False
+
+    def ajouter(self, action, date, utilisateur_id, details):
+        """
+        Mettre une entrée en attente d'écriture
+
+        Args:
+            action (str): Type d'opération (VENTE, ACHAT, ...)
+            date (str): Date ISO de l'opération
+            utilisateur_id (int): ID de l'utilisateur
+            details (str): Description de l'opération
+        """
+        with self._condition:
+            self._entrees.append((action, date, utilisateur_id, details))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._boucle, name='agib-journal', daemon=True)
+                self._thread.start()
+            if len(self._entrees) >= self.taille_lot:
+                self._condition.notify()
+
+    def en_attente(self):
+        """Nombre d'entrées pas encore écrites"""
+        with self._condition:
+            return len(self._entrees)
+
+    def _boucle(self):
+        while True:
+            with self._condition:
+                while not self._entrees and not self._arret:
+                    self._condition.wait()
+                if self._arret:
+                    return  # arreter() écrit les entrées restantes
+                # Attendre un lot complet, sans dépasser le délai depuis la première entrée
+                limite = time.monotonic() + self.delai
+                while len(self._entrees) < self.taille_lot and not self._arret:
+                    reste = limite - time.monotonic()
+                    if reste <= 0:
+                        break
+                    self._condition.wait(reste)
+            try:
+                self.vider()
+            except Exception:
+                traceback.print_exc()
+                time.sleep(self.delai)  # Base verrouillée ou indisponible : réessayer plus tard
+
+    def vider(self):
+        """
+        Écrire immédiatement les entrées en attente, en une transaction
+
+        Les entrées sont remises en attente si l'écriture échoue.
+
+        Returns:
+            int: Nombre d'entrées écrites
+        """
+        with self._ecriture:
+            with self._condition:
+                lot, self._entrees = self._entrees, []
+            if not lot:
+                return 0
+            try:
+                with self._db.transaction() as conn:
+                    conn.executemany(_INSERTION, lot)
+            except BaseException:
+                with self._condition:
+                    self._entrees[:0] = lot
+                raise
+            return len(lot)
+
+    def arreter(self):
+        """Arrêter le thread d'écriture et écrire les entrées restantes"""
+        with self._condition:
+            thread = self._thread
+            self._arret = True
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._condition:
+            self._thread = None
+            self._arret = False
+        self.vider()
@@ -2,24 +2,37 @@
 Application AGIB - Gestion d'Inventaire pour Boutique
 Point d'entrée principal de l'application
 """
+import time
+_DEBUT = time.perf_counter()
+
 from kivymd.app import MDApp
-from kivy.uix.screenmanager import ScreenManager, NoTransition
+from kivy.uix.screenmanager import NoTransition
 from kivy.core.window import Window
 import os
 
-# Import des écrans
-from ui.login_screen import LoginScreen
-from ui.dashboard import DashboardScreen
-from ui.produits_screen import ProduitsScreen
-from ui.ventes_screen import VentesScreen
-from ui.achats_screen import AchatsScreen
-from ui.rapports_screen import RapportsScreen
-from ui.utilisateurs_screen import UtilisateursScreen
-from ui.rapport_vendeur_screen import RapportVendeurScreen
+from ui.gestionnaire_ecrans import GestionnaireEcrans
+from utils.background import worker
+_FIN_IMPORTS = time.perf_counter()
+
+from database.db_manager import db  # ouverture et migration de la base
+_FIN_BASE = time.perf_counter()
 
 # Chemin vers le dossier de l'application
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Écrans construits à la première navigation (module:Classe)
+ECRANS = [
+    ('login', 'ui.login_screen:LoginScreen'),
+    ('dashboard', 'ui.dashboard:DashboardScreen'),
+    ('produits', 'ui.produits_screen:ProduitsScreen'),
+    ('ventes', 'ui.ventes_screen:VentesScreen'),
+    ('achats', 'ui.achats_screen:AchatsScreen'),
+    ('rapports', 'ui.rapports_screen:RapportsScreen'),
+    ('utilisateurs', 'ui.utilisateurs_screen:UtilisateursScreen'),
+    ('rapport_vendeur', 'ui.rapport_vendeur_screen:RapportVendeurScreen'),
+    ('profilage', 'ui.profilage_screen:ProfilageScreen'),
+]
+
 class AGIBApp(MDApp):
     """Application principale AGIB"""
 
@@ -37,27 +50,37 @@ class AGIBApp(MDApp):
         Window.size = (800, 600)
 
         # Créer le gestionnaire d'écrans
-        sm = ScreenManager(transition=NoTransition())
-
-        # Ajouter tous les écrans
-        sm.add_widget(LoginScreen())
-        sm.add_widget(DashboardScreen())
-        sm.add_widget(ProduitsScreen())
-        sm.add_widget(VentesScreen())
-        sm.add_widget(AchatsScreen())
-        sm.add_widget(RapportsScreen())
-        sm.add_widget(UtilisateursScreen())
-        sm.add_widget(RapportVendeurScreen())
-
-        # Démarrer sur l'écran de connexion
+        sm = GestionnaireEcrans(transition=NoTransition())
+
+        # Enregistrer les écrans, construits à leur premier affichage
+        for nom, chemin in ECRANS:
+            sm.enregistrer(nom, chemin)
+
+        # Démarrer sur l'écran de connexion (seul écran construit)
         sm.current = 'login'
 
         return sm
 
+    def on_start(self):
+        """Appelé une fois l'application construite, avant le premier affichage"""
+        Window.bind(on_flip=self._premier_affichage)
+
+    def _premier_affichage(self, *args):
+        """Afficher les temps de démarrage une fois la première image rendue"""
+        Window.unbind(on_flip=self._premier_affichage)
+        fin = time.perf_counter()
+        print(
+            f"Démarrage : imports {(_FIN_IMPORTS - _DEBUT) * 1000:.0f} ms, "
+            f"base de données {(_FIN_BASE - _FIN_IMPORTS) * 1000:.0f} ms, "
+            f"premier affichage {(fin - _DEBUT) * 1000:.0f} ms"
+        )
+
     def on_stop(self):
         """Appelé lors de la fermeture de l'application"""
-        # Nettoyer les ressources si nécessaire
-        pass
+        # Terminer les travaux en arrière-plan avant de fermer le pool
+        worker.arreter()
+        # Écrire le journal en attente puis fermer les connexions persistantes du pool
+        db.close_all()
 
 
 if __name__ == '__main__':
@@ -4,6 +4,7 @@ Modèle Achat (entrées de stock)
 from datetime import datetime
 from database.db_manager import db
 from models.produit import Produit
+from config import TAILLE_PAGE_HISTORIQUE
 
 
 class Achat:
@@ -23,31 +24,36 @@ class Achat:
         Returns:
             int: ID du nouvel achat
         """
-        # Enregistrer l'achat
-        query = """
-            INSERT INTO achats (produit_id, quantite, date, fournisseur, utilisateur_id)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        achat_id = db.execute_query(query, (produit_id, quantite, datetime.now().isoformat(),
-                                            fournisseur, utilisateur_id))
-
-        # Mettre à jour le stock
-        Produit.ajuster_quantite(produit_id, quantite)
-
-        # Logger l'action
-        produit = Produit.obtenir_par_id(produit_id)
-        details = f"Achat: {produit['nom']} - Quantité: {quantite} - Fournisseur: {fournisseur}"
-        db.log_action("ACHAT", utilisateur_id, details)
+        # Achat, stock et journal validés ensemble, en une seule écriture disque
+        with db.transaction():
+            # Enregistrer l'achat
+            query = """
+                INSERT INTO achats (produit_id, quantite, date, fournisseur, utilisateur_id)
+                VALUES (?, ?, ?, ?, ?)
+            """
+            achat_id = db.execute_query(query, (produit_id, quantite, datetime.now().isoformat(),
+                                                fournisseur, utilisateur_id))
+
+            # Mettre à jour le stock
+            Produit.ajuster_quantite(produit_id, quantite)
+
+            # Logger l'action
+            produit = Produit.obtenir_par_id(produit_id)
+            details = f"Achat: {produit['nom']} - Quantité: {quantite} - Fournisseur: {fournisseur}"
+            db.log_action("ACHAT", utilisateur_id, details)
 
         return achat_id
 
     @staticmethod
-    def obtenir_tous():
+    def obtenir_tous(paresseux=False):
         """
         Obtenir tous les achats
 
+        Args:
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
+
         Returns:
-            list: Liste des achats
+            list: Liste des achats (itérateur si paresseux)
         """
         query = """
             SELECT a.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -56,19 +62,62 @@ class Achat:
             JOIN utilisateurs u ON a.utilisateur_id = u.id
             ORDER BY a.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query)]
+        return db.lire_enregistrements(query, entite='Achat', paresseux=paresseux)
+
+    @staticmethod
+    def obtenir_page(apres=None, limite=TAILLE_PAGE_HISTORIQUE):
+        """
+        Obtenir une page d'achats, du plus récent au plus ancien
+
+        Pagination par clé (date, id) : le coût d'une page ne dépend pas de
+        la taille de l'historique, contrairement à un OFFSET.
+
+        Args:
+            apres (tuple, optional): (date, id) du dernier achat de la page
+                précédente ; None pour la première page
+            limite (int): Nombre d'achats par page
+
+        Returns:
+            list: Liste des achats de la page
+        """
+        condition = "WHERE (a.date, a.id) < (?, ?)" if apres else ""
+        query = f"""
+            SELECT a.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
+            FROM achats a
+            JOIN produits p ON a.produit_id = p.id
+            JOIN utilisateurs u ON a.utilisateur_id = u.id
+            {condition}
+            ORDER BY a.date DESC, a.id DESC
+            LIMIT ?
+        """
+        params = (*apres, limite) if apres else (limite,)
+        return db.lire_enregistrements(query, params, 'Achat')
+
+    @staticmethod
+    def compter():
+        """
+        Compter tous les achats
+
+        Le résultat est mis en cache jusqu'au prochain achat enregistré.
+
+        Returns:
+            int: Nombre d'achats
+        """
+        query = "SELECT COUNT(*) FROM achats"
+        return db.cache.obtenir((query,), ('achats',), lambda: db.fetch_one(query)[0])
 
     @staticmethod
-    def obtenir_par_periode(date_debut, date_fin):
+    def obtenir_par_periode(date_debut, date_fin, paresseux=False):
         """
         Obtenir les achats pour une période donnée
 
         Args:
             date_debut (str): Date de début (ISO format)
             date_fin (str): Date de fin (ISO format)
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
 
         Returns:
-            list: Liste des achats
+            list: Liste des achats (itérateur si paresseux)
         """
         query = """
             SELECT a.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -78,18 +127,19 @@ class Achat:
             WHERE a.date BETWEEN ? AND ?
             ORDER BY a.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query, (date_debut, date_fin))]
+        return db.lire_enregistrements(query, (date_debut, date_fin), 'Achat', paresseux)
 
     @staticmethod
-    def obtenir_par_produit(produit_id):
+    def obtenir_par_produit(produit_id, paresseux=False):
         """
         Obtenir les achats pour un produit spécifique
 
         Args:
             produit_id (int): ID du produit
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
 
         Returns:
-            list: Liste des achats
+            list: Liste des achats (itérateur si paresseux)
         """
         query = """
             SELECT a.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -99,4 +149,4 @@ class Achat:
             WHERE a.produit_id = ?
             ORDER BY a.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query, (produit_id,))]
+        return db.lire_enregistrements(query, (produit_id,), 'Achat', paresseux)
@@ -59,7 +59,7 @@ class Categorie:
             list: Liste des catégories
         """
         query = "SELECT * FROM categories ORDER BY nom"
-        return [dict(row) for row in db.fetch_all(query)]
+        return db.lire_enregistrements(query, entite='Categorie')
 
     @staticmethod
     def obtenir_par_id(categorie_id):
@@ -73,5 +73,4 @@ class Categorie:
             dict: Informations de la catégorie
         """
         query = "SELECT * FROM categories WHERE id = ?"
-        result = db.fetch_one(query, (categorie_id,))
-        return dict(result) if result else None
+        return db.lire_enregistrement(query, (categorie_id,), 'Categorie')
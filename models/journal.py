@@ -0,0 +1,136 @@
+"""
+Modèle Journal (historique des opérations)
+"""
+from contextlib import closing
+from database.db_manager import db
+from config import TAILLE_PAGE_HISTORIQUE
+
+
+# Entrées d'une partition (base principale ou archive attachée) ; le nom
+# d'utilisateur vient toujours de la base principale
+_REQUETE_PARTITION = """
+    SELECT j.id, j.action, j.date, j.utilisateur_id, j.details, u.nom as utilisateur_nom
+    FROM {schema}.journal j
+    LEFT JOIN main.utilisateurs u ON j.utilisateur_id = u.id
+    {condition}
+    ORDER BY j.date DESC, j.id DESC
+"""
+_COMPTE_PARTITION = "SELECT COUNT(*) FROM {schema}.journal j {condition}"
+
+
+def _condition_periode(date_debut, date_fin):
+    """Clause WHERE (et paramètres) limitant les entrées à une période"""
+    conditions, params = [], []
+    if date_debut is not None:
+        conditions.append("j.date >= ?")
+        params.append(date_debut)
+    if date_fin is not None:
+        conditions.append("j.date <= ?")
+        params.append(date_fin)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def _partitions(date_debut=None, date_fin=None):
+    """
+    Schémas à lire pour une période, du plus récent au plus ancien
+
+    La base principale d'abord, puis chaque archive concernée, attachée
+    le temps de sa lecture : à fermer (closing) si le parcours est interrompu.
+
+    Yields:
+        str: 'main' puis l'alias de chaque archive attachée
+    """
+    yield 'main'
+    archives = db.archives_journal
+    for mois in archives.mois_periode(date_debut, date_fin):
+        with archives.attacher(mois) as alias:
+            yield alias
+
+
+class Journal:
+    """Classe pour consulter le journal des opérations
+
+    Les mois anciens sont archivés hors de la base principale
+    (database.archives_journal) : les lectures commencent par la base
+    principale puis n'attachent que les archives nécessaires.
+    """
+
+    @staticmethod
+    def obtenir_page(apres=None, limite=TAILLE_PAGE_HISTORIQUE, date_debut=None, date_fin=None):
+        """
+        Obtenir une page du journal, de l'entrée la plus récente à la plus ancienne
+
+        Pagination par clé (date, id) : le coût d'une page ne dépend pas de
+        la taille du journal, contrairement à un OFFSET. Une page qui
+        dépasse la base principale se poursuit dans les archives, en
+        commençant par le mois le plus récent.
+
+        Args:
+            apres (tuple, optional): (date, id) de la dernière entrée de la page
+                précédente ; None pour la première page
+            limite (int): Nombre d'entrées par page
+            date_debut (str, optional): Date ISO de début (incluse) ; sans limite si None
+            date_fin (str, optional): Date ISO de fin (incluse) ; sans limite si None
+
+        Returns:
+            list: Liste des entrées de la page
+        """
+        condition, params = _condition_periode(date_debut, date_fin)
+        if apres:
+            condition = f"{condition} AND (j.date, j.id) < (?, ?)" if condition else "WHERE (j.date, j.id) < (?, ?)"
+            params += apres
+        query = _REQUETE_PARTITION + "LIMIT ?"
+        entrees = db.lire_enregistrements(
+            query.format(schema='main', condition=condition), (*params, limite), 'Journal'
+        )
+
+        archives = db.archives_journal
+        for mois in archives.mois_periode(date_debut, apres[0] if apres else date_fin):
+            if len(entrees) >= limite:
+                break
+            with archives.attacher(mois) as alias:
+                entrees += db.lire_enregistrements(
+                    query.format(schema=alias, condition=condition),
+                    (*params, limite - len(entrees)), 'Journal'
+                )
+        return entrees
+
+    @staticmethod
+    def obtenir_periode(date_debut=None, date_fin=None):
+        """
+        Parcourir les entrées du journal entre deux dates, des plus récentes aux plus anciennes
+
+        Seules les archives des mois recoupant la période sont attachées,
+        une à la fois. Les entrées sont lues par lots : à parcourir dans le
+        thread appelant.
+
+        Args:
+            date_debut (str, optional): Date ISO de début (incluse) ; sans limite si None
+            date_fin (str, optional): Date ISO de fin (incluse) ; sans limite si None
+
+        Yields:
+            Enregistrement: Entrées du journal (avec utilisateur_nom)
+        """
+        condition, params = _condition_periode(date_debut, date_fin)
+        with closing(_partitions(date_debut, date_fin)) as partitions:
+            for schema in partitions:
+                yield from db.lire_enregistrements(
+                    _REQUETE_PARTITION.format(schema=schema, condition=condition), params, 'Journal', paresseux=True
+                )
+
+    @staticmethod
+    def compter_periode(date_debut=None, date_fin=None):
+        """
+        Compter les entrées du journal entre deux dates, archives comprises
+
+        Args:
+            date_debut (str, optional): Date ISO de début (incluse) ; sans limite si None
+            date_fin (str, optional): Date ISO de fin (incluse) ; sans limite si None
+
+        Returns:
+            int: Nombre d'entrées
+        """
+        condition, params = _condition_periode(date_debut, date_fin)
+        with closing(_partitions(date_debut, date_fin)) as partitions:
+            return sum(db.fetch_one(_COMPTE_PARTITION.format(schema=schema, condition=condition), params)[0]
+                       for schema in partitions)
@@ -6,6 +6,16 @@ import time
 from database.db_manager import db
 
 
+class StockInsuffisantError(ValueError):
+    """Levée quand une vente demande plus que le stock disponible"""
+
+    def __init__(self, produit_id, nom, disponible):
+        super().__init__(f"Stock insuffisant pour {nom}. Disponible: {disponible}")
+        self.produit_id = produit_id
+        self.nom = nom
+        self.disponible = disponible
+
+
 class Produit:
     """Classe pour gérer les produits"""
 
@@ -26,8 +36,8 @@ class Produit:
 
         Args:
             nom (str): Nom du produit
-            prix_achat (float): Prix d'achat
-            prix_vente (float): Prix de vente
+            prix_achat (int): Prix d'achat en centimes
+            prix_vente (int): Prix de vente en centimes
             quantite (int): Quantité en stock
             categorie_id (int, optional): ID de la catégorie
             date_expiration (str, optional): Date d'expiration
@@ -53,8 +63,8 @@ class Produit:
             produit_id (int): ID du produit
             nom (str): Nom du produit
             code (str): Code unique du produit (non modifiable ici)
-            prix_achat (float): Prix d'achat
-            prix_vente (float): Prix de vente
+            prix_achat (int): Prix d'achat en centimes
+            prix_vente (int): Prix de vente en centimes
             quantite (int): Quantité en stock
             categorie_id (int, optional): ID de la catégorie
             date_expiration (str, optional): Date d'expiration
@@ -99,7 +109,32 @@ class Produit:
             LEFT JOIN categories c ON p.categorie_id = c.id
             ORDER BY p.nom
         """
-        return [dict(row) for row in db.fetch_all(query)]
+        return db.lire_enregistrements(query, entite='Produit')
+
+    @staticmethod
+    def versions_catalogue():
+        """
+        Compteurs de modification utiles à l'index du catalogue (versions_donnees)
+
+        Toute écriture, depuis cette caisse ou une autre, change la valeur
+        correspondante.
+
+        Returns:
+            tuple: (version de la définition des produits et catégories,
+                version des produits, quantités comprises)
+        """
+        catalogue, categories, produits = db.cache.versions(('catalogue', 'categories', 'produits'))
+        return (catalogue, categories), produits
+
+    @staticmethod
+    def obtenir_quantites():
+        """
+        Obtenir le stock de tous les produits
+
+        Returns:
+            dict: Quantité par ID de produit
+        """
+        return dict(db.fetch_all("SELECT id, quantite FROM produits"))
 
     @staticmethod
     def obtenir_par_id(produit_id):
@@ -118,29 +153,58 @@ class Produit:
             LEFT JOIN categories c ON p.categorie_id = c.id
             WHERE p.id = ?
         """
-        result = db.fetch_one(query, (produit_id,))
-        return dict(result) if result else None
+        return db.lire_enregistrement(query, (produit_id,), 'Produit')
 
     @staticmethod
-    def rechercher(terme):
+    def rechercher(terme, limite=None):
         """
-        Rechercher des produits par nom ou code
+        Rechercher des produits par nom, code ou catégorie
+
+        Utilise l'index plein texte produits_fts (trigrammes) : les résultats
+        sont classés par pertinence, un code identique au terme en premier.
+        Les mots de moins de 3 caractères sont filtrés par LIKE sur les
+        candidats de l'index.
 
         Args:
             terme (str): Terme de recherche
+            limite (int, optional): Nombre maximum de résultats
 
         Returns:
             list: Liste des produits correspondants
         """
-        query = """
+        terme = terme.strip()
+        mots = terme.split()
+        mots_indexables = [m for m in mots if len(m) >= 3]
+        limite_sql = -1 if limite is None else limite  # LIMIT -1 : pas de limite
+
+        if not db.fts_disponible or not mots_indexables:
+            query = """
+                SELECT p.*, c.nom as categorie_nom
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.id
+                WHERE p.nom LIKE ? OR p.code LIKE ?
+                ORDER BY p.nom
+                LIMIT ?
+            """
+            terme_like = f"%{terme}%"
+            return db.lire_enregistrements(query, (terme_like, terme_like, limite_sql), 'Produit')
+
+        # Chaque mot est une phrase FTS (guillemets doublés pour l'échapper)
+        match = ' AND '.join('"' + m.replace('"', '""') + '"' for m in mots_indexables)
+        filtres = ''.join(" AND (p.nom LIKE ? OR p.code LIKE ? OR c.nom LIKE ?)" for m in mots if len(m) < 3)
+        params_filtres = [f"%{m}%" for m in mots if len(m) < 3 for _ in range(3)]
+
+        query = f"""
             SELECT p.*, c.nom as categorie_nom
-            FROM produits p
+            FROM produits_fts f
+            JOIN produits p ON p.id = f.rowid
             LEFT JOIN categories c ON p.categorie_id = c.id
-            WHERE p.nom LIKE ? OR p.code LIKE ?
-            ORDER BY p.nom
+            WHERE produits_fts MATCH ?{filtres}
+            ORDER BY (p.code = ?) DESC, f.rank, p.nom
+            LIMIT ?
         """
-        terme_like = f"%{terme}%"
-        return [dict(row) for row in db.fetch_all(query, (terme_like, terme_like))]
+        params = [match] + params_filtres + [terme, limite_sql]
+        return db.lire_enregistrements(query, params, 'Produit')
 
     @staticmethod
     def obtenir_stock_faible(seuil):
@@ -160,7 +224,7 @@ class Produit:
             WHERE p.quantite <= ?
             ORDER BY p.quantite ASC
         """
-        return [dict(row) for row in db.fetch_all(query, (seuil,))]
+        return db.lire_enregistrements(query, (seuil,), 'Produit')
 
     @staticmethod
     def mettre_a_jour_quantite(produit_id, nouvelle_quantite):
@@ -191,3 +255,30 @@ class Produit:
         """
         query = "UPDATE produits SET quantite = quantite + ? WHERE id = ?"
         return db.execute_query(query, (delta, produit_id))
+
+    @staticmethod
+    def verifier_stock(conn, demandes):
+        """
+        Identifier la cause de l'échec d'un retrait de stock conditionnel
+
+        Appelée après un UPDATE ... WHERE quantite >= ? qui n'a pas modifié
+        toutes les lignes attendues ; lève l'erreur correspondante.
+
+        Args:
+            conn (sqlite3.Connection): Connexion de la transaction en cours
+            demandes (dict): Quantité demandée par ID de produit non modifié
+
+        Raises:
+            ValueError: Produit introuvable
+            StockInsuffisantError: Stock inférieur à la quantité demandée
+        """
+        placeholders = ','.join('?' * len(demandes))
+        produits = {row['id']: row for row in conn.execute(
+            f"SELECT id, nom, quantite FROM produits WHERE id IN ({placeholders})", list(demandes)
+        )}
+        for produit_id, quantite in demandes.items():
+            produit = produits.get(produit_id)
+            if not produit:
+                raise ValueError("Produit introuvable")
+            if produit['quantite'] < quantite:
+                raise StockInsuffisantError(produit_id, produit['nom'], produit['quantite'])
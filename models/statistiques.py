@@ -0,0 +1,40 @@
+"""
+Statistiques agrégées (tableau de bord)
+"""
+from database.db_manager import db
+
+
+class Statistiques:
+    """Classe pour obtenir les indicateurs du tableau de bord"""
+
+    @staticmethod
+    def obtenir_tableau_de_bord(date, seuil):
+        """
+        Obtenir les indicateurs du tableau de bord en une seule requête
+
+        Le nombre de produits et la valeur du stock proviennent du résumé
+        tenu à jour par triggers, le total du jour du cumul journalier des
+        ventes ; le stock faible est compté par parcours d'index. Le
+        résultat est repris du cache tant que produits et ventes n'ont pas
+        été modifiés.
+
+        Args:
+            date (str): Date des ventes (format YYYY-MM-DD)
+            seuil (int): Seuil de stock faible
+
+        Returns:
+            dict: nb_produits, valeur_stock, nb_stock_faible, total_ventes_jour (montants en centimes)
+        """
+        query = """
+            SELECT r.nb_produits,
+                   r.valeur_stock,
+                   (SELECT COUNT(*) FROM produits WHERE quantite <= ?) as nb_stock_faible,
+                   (SELECT COALESCE(SUM(chiffre_affaires), 0) FROM ventes_journalieres
+                    WHERE jour = ?) as total_ventes_jour
+            FROM resume_stock r
+            WHERE r.id = 1
+        """
+        return db.cache.obtenir(
+            (query, seuil, date), ('produits', 'ventes'),
+            lambda: db.lire_enregistrement(query, (seuil, date), 'TableauDeBord')
+        )
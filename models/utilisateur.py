@@ -1,9 +1,20 @@
 """
 Modèle Utilisateur
 """
+import math
 from datetime import datetime
 from database.db_manager import db
-from utils.security import hash_password, verify_password
+from utils.security import (hash_password, verify_password, doit_rehacher, verifier_factice,
+                            limiteur_connexions)
+
+
+class ConnexionBloqueeError(Exception):
+    """Levée quand trop d'échecs récents imposent d'attendre avant une nouvelle tentative"""
+
+    def __init__(self, nom, attente):
+        super().__init__(f"Trop de tentatives pour {nom}. Réessayez dans {math.ceil(attente)} s")
+        self.nom = nom
+        self.attente = attente
 
 
 class Utilisateur:
@@ -14,19 +25,86 @@ class Utilisateur:
         """
         Authentifier un utilisateur
 
+        Le hachage bcrypt prend une fraction de seconde : à appeler hors du
+        thread de l'interface. Un nom inconnu coûte une vérification comme
+        un mauvais mot de passe ; les échecs répétés imposent une attente
+        croissante. N'écrit pas en base : la tentative est confiée au
+        tampon du journal, et un mot de passe haché avec un autre coût que
+        BCRYPT_ROUNDS est re-haché ensuite par rehacher(), à soumettre au
+        thread d'écriture.
+
         Args:
             nom (str): Nom d'utilisateur
             mot_de_passe (str): Mot de passe
 
         Returns:
             dict: Informations utilisateur si authentification réussie, None sinon
+
+        Raises:
+            ConnexionBloqueeError: Si l'utilisateur doit encore attendre après des échecs
         """
+        attente = limiteur_connexions.attente_restante(nom)
+        if attente > 0:
+            raise ConnexionBloqueeError(nom, attente)
+
         query = "SELECT * FROM utilisateurs WHERE nom = ?"
-        user = db.fetch_one(query, (nom,))
+        user = db.lire_enregistrement(query, (nom,), 'Utilisateur')
+
+        if user is None:
+            verifier_factice(mot_de_passe)
+            limiteur_connexions.echec(nom)
+            db.log_action("ECHEC_CONNEXION", None, f"Utilisateur inconnu: {nom}")
+            return None
+        if not verify_password(mot_de_passe, user['mot_de_passe']):
+            limiteur_connexions.echec(nom)
+            db.log_action("ECHEC_CONNEXION", user['id'], f"Mot de passe incorrect: {nom}")
+            return None
+
+        limiteur_connexions.reussite(nom)
+        db.log_action("CONNEXION", user['id'], f"Connexion: {nom}")
+        return user
 
-        if user and verify_password(mot_de_passe, user['mot_de_passe']):
-            return dict(user)
-        return None
+    @staticmethod
+    def deconnecter(user):
+        """
+        Journaliser la déconnexion d'un utilisateur
+
+        L'entrée passe par le tampon du journal : aucune écriture en base
+        depuis le thread de l'interface.
+
+        Args:
+            user (dict): Utilisateur connecté
+        """
+        db.log_action("DECONNEXION", user['id'], f"Déconnexion: {user['nom']}")
+
+    @staticmethod
+    def doit_rehacher(user):
+        """Indiquer si le mot de passe d'un utilisateur connecté doit être re-haché"""
+        return doit_rehacher(user['mot_de_passe'])
+
+    @staticmethod
+    def rehacher(user, mot_de_passe):
+        """
+        Re-hacher le mot de passe d'un utilisateur au coût BCRYPT_ROUNDS
+
+        Écrit en base : à soumettre au thread d'écriture
+        (worker.soumettre(..., ecriture=True)) après authentifier().
+
+        Args:
+            user (dict): Utilisateur retourné par authentifier
+            mot_de_passe (str): Mot de passe vérifié
+
+        Returns:
+            bool: True si le hash a été remplacé
+        """
+        nouveau = hash_password(mot_de_passe)
+        # Sans effet si le mot de passe a été modifié entre-temps
+        with db.transaction() as conn:
+            modifies = conn.execute(
+                "UPDATE utilisateurs SET mot_de_passe = ? WHERE id = ? AND mot_de_passe = ?",
+                (nouveau, user['id'], user['mot_de_passe'])
+            ).rowcount
+        return modifies == 1
 
     @staticmethod
     def creer(nom, role, mot_de_passe):
@@ -73,7 +151,7 @@ class Utilisateur:
             list: Liste des utilisateurs
         """
         query = "SELECT id, nom, role, date_creation FROM utilisateurs ORDER BY nom"
-        return [dict(row) for row in db.fetch_all(query)]
+        return db.lire_enregistrements(query, entite='Utilisateur')
 
     @staticmethod
     def obtenir_par_id(utilisateur_id):
@@ -87,8 +165,7 @@ class Utilisateur:
             dict: Informations de l'utilisateur
         """
         query = "SELECT id, nom, role, date_creation FROM utilisateurs WHERE id = ?"
-        result = db.fetch_one(query, (utilisateur_id,))
-        return dict(result) if result else None
+        return db.lire_enregistrement(query, (utilisateur_id,), 'Utilisateur')
 
     @staticmethod
     def supprimer(utilisateur_id):
@@ -4,6 +4,8 @@ Modèle Vente (sorties de stock)
 from datetime import datetime
 from database.db_manager import db
 from models.produit import Produit
+from utils.monnaie import formater_montant
+from config import TAILLE_PAGE_HISTORIQUE
 
 
 class Vente:
@@ -17,47 +19,114 @@ class Vente:
         Args:
             produit_id (int): ID du produit
             quantite (int): Quantité vendue
-            prix_unitaire (float): Prix unitaire de vente
+            prix_unitaire (int): Prix unitaire de vente en centimes
             utilisateur_id (int): ID de l'utilisateur
 
         Returns:
             int: ID de la nouvelle vente
         """
-        # Vérifier le stock disponible
-        produit = Produit.obtenir_par_id(produit_id)
-        if not produit:
-            raise ValueError("Produit introuvable")
+        # Calculer le montant total (centimes : produit exact)
+        montant_total = quantite * prix_unitaire
 
-        if produit['quantite'] < quantite:
-            raise ValueError(f"Stock insuffisant. Disponible: {produit['quantite']}")
+        with db.transaction() as conn:
+            # Retirer le stock seulement s'il est suffisant : le contrôle et la
+            # mise à jour forment une seule instruction, sans course entre caisses
+            produit = conn.execute(
+                "UPDATE produits SET quantite = quantite - ? WHERE id = ? AND quantite >= ? RETURNING nom, prix_achat",
+                (quantite, produit_id, quantite)
+            ).fetchone()
+            if produit is None:
+                Produit.verifier_stock(conn, {produit_id: quantite})
 
-        # Calculer le montant total
-        montant_total = quantite * prix_unitaire
+            # Enregistrer la vente, avec le prix d'achat du moment (coût de la vente)
+            query = """
+                INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id, cout_unitaire)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            vente_id = db.execute_query(query, (produit_id, quantite, prix_unitaire, montant_total,
+                                                datetime.now().isoformat(), utilisateur_id, produit['prix_achat']))
 
-        # Enregistrer la vente
-        query = """
-            INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id)
-            VALUES (?, ?, ?, ?, ?, ?)
+            # Logger l'action
+            details = f"Vente: {produit['nom']} - Quantité: {quantite} - Montant: {formater_montant(montant_total)}"
+            db.log_action("VENTE", utilisateur_id, details)
+
+        return vente_id
+
+    @staticmethod
+    def creer_panier(lignes, utilisateur_id):
+        """
+        Enregistrer toutes les lignes d'un panier en une seule transaction
+
+        Le stock est retiré par une mise à jour conditionnelle unique ; si un
+        produit manque, la transaction est annulée et aucune vente n'est
+        enregistrée.
+
+        Args:
+            lignes (list): Lignes du panier, chacune un dict avec
+                'produit_id', 'quantite' et 'prix_unitaire' (centimes)
+            utilisateur_id (int): ID de l'utilisateur
+
+        Returns:
+            list: IDs des ventes créées, dans l'ordre des lignes
         """
-        vente_id = db.execute_query(query, (produit_id, quantite, prix_unitaire, montant_total,
-                                            datetime.now().isoformat(), utilisateur_id))
+        if not lignes:
+            raise ValueError("Le panier est vide")
 
-        # Mettre à jour le stock (retirer la quantité)
-        Produit.ajuster_quantite(produit_id, -quantite)
+        # Quantités demandées par produit (un produit peut figurer sur plusieurs lignes)
+        demandes = {}
+        for ligne in lignes:
+            demandes[ligne['produit_id']] = demandes.get(ligne['produit_id'], 0) + ligne['quantite']
 
-        # Logger l'action
-        details = f"Vente: {produit['nom']} - Quantité: {quantite} - Montant: {montant_total}"
-        db.log_action("VENTE", utilisateur_id, details)
+        produit_ids = list(demandes)
+        placeholders = ','.join('?' * len(produit_ids))
+        date = datetime.now().isoformat()
 
-        return vente_id
+        with db.transaction() as conn:
+            # Retirer les quantités de tous les produits en une seule instruction,
+            # uniquement pour les produits dont le stock suffit
+            cas = ' '.join('WHEN ? THEN ?' for _ in produit_ids)
+            params = [v for produit_id in produit_ids for v in (produit_id, demandes[produit_id])]
+            retires = {row['id']: row for row in conn.execute(f"""
+                UPDATE produits SET quantite = quantite - CASE id {cas} END
+                WHERE id IN ({placeholders}) AND quantite >= CASE id {cas} END
+                RETURNING id, nom, prix_achat
+            """, params + produit_ids + params)}
+            if len(retires) < len(produit_ids):
+                # Au moins un produit manquant : annuler tout le panier (les
+                # produits déjà retirés ci-dessus sont restaurés par le rollback)
+                Produit.verifier_stock(conn, {pid: q for pid, q in demandes.items() if pid not in retires})
+
+            # Enregistrer toutes les ventes, avec le prix d'achat du moment
+            ventes = [
+                (l['produit_id'], l['quantite'], l['prix_unitaire'], l['quantite'] * l['prix_unitaire'], date, utilisateur_id,
+                 retires[l['produit_id']]['prix_achat'])
+                for l in lignes
+            ]
+            conn.executemany("""
+                INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id, cout_unitaire)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, ventes)
+            # Le verrou d'écriture est détenu : les IDs attribués sont consécutifs
+            dernier_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+            # Une seule entrée de journal pour le panier
+            montant_total = sum(v[3] for v in ventes)
+            articles = ', '.join(f"{retires[l['produit_id']]['nom']} x{l['quantite']}" for l in lignes)
+            details = f"Vente panier: {len(lignes)} article(s) - Montant: {formater_montant(montant_total)} - {articles}"
+            db.log_action("VENTE", utilisateur_id, details)
+
+        return list(range(dernier_id - len(lignes) + 1, dernier_id + 1))
 
     @staticmethod
-    def obtenir_toutes():
+    def obtenir_toutes(paresseux=False):
         """
         Obtenir toutes les ventes
 
+        Args:
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
+
         Returns:
-            list: Liste des ventes
+            list: Liste des ventes (itérateur si paresseux)
         """
         query = """
             SELECT v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -66,19 +135,49 @@ class Vente:
             JOIN utilisateurs u ON v.utilisateur_id = u.id
             ORDER BY v.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query)]
+        return db.lire_enregistrements(query, entite='Vente', paresseux=paresseux)
+
+    @staticmethod
+    def obtenir_page(apres=None, limite=TAILLE_PAGE_HISTORIQUE):
+        """
+        Obtenir une page de ventes, de la plus récente à la plus ancienne
+
+        Pagination par clé (date, id) : le coût d'une page ne dépend pas de
+        la taille de l'historique, contrairement à un OFFSET.
+
+        Args:
+            apres (tuple, optional): (date, id) de la dernière vente de la page
+                précédente ; None pour la première page
+            limite (int): Nombre de ventes par page
+
+        Returns:
+            list: Liste des ventes de la page
+        """
+        condition = "WHERE (v.date, v.id) < (?, ?)" if apres else ""
+        query = f"""
+            SELECT v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
+            FROM ventes v
+            JOIN produits p ON v.produit_id = p.id
+            JOIN utilisateurs u ON v.utilisateur_id = u.id
+            {condition}
+            ORDER BY v.date DESC, v.id DESC
+            LIMIT ?
+        """
+        params = (*apres, limite) if apres else (limite,)
+        return db.lire_enregistrements(query, params, 'Vente')
 
     @staticmethod
-    def obtenir_par_periode(date_debut, date_fin):
+    def obtenir_par_periode(date_debut, date_fin, paresseux=False):
         """
         Obtenir les ventes pour une période donnée
 
         Args:
             date_debut (str): Date de début (ISO format)
             date_fin (str): Date de fin (ISO format)
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
 
         Returns:
-            list: Liste des ventes
+            list: Liste des ventes (itérateur si paresseux)
         """
         query = """
             SELECT v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -88,7 +187,31 @@ class Vente:
             WHERE v.date BETWEEN ? AND ?
             ORDER BY v.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query, (date_debut, date_fin))]
+        return db.lire_enregistrements(query, (date_debut, date_fin), 'Vente', paresseux)
+
+    @staticmethod
+    def obtenir_par_ids(ventes_ids):
+        """
+        Obtenir des ventes précises (par exemple celles d'un panier validé)
+
+        Args:
+            ventes_ids (list): IDs des ventes
+
+        Returns:
+            list: Liste des ventes, de la plus récente à la plus ancienne
+        """
+        if not ventes_ids:
+            return []
+        placeholders = ','.join('?' * len(ventes_ids))
+        query = f"""
+            SELECT v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
+            FROM ventes v
+            JOIN produits p ON v.produit_id = p.id
+            JOIN utilisateurs u ON v.utilisateur_id = u.id
+            WHERE v.id IN ({placeholders})
+            ORDER BY v.date DESC, v.id DESC
+        """
+        return db.lire_enregistrements(query, list(ventes_ids), 'Vente')
 
     @staticmethod
     def obtenir_par_jour(date):
@@ -114,28 +237,81 @@ class Vente:
             date (str): Date (format YYYY-MM-DD)
 
         Returns:
-            float: Total des ventes
+            int: Total des ventes en centimes
+        """
+        return Vente.calculer_total_periode(date, date)
+
+    @staticmethod
+    def calculer_total_periode(jour_debut, jour_fin):
+        """
+        Calculer le total des ventes sur une période, à partir du cumul journalier
+
+        Args:
+            jour_debut (str): Premier jour inclus (format YYYY-MM-DD)
+            jour_fin (str): Dernier jour inclus (format YYYY-MM-DD)
+
+        Returns:
+            int: Total des ventes en centimes
         """
-        date_debut = f"{date}T00:00:00"
-        date_fin = f"{date}T23:59:59"
         query = """
-            SELECT SUM(montant_total) as total
-            FROM ventes
-            WHERE date BETWEEN ? AND ?
+            SELECT SUM(chiffre_affaires) as total
+            FROM ventes_journalieres
+            WHERE jour BETWEEN ? AND ?
         """
-        result = db.fetch_one(query, (date_debut, date_fin))
-        return result['total'] if result['total'] else 0.0
+        result = db.fetch_one(query, (jour_debut, jour_fin))
+        return result['total'] if result['total'] else 0
 
     @staticmethod
-    def obtenir_par_produit(produit_id):
+    def obtenir_resume(jour_debut, jour_fin, regroupement='jour'):
+        """
+        Obtenir le résumé des ventes d'une période, à partir du cumul journalier
+
+        Args:
+            jour_debut (str): Premier jour inclus (format YYYY-MM-DD)
+            jour_fin (str): Dernier jour inclus (format YYYY-MM-DD)
+            regroupement (str): 'jour', 'produit' ou 'vendeur'
+
+        Returns:
+            list: Lignes avec nb_ventes, quantite, chiffre_affaires, cout et marge (centimes)
+        """
+        regroupements = {
+            'jour': ("r.jour", "r.jour", "r.jour"),
+            'produit': ("r.produit_id, p.nom as produit_nom, p.code as produit_code",
+                        "r.produit_id", "chiffre_affaires DESC"),
+            'vendeur': ("r.utilisateur_id, u.nom as utilisateur_nom",
+                        "r.utilisateur_id", "chiffre_affaires DESC"),
+        }
+        if regroupement not in regroupements:
+            raise ValueError(f"Regroupement inconnu: {regroupement}")
+        colonnes, groupe, ordre = regroupements[regroupement]
+
+        query = f"""
+            SELECT {colonnes},
+                   SUM(r.nb_ventes) as nb_ventes,
+                   SUM(r.quantite) as quantite,
+                   SUM(r.chiffre_affaires) as chiffre_affaires,
+                   SUM(r.cout) as cout,
+                   SUM(r.chiffre_affaires) - SUM(r.cout) as marge
+            FROM ventes_journalieres r
+            LEFT JOIN produits p ON r.produit_id = p.id
+            LEFT JOIN utilisateurs u ON r.utilisateur_id = u.id
+            WHERE r.jour BETWEEN ? AND ?
+            GROUP BY {groupe}
+            ORDER BY {ordre}
+        """
+        return db.lire_enregistrements(query, (jour_debut, jour_fin), 'Vente')
+
+    @staticmethod
+    def obtenir_par_produit(produit_id, paresseux=False):
         """
         Obtenir les ventes pour un produit spécifique
 
         Args:
             produit_id (int): ID du produit
+            paresseux (bool): Retourner un itérateur lisant les lignes par lots
 
         Returns:
-            list: Liste des ventes
+            list: Liste des ventes (itérateur si paresseux)
         """
         query = """
             SELECT v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom
@@ -145,4 +321,4 @@ class Vente:
             WHERE v.produit_id = ?
             ORDER BY v.date DESC
         """
-        return [dict(row) for row in db.fetch_all(query, (produit_id,))]
+        return db.lire_enregistrements(query, (produit_id,), 'Vente', paresseux)
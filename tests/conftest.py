@@ -0,0 +1,53 @@
+"""
+Fixtures communes : chaque test travaille sur sa propre base temporaire
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# L'instance globale db ouvre la base à l'import : la diriger vers un dossier
+# temporaire avant que les tests n'importent les modèles
+_DOSSIER_SESSION = tempfile.mkdtemp(prefix='agib_tests_')
+os.environ['AGIB_DB_PATH'] = os.path.join(_DOSSIER_SESSION, 'modele.db')
+
+
+@pytest.fixture(scope='session')
+def base_modele():
+    """Base migrée avec l'administrateur par défaut, construite une fois (hachage bcrypt)"""
+    from database.db_manager import db
+    db.close_all()
+    yield db.db_path
+    shutil.rmtree(_DOSSIER_SESSION, ignore_errors=True)
+
+
+@pytest.fixture
+def base(base_modele, tmp_path):
+    """Copie vierge de la base modèle, utilisée par l'instance globale db"""
+    from database.db_manager import db
+    chemin = str(tmp_path / 'agib.db')
+    shutil.copyfile(base_modele, chemin)
+    db.utiliser_base(chemin)
+    yield db
+    db.close_all()
+
+
+@pytest.fixture
+def admin_id(base):
+    return base.fetch_one("SELECT id FROM utilisateurs WHERE nom = 'admin'")['id']
+
+
+@pytest.fixture
+def creer_produit(base):
+    """Fabrique de produits à code unique (montants en centimes)"""
+    numero = iter(range(1, 10000))
+
+    def creer(nom=None, prix_achat=100, prix_vente=150, quantite=10, categorie_id=None):
+        n = next(numero)
+        return base.execute_query(
+            "INSERT INTO produits (nom, code, prix_achat, prix_vente, quantite, categorie_id, date_creation) "
+            "VALUES (?, ?, ?, ?, ?, ?, '2024-01-01T00:00:00')",
+            (nom or f"Produit {n}", f"CODE-{n:04d}", prix_achat, prix_vente, quantite, categorie_id)
+        )
+    return creer
@@ -0,0 +1,108 @@
+"""
+Archives mensuelles du journal et lectures sur toutes les partitions
+"""
+import os
+from datetime import date, datetime
+
+from database.archives_journal import mois_suivant
+from models.journal import Journal
+from utils.export import ExportManager
+
+ANCIENNES = ['2023-01-15T10:00:00', '2023-01-15T10:00:00', '2023-01-31T23:59:59',
+             '2023-02-01T00:00:00', '2023-02-01T00:00:00']
+
+
+def _remplir(base, dates):
+    with base.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO journal (action, date, utilisateur_id, details) VALUES ('TEST', ?, NULL, ?)",
+            [(d, f"entrée {i}") for i, d in enumerate(dates)]
+        )
+    return [row['id'] for row in base.fetch_all("SELECT id FROM journal ORDER BY date DESC, id DESC")]
+
+
+def _schemas(base):
+    return [row['name'] for row in base.fetch_all("PRAGMA database_list")]
+
+
+def test_outils_de_dates(base):
+    assert mois_suivant('2023-12') == '2024-01'
+    assert base.archives_journal.limite_active(date(2024, 2, 10)) == '2023-12-01'
+
+
+def test_archivage_des_mois_anciens(base):
+    recente = datetime.now().isoformat()
+    _remplir(base, ANCIENNES + [recente])
+    archives = base.archives_journal
+
+    assert archives.archiver() == [('2023-01', 3), ('2023-02', 2)]
+    assert archives.mois_archives() == ['2023-01', '2023-02']
+    assert all(os.path.exists(archives.chemin(m)) for m in ('2023-01', '2023-02'))
+    assert [r['date'] for r in base.fetch_all("SELECT date FROM journal")] == [recente]
+    assert archives.archiver() == []
+    assert _schemas(base) == ['main']
+
+
+def test_archivage_interrompu_sans_perte(base):
+    _remplir(base, ANCIENNES)
+    archives = base.archives_journal
+    archives.archiver()
+    # Entrée copiée dans l'archive mais restée dans la base principale
+    with archives.attacher('2023-01') as alias:
+        ligne = base.fetch_one(f"SELECT * FROM {alias}.journal LIMIT 1")
+    base.execute_query("INSERT INTO journal (id, action, date, utilisateur_id, details) VALUES (?, ?, ?, ?, ?)",
+                       tuple(ligne))
+
+    assert archives.archiver() == [('2023-01', 1)]
+    assert Journal.compter_periode() == len(ANCIENNES)
+
+
+def test_pages_sur_toutes_les_partitions(base):
+    attendus = _remplir(base, ANCIENNES + [datetime.now().isoformat()] * 2)
+    base.archives_journal.archiver()
+
+    ids, apres = [], None
+    while True:
+        page = Journal.obtenir_page(apres, limite=2)
+        if not page:
+            break
+        ids += [e['id'] for e in page]
+        apres = (page[-1]['date'], page[-1]['id'])
+    assert ids == attendus
+    assert _schemas(base) == ['main']
+
+
+def test_periode(base):
+    _remplir(base, ANCIENNES + [datetime.now().isoformat()])
+    base.archives_journal.archiver()
+
+    janvier = list(Journal.obtenir_periode('2023-01-01T00:00:00', '2023-01-31T23:59:59.999999'))
+    assert [e['date'] for e in janvier] == ['2023-01-31T23:59:59', '2023-01-15T10:00:00', '2023-01-15T10:00:00']
+    assert Journal.compter_periode('2023-01-20', '2023-02-28') == 3
+    assert Journal.compter_periode() == len(ANCIENNES) + 1
+    premiere = Journal.obtenir_page(None, 2, '2023-01-01', '2023-12-31')
+    suite = Journal.obtenir_page((premiere[-1]['date'], premiere[-1]['id']), 10, '2023-01-01', '2023-12-31')
+    assert (len(premiere), len(suite)) == (2, 3)
+
+
+def test_apercu_et_export_identiques(base):
+    _remplir(base, ANCIENNES + [datetime.now().isoformat()])
+    base.archives_journal.archiver()
+
+    for periode in ((None, None), ('2023-01-01T00:00:00', '2023-01-31T23:59:59')):
+        rapport = ExportManager.rapport_journal(*periode)
+        nb, totaux = ExportManager.calculer_totaux(rapport)
+        pages, apres = "", None
+        while True:
+            texte, apres = ExportManager.generer_page(rapport, apres, 2)
+            pages += texte
+            if apres is None:
+                break
+        contenu = ExportManager.generer_contenu_journal(*periode)
+
+        lignes_export = contenu.split("-" * 80 + "\n")[1].split("\n" + "=" * 80)[0]
+        assert lignes_export == pages
+        assert len(pages.splitlines()) == nb
+        assert contenu.rstrip().endswith(f"TOTAL OPERATIONS: {totaux[0]}")
+    assert nb == 3
+    assert ExportManager.calculer_totaux(ExportManager.rapport_journal())[0] == len(ANCIENNES) + 1
@@ -0,0 +1,89 @@
+"""
+Cache des résultats invalidé par les compteurs de modification des tables
+"""
+import shutil
+import sqlite3
+from datetime import datetime
+
+from database.cache import CacheResultats
+from models.statistiques import Statistiques
+from models.vente import Vente
+from utils.export import ExportManager
+
+
+def _compteur():
+    appels = []
+
+    def calcul():
+        appels.append(1)
+        return len(appels)
+    return calcul, appels
+
+
+def test_resultat_repris_tant_que_la_table_ne_change_pas(base, creer_produit):
+    cache = CacheResultats(base)
+    calcul, appels = _compteur()
+    assert cache.obtenir('cle', ('produits',), calcul) == 1
+    assert cache.obtenir('cle', ('produits',), calcul) == 1
+    assert (len(appels), cache.succes, cache.echecs) == (1, 1, 1)
+
+    # Écriture sur une autre table : toujours valide
+    base.execute_query("INSERT INTO categories (nom) VALUES ('Divers')")
+    assert cache.obtenir('cle', ('produits',), calcul) == 1
+
+    creer_produit()
+    assert cache.obtenir('cle', ('produits',), calcul) == 2
+
+
+def test_ecriture_d_un_autre_processus(base):
+    cache = CacheResultats(base)
+    calcul, appels = _compteur()
+    cache.obtenir('cle', ('categories',), calcul)
+
+    autre = sqlite3.connect(base.db_path)
+    autre.execute("INSERT INTO categories (nom) VALUES ('Boissons')")
+    autre.commit()
+    autre.close()
+
+    assert cache.obtenir('cle', ('categories',), calcul) == 2
+
+
+def test_taille_maximale(base):
+    cache = CacheResultats(base, taille_max=2)
+    calcul, appels = _compteur()
+    for cle in ('a', 'b', 'c'):
+        cache.obtenir(cle, ('produits',), calcul)
+    cache.obtenir('a', ('produits',), calcul)
+    assert len(appels) == 4
+
+
+def test_tableau_de_bord_apres_vente(base, admin_id, creer_produit):
+    jour = datetime.now().strftime("%Y-%m-%d")
+    produit_id = creer_produit(quantite=10)
+    assert Statistiques.obtenir_tableau_de_bord(jour, 5)['total_ventes_jour'] == 0
+    Vente.creer(produit_id, 2, 250, admin_id)
+    tableau = Statistiques.obtenir_tableau_de_bord(jour, 5)
+    assert tableau['total_ventes_jour'] == 500
+    assert tableau['valeur_stock'] == 8 * 100
+
+
+def test_apercu_rapport_apres_modification(base, creer_produit):
+    rapport = ExportManager.rapport_inventaire()
+    creer_produit(nom="Ail")
+    assert ExportManager.calculer_totaux(rapport)[0] == 1
+    assert "Ail" in ExportManager.generer_page(rapport, None, 10)[0]
+
+    creer_produit(nom="Basilic")
+    assert ExportManager.calculer_totaux(rapport)[0] == 2
+    assert "Basilic" in ExportManager.generer_page(rapport, None, 10)[0]
+
+
+def test_changement_de_base(base, base_modele, tmp_path, creer_produit):
+    creer_produit()
+    rapport = ExportManager.rapport_inventaire()
+    assert ExportManager.calculer_totaux(rapport)[0] == 1
+
+    autre = str(tmp_path / 'autre.db')
+    shutil.copyfile(base_modele, autre)
+    base.utiliser_base(autre)
+    assert ExportManager.calculer_totaux(rapport)[0] == 0
@@ -0,0 +1,46 @@
+"""
+Index du catalogue en caisse : versions, relecture des stocks, instantanés
+"""
+from models.produit import Produit
+from models.vente import Vente
+from utils.catalogue import CatalogueIndex
+
+
+def _construire(index):
+    version, version_stock = Produit.versions_catalogue()
+    index.construire(Produit.obtenir_tous(), version, version_stock)
+
+
+def test_vente_ne_change_que_la_version_stock(base, admin_id, creer_produit):
+    produit_id = creer_produit(quantite=10)
+    index = CatalogueIndex()
+    _construire(index)
+
+    Vente.creer_panier([{'produit_id': produit_id, 'quantite': 3, 'prix_unitaire': 150}], admin_id)
+
+    version, version_stock = Produit.versions_catalogue()
+    assert index.est_a_jour(version)
+    assert index.version_stock != version_stock
+    index.rafraichir_stocks(Produit.obtenir_quantites(), version_stock)
+    assert index.obtenir(produit_id)['quantite'] == 7
+
+
+def test_modification_impose_reconstruction(base, creer_produit):
+    produit_id = creer_produit(nom="Savon")
+    index = CatalogueIndex()
+    _construire(index)
+
+    Produit.modifier(produit_id, "Savon noir", "CODE-X", 100, 150, 10)
+    assert not index.est_a_jour(Produit.versions_catalogue()[0])
+
+
+def test_instantane_conserve_pendant_mise_a_jour(base, creer_produit):
+    creer_produit(nom="Savon")
+    index = CatalogueIndex()
+    _construire(index)
+    ancien = index._index
+
+    index.mettre_a_jour({'id': 999, 'nom': "Savonnette", 'code': "SAV-1", 'quantite': 1})
+
+    assert 999 not in ancien.produits and 999 not in ancien.trigrammes.get('sav', set())
+    assert [p['nom'] for p in index.rechercher("savon")] == ["Savon", "Savonnette"]
@@ -0,0 +1,131 @@
+"""
+Migrations du schéma : base vierge et mise à jour d'une base d'origine (montants REAL)
+"""
+import sqlite3
+
+import pytest
+
+from database.migrations import charger_migrations, migrer, version_courante
+
+# Schéma d'origine de l'application, antérieur aux migrations
+SCHEMA_ORIGINE = """
+CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, nom TEXT NOT NULL UNIQUE);
+CREATE TABLE produits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, nom TEXT NOT NULL, code TEXT UNIQUE NOT NULL,
+    prix_achat REAL NOT NULL, prix_vente REAL NOT NULL, quantite INTEGER NOT NULL DEFAULT 0,
+    categorie_id INTEGER, date_expiration TEXT, date_creation TEXT NOT NULL,
+    FOREIGN KEY (categorie_id) REFERENCES categories(id)
+);
+CREATE TABLE utilisateurs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, nom TEXT NOT NULL UNIQUE,
+    role TEXT NOT NULL CHECK(role IN ('Administrateur', 'Vendeur')),
+    mot_de_passe TEXT NOT NULL, date_creation TEXT NOT NULL
+);
+CREATE TABLE achats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, produit_id INTEGER NOT NULL, quantite INTEGER NOT NULL,
+    date TEXT NOT NULL, fournisseur TEXT, utilisateur_id INTEGER NOT NULL,
+    FOREIGN KEY (produit_id) REFERENCES produits(id), FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id)
+);
+CREATE TABLE ventes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, produit_id INTEGER NOT NULL, quantite INTEGER NOT NULL,
+    prix_unitaire REAL NOT NULL, montant_total REAL NOT NULL, date TEXT NOT NULL,
+    utilisateur_id INTEGER NOT NULL,
+    FOREIGN KEY (produit_id) REFERENCES produits(id), FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id)
+);
+CREATE TABLE journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, date TEXT NOT NULL,
+    utilisateur_id INTEGER, details TEXT, FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id)
+);
+CREATE INDEX idx_produits_code ON produits(code);
+CREATE INDEX idx_produits_categorie ON produits(categorie_id);
+CREATE INDEX idx_ventes_date ON ventes(date);
+CREATE INDEX idx_achats_date ON achats(date);
+CREATE INDEX idx_journal_date ON journal(date);
+
+INSERT INTO categories (nom) VALUES ('Epicerie');
+INSERT INTO utilisateurs (nom, role, mot_de_passe, date_creation)
+    VALUES ('vendeur', 'Vendeur', 'x', '2023-01-01T00:00:00');
+INSERT INTO produits (nom, code, prix_achat, prix_vente, quantite, categorie_id, date_creation) VALUES
+    ('Riz 1kg', 'RIZ-1', 0.7, 1.15, 20, 1, '2023-01-01T00:00:00'),
+    ('Huile', 'HUI-1', 2.35, 3.1, 4, NULL, '2023-01-01T00:00:00'),
+    ('Sucre', 'SUC-1', 0.55, 0.9, 0, 1, '2023-01-01T00:00:00');
+DELETE FROM produits WHERE code = 'SUC-1';
+INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id) VALUES
+    (1, 3, 1.15, 3.45, '2023-06-01T10:00:00', 1),
+    (2, 1, 3.1, 3.1, '2023-06-01T11:00:00', 1),
+    (1, 1, 1.15, 1.15, '2023-06-02T09:00:00', 1);
+"""
+
+
+def _base_origine(chemin):
+    conn = sqlite3.connect(chemin)
+    conn.executescript(SCHEMA_ORIGINE)
+    conn.close()
+    return sqlite3.connect(chemin)
+
+
+def test_base_vierge(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'vierge.db')
+    rapport = migrer(conn)
+    assert [e['version'] for e in rapport] == [m.version for m in charger_migrations()]
+    assert version_courante(conn) == charger_migrations()[-1].version
+    assert migrer(conn) == []
+    conn.close()
+
+
+def test_mise_a_jour_base_origine(tmp_path):
+    conn = _base_origine(tmp_path / 'origine.db')
+    migrer(conn)
+
+    assert version_courante(conn) == charger_migrations()[-1].version
+    colonnes = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(produits)")}
+    assert colonnes['prix_achat'] == colonnes['prix_vente'] == 'INTEGER'
+    assert conn.execute("SELECT id, prix_achat, prix_vente FROM produits ORDER BY id").fetchall() == [
+        (1, 70, 115), (2, 235, 310)]
+    assert conn.execute(
+        "SELECT prix_unitaire, montant_total, cout_unitaire FROM ventes ORDER BY id").fetchall() == [
+        (115, 345, 70), (310, 310, 235), (115, 115, 70)]
+
+    # Compteur AUTOINCREMENT conservé : l'ID d'un produit supprimé n'est pas réattribué
+    conn.execute("INSERT INTO produits (nom, code, prix_achat, prix_vente, date_creation) "
+                 "VALUES ('Sel', 'SEL-1', 20, 40, '2024-01-01')")
+    assert conn.execute("SELECT id FROM produits WHERE code = 'SEL-1'").fetchone()[0] == 4
+
+    # Données dérivées construites par les migrations
+    assert conn.execute("SELECT nb_produits, valeur_stock FROM resume_stock").fetchone() == (3, 20 * 70 + 4 * 235)
+    assert conn.execute(
+        "SELECT jour, SUM(nb_ventes), SUM(chiffre_affaires), SUM(cout) FROM ventes_journalieres GROUP BY jour ORDER BY jour"
+    ).fetchall() == [('2023-06-01', 2, 655, 445), ('2023-06-02', 1, 115, 70)]
+    assert conn.execute("SELECT rowid FROM produits_fts WHERE produits_fts MATCH 'huil'").fetchall() == [(2,)]
+    conn.close()
+
+
+def test_simulation_laisse_la_base_inchangee(tmp_path):
+    chemin = tmp_path / 'origine.db'
+    _base_origine(chemin).close()
+    contenu = chemin.read_bytes()
+
+    conn = sqlite3.connect(chemin)
+    rapport = migrer(conn, simulation=True)
+    assert len(rapport) == len(charger_migrations())
+    assert version_courante(conn) == 0
+    conn.close()
+    assert chemin.read_bytes() == contenu
+
+
+def test_migration_en_echec_annulee(tmp_path, monkeypatch):
+    migrations = charger_migrations()
+    derniere = migrations[-1]
+
+    def echouer(conn):
+        conn.execute("CREATE TABLE trace_echec (id INTEGER)")
+        raise sqlite3.OperationalError("échec simulé")
+    monkeypatch.setattr(derniere, 'appliquer', echouer)
+    monkeypatch.setattr('database.migrations.charger_migrations', lambda: migrations)
+
+    conn = sqlite3.connect(tmp_path / 'vierge.db')
+    with pytest.raises(sqlite3.OperationalError, match=f"{derniere.version:03d}"):
+        migrer(conn)
+    assert version_courante(conn) == derniere.version - 1
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'trace_echec'").fetchone() is None
+    conn.close()
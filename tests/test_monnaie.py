@@ -0,0 +1,46 @@
+"""
+Conversion et mise en forme des montants en centimes
+"""
+from decimal import Decimal
+
+import pytest
+
+from utils.monnaie import formater_montant, vers_centimes
+
+
+@pytest.mark.parametrize("valeur, centimes", [
+    ("19.99", 1999),
+    ("12,5", 1250),
+    (" 3 ", 300),
+    ("", 0),
+    ("0.005", 1),
+    ("-0.5", -50),
+    (0.1 + 0.2, 30),
+    (1.005, 101),
+    (12, 1200),
+    (Decimal("7.25"), 725),
+])
+def test_vers_centimes(valeur, centimes):
+    assert vers_centimes(valeur) == centimes
+
+
+@pytest.mark.parametrize("valeur", ["abc", "1.2.3", "nan", "inf", None])
+def test_vers_centimes_invalide(valeur):
+    with pytest.raises(ValueError):
+        vers_centimes(valeur)
+
+
+@pytest.mark.parametrize("centimes, texte", [
+    (123405, "1234.05"),
+    (5, "0.05"),
+    (-50, "-0.50"),
+    (0, "0.00"),
+    (None, "0.00"),
+])
+def test_formater_montant(centimes, texte):
+    assert formater_montant(centimes) == texte
+
+
+def test_aller_retour():
+    for centimes in (0, 1, 99, 100, 1999, 123456789, -1):
+        assert vers_centimes(formater_montant(centimes)) == centimes
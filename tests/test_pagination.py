@@ -0,0 +1,54 @@
+"""
+Pagination par clé (date, id) de l'historique des achats
+"""
+from models.achat import Achat
+
+
+def _parcourir(limite):
+    pages, apres = [], None
+    while True:
+        page = Achat.obtenir_page(apres, limite)
+        if not page:
+            return pages
+        pages.append([a['id'] for a in page])
+        apres = (page[-1]['date'], page[-1]['id'])
+
+
+def test_dates_identiques_ni_doublon_ni_oubli(base, admin_id, creer_produit):
+    produit_id = creer_produit()
+    dates = ['2024-03-01T10:00:00'] * 7 + ['2024-03-02T09:00:00'] * 3 + ['2024-02-28T18:00:00'] * 2
+    with base.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO achats (produit_id, quantite, date, fournisseur, utilisateur_id) VALUES (?, 1, ?, 'F', ?)",
+            [(produit_id, date, admin_id) for date in dates]
+        )
+
+    pages = _parcourir(limite=4)
+    ids = [i for page in pages for i in page]
+    attendus = [row['id'] for row in base.fetch_all("SELECT id FROM achats ORDER BY date DESC, id DESC")]
+    assert ids == attendus
+    assert [len(page) for page in pages] == [4, 4, 4]
+    assert Achat.compter() == 12
+
+
+def test_page_vide_sans_achat(base):
+    assert Achat.obtenir_page() == []
+    assert Achat.compter() == 0
+
+
+def test_apercu_rapport_par_cle_noms_identiques(base, creer_produit):
+    from config import EXPORT_SEPARATOR
+    from utils.export import ExportManager
+    for nom in ["Riz", "Ail", "Riz", "Riz", "Ail"]:
+        creer_produit(nom=nom)
+
+    rapport = ExportManager.rapport_inventaire()
+    pages, apres = [], None
+    while True:
+        texte, apres = ExportManager.generer_page(rapport, apres, 2)
+        if apres is None:
+            break
+        pages.append([ligne.split(EXPORT_SEPARATOR)[0] for ligne in texte.splitlines()])
+    codes = [p['code'] for p in base.fetch_all("SELECT code FROM produits ORDER BY nom, id")]
+    assert [code for page in pages for code in page] == codes
+    assert [len(page) for page in pages] == [2, 2, 1]
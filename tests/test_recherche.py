@@ -0,0 +1,57 @@
+"""
+Recherche de produits par l'index plein texte (FTS5 trigram)
+"""
+from models.produit import Produit
+
+
+def _noms(produits):
+    return [p['nom'] for p in produits]
+
+
+def test_index_disponible(base):
+    assert base.fts_disponible
+
+
+def test_sous_chaine_du_nom(base, creer_produit):
+    creer_produit("Jus d'orange")
+    creer_produit("Orangeade")
+    creer_produit("Lait")
+    assert sorted(_noms(Produit.rechercher("orange"))) == ["Jus d'orange", "Orangeade"]
+
+
+def test_plusieurs_mots_et_mot_court(base, creer_produit):
+    creer_produit("Lait entier 1L")
+    creer_produit("Lait demi-écrémé 1L")
+    creer_produit("Lait entier 50cl")
+    assert _noms(Produit.rechercher("lait entier 1L")) == ["Lait entier 1L"]
+
+
+def test_code_exact_en_premier(base, creer_produit):
+    creer_produit("Savon CODE-0002 offert")
+    creer_produit("Savon")
+    resultats = Produit.rechercher("CODE-0002")
+    assert resultats[0]['code'] == "CODE-0002"
+
+
+def test_index_suit_les_modifications(base, creer_produit):
+    produit_id = creer_produit("Biscuit")
+    base.execute_query("UPDATE produits SET nom = 'Gaufrette' WHERE id = ?", (produit_id,))
+    assert Produit.rechercher("Biscuit") == []
+    assert _noms(Produit.rechercher("gaufr")) == ["Gaufrette"]
+    base.execute_query("DELETE FROM produits WHERE id = ?", (produit_id,))
+    assert Produit.rechercher("gaufr") == []
+
+
+def test_recherche_par_categorie(base, creer_produit):
+    categorie_id = base.execute_query("INSERT INTO categories (nom) VALUES ('Boissons')")
+    creer_produit("Cola", categorie_id=categorie_id)
+    creer_produit("Riz")
+    assert _noms(Produit.rechercher("boisson")) == ["Cola"]
+    base.execute_query("UPDATE categories SET nom = 'Sodas' WHERE id = ?", (categorie_id,))
+    assert _noms(Produit.rechercher("sodas")) == ["Cola"]
+
+
+def test_limite(base, creer_produit):
+    for _ in range(5):
+        creer_produit("Bonbon")
+    assert len(Produit.rechercher("bonbon", limite=3)) == 3
@@ -0,0 +1,67 @@
+"""
+Résumé du stock tenu à jour par triggers et tableau de bord
+"""
+from datetime import datetime
+
+from models.achat import Achat
+from models.produit import Produit
+from models.statistiques import Statistiques
+from models.vente import Vente
+
+
+def _resume(base):
+    return tuple(base.fetch_one("SELECT nb_produits, valeur_stock FROM resume_stock WHERE id = 1"))
+
+
+def _recalcul(base):
+    return tuple(base.fetch_one("SELECT COUNT(*), COALESCE(SUM(quantite * prix_achat), 0) FROM produits"))
+
+
+def test_resume_suit_les_ecritures(base, admin_id, creer_produit):
+    a = creer_produit(prix_achat=120, quantite=10)
+    b = creer_produit(prix_achat=300, quantite=4)
+    assert _resume(base) == _recalcul(base) == (2, 2400)
+
+    Vente.creer_panier([{'produit_id': a, 'quantite': 3, 'prix_unitaire': 200}], admin_id)
+    Achat.creer(b, 6, "Grossiste", admin_id)
+    base.execute_query("UPDATE produits SET prix_achat = 150 WHERE id = ?", (a,))
+    assert _resume(base) == _recalcul(base) == (2, 7 * 150 + 10 * 300)
+
+    Produit.supprimer(b)
+    assert _resume(base) == _recalcul(base) == (1, 1050)
+
+
+def test_resume_reconstruit_si_incoherent(base, creer_produit):
+    creer_produit(prix_achat=100, quantite=5)
+    base.execute_query("UPDATE resume_stock SET nb_produits = 0, valeur_stock = 0")
+    base.init_statistiques()
+    assert _resume(base) == (1, 500)
+
+    base.execute_query("DELETE FROM resume_stock")
+    base.init_statistiques()
+    assert _resume(base) == (1, 500)
+
+    # Même nombre de produits, valeur faussée
+    base.execute_query("UPDATE resume_stock SET valeur_stock = 1")
+    base.init_statistiques()
+    assert _resume(base) == (1, 500)
+
+
+def test_demarrage_sans_ecriture_si_coherent(base, creer_produit):
+    creer_produit()
+    conn = base.get_connection()
+    avant = conn.total_changes
+    base.init_statistiques()
+    assert conn.total_changes == avant
+
+
+def test_tableau_de_bord(base, admin_id, creer_produit):
+    a = creer_produit(prix_achat=100, quantite=2)
+    creer_produit(prix_achat=50, quantite=40)
+    Vente.creer_panier([{'produit_id': a, 'quantite': 1, 'prix_unitaire': 175}], admin_id)
+
+    tableau = Statistiques.obtenir_tableau_de_bord(datetime.now().strftime("%Y-%m-%d"), seuil=5)
+    assert tableau['nb_produits'] == 2
+    assert tableau['valeur_stock'] == 1 * 100 + 40 * 50
+    assert tableau['nb_stock_faible'] == 1
+    assert tableau['total_ventes_jour'] == 175
@@ -0,0 +1,107 @@
+"""
+Écriture différée et groupée du journal des opérations
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from database.tampon_journal import TamponJournal
+
+
+def _nb_journal(base):
+    return base.fetch_one("SELECT COUNT(*) FROM journal")[0]
+
+
+def test_hors_transaction_ecrit_par_lot(base):
+    base.log_action("TEST", None, "a")
+    base.log_action("TEST", None, "b")
+    assert base.tampon_journal.en_attente() == 2
+    assert base.tampon_journal.vider() == 2
+    assert [r['details'] for r in base.fetch_all("SELECT details FROM journal ORDER BY id")] == ["a", "b"]
+    assert base.tampon_journal.vider() == 0
+
+
+def test_dans_une_transaction_ecrit_avec_elle(base):
+    with base.transaction():
+        base.log_action("TEST", None, "validee")
+    assert base.tampon_journal.en_attente() == 0
+    assert _nb_journal(base) == 1
+
+    with pytest.raises(RuntimeError):
+        with base.transaction():
+            base.log_action("TEST", None, "annulee")
+            raise RuntimeError()
+    assert _nb_journal(base) == 1
+
+
+def test_lot_complet_ecrit_en_arriere_plan(base):
+    tampon = TamponJournal(base, taille_lot=5, delai=60)
+    for i in range(5):
+        tampon.ajouter("TEST", "2024-01-01T00:00:00", None, str(i))
+    limite = time.monotonic() + 5
+    while tampon.en_attente() and time.monotonic() < limite:
+        time.sleep(0.01)
+    tampon.arreter()
+    assert _nb_journal(base) == 5
+
+
+def test_delai_maximal(base):
+    tampon = TamponJournal(base, taille_lot=1000, delai=0.05)
+    tampon.ajouter("TEST", "2024-01-01T00:00:00", None, "seule")
+    limite = time.monotonic() + 5
+    while _nb_journal(base) == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+    tampon.arreter()
+    assert _nb_journal(base) == 1
+
+
+def test_entrees_remises_en_attente_si_echec(base):
+    tampon = TamponJournal(base, taille_lot=1000, delai=60)
+    tampon.ajouter("TEST", "2024-01-01T00:00:00", None, "x")
+
+    # Verrou d'écriture détenu par une autre connexion : l'écriture échoue
+    bloque = threading.Event()
+    libere = threading.Event()
+
+    def verrouiller():
+        conn = base.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        bloque.set()
+        libere.wait()
+        conn.rollback()
+    thread = threading.Thread(target=verrouiller)
+    thread.start()
+    bloque.wait()
+    base.get_connection().execute("PRAGMA busy_timeout = 0")
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            tampon.vider()
+        assert tampon.en_attente() == 1
+    finally:
+        libere.set()
+        thread.join()
+    tampon.arreter()
+    assert _nb_journal(base) == 1
+
+
+def test_fermeture_ecrit_les_entrees_restantes(base):
+    base.log_action("TEST", None, "derniere")
+    chemin = base.db_path
+    base.close_all()
+    base.utiliser_base(chemin)
+    assert _nb_journal(base) == 1
+
+
+def test_connexions_journalisees_par_le_tampon(base):
+    from models.utilisateur import Utilisateur
+    Utilisateur.creer("caissier", "Vendeur", "secret123")
+    user = Utilisateur.authentifier("caissier", "secret123")
+    assert Utilisateur.authentifier("caissier", "mauvais") is None
+    Utilisateur.deconnecter(user)
+
+    assert _nb_journal(base) == 0
+    assert base.tampon_journal.vider() == 3
+    actions = [(r['action'], r['utilisateur_id']) for r in base.fetch_all("SELECT * FROM journal ORDER BY id")]
+    assert actions == [("CONNEXION", user['id']), ("ECHEC_CONNEXION", user['id']), ("DECONNEXION", user['id'])]
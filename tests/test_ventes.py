@@ -0,0 +1,78 @@
+"""
+Ventes : retrait de stock conditionnel et panier enregistré d'un bloc
+"""
+import pytest
+
+from models.produit import StockInsuffisantError
+from models.vente import Vente
+
+
+def _etat(base):
+    return (
+        [tuple(row) for row in base.fetch_all("SELECT id, quantite FROM produits ORDER BY id")],
+        base.fetch_one("SELECT COUNT(*) FROM ventes")[0],
+        base.fetch_one("SELECT COUNT(*) FROM journal")[0] + base.tampon_journal.en_attente(),
+    )
+
+
+def test_panier_enregistre(base, admin_id, creer_produit):
+    a = creer_produit(quantite=5)
+    b = creer_produit(quantite=8)
+    ids = Vente.creer_panier([
+        {'produit_id': a, 'quantite': 2, 'prix_unitaire': 150},
+        {'produit_id': b, 'quantite': 3, 'prix_unitaire': 90},
+        {'produit_id': a, 'quantite': 1, 'prix_unitaire': 150},
+    ], admin_id)
+
+    ventes = base.fetch_all("SELECT id, produit_id, quantite, montant_total FROM ventes ORDER BY id")
+    assert [v['id'] for v in ventes] == ids
+    assert [(v['produit_id'], v['quantite'], v['montant_total']) for v in ventes] == [(a, 2, 300), (b, 3, 270), (a, 1, 150)]
+    assert _etat(base)[0] == [(a, 2), (b, 5)]
+    assert base.fetch_one("SELECT COUNT(*) FROM journal WHERE action = 'VENTE'")[0] == 1
+
+
+def test_panier_stock_insuffisant_annule_tout(base, admin_id, creer_produit):
+    a = creer_produit(quantite=5)
+    b = creer_produit(nom="Farine", quantite=1)
+    avant = _etat(base)
+
+    with pytest.raises(StockInsuffisantError) as erreur:
+        Vente.creer_panier([
+            {'produit_id': a, 'quantite': 2, 'prix_unitaire': 150},
+            {'produit_id': b, 'quantite': 2, 'prix_unitaire': 90},
+        ], admin_id)
+
+    assert (erreur.value.produit_id, erreur.value.nom, erreur.value.disponible) == (b, "Farine", 1)
+    assert _etat(base) == avant
+
+
+def test_meme_produit_sur_plusieurs_lignes(base, admin_id, creer_produit):
+    produit_id = creer_produit(quantite=3)
+    avant = _etat(base)
+    with pytest.raises(StockInsuffisantError):
+        Vente.creer_panier([
+            {'produit_id': produit_id, 'quantite': 2, 'prix_unitaire': 100},
+            {'produit_id': produit_id, 'quantite': 2, 'prix_unitaire': 100},
+        ], admin_id)
+    assert _etat(base) == avant
+
+
+def test_produit_introuvable(base, admin_id):
+    with pytest.raises(ValueError, match="introuvable"):
+        Vente.creer_panier([{'produit_id': 999, 'quantite': 1, 'prix_unitaire': 100}], admin_id)
+
+
+def test_panier_vide(base, admin_id):
+    with pytest.raises(ValueError):
+        Vente.creer_panier([], admin_id)
+
+
+def test_vente_unitaire_stock_insuffisant(base, admin_id, creer_produit):
+    produit_id = creer_produit(quantite=1)
+    avant = _etat(base)
+    with pytest.raises(StockInsuffisantError):
+        Vente.creer(produit_id, 2, 100, admin_id)
+    assert _etat(base) == avant
+
+    Vente.creer(produit_id, 1, 100, admin_id)
+    assert _etat(base)[0] == [(produit_id, 0)]
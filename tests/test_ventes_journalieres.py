@@ -0,0 +1,81 @@
+"""
+Cumul journalier des ventes tenu à jour par triggers
+"""
+from datetime import datetime
+
+from models.vente import Vente
+
+_CUMUL = "SELECT * FROM ventes_journalieres ORDER BY jour, produit_id, utilisateur_id"
+
+
+def _lignes(base):
+    return [tuple(row) for row in base.fetch_all(_CUMUL)]
+
+
+def _recalcul(base):
+    incremental = _lignes(base)
+    base.reconstruire_ventes_journalieres()
+    return incremental, _lignes(base)
+
+
+def test_cumul_des_ventes(base, admin_id, creer_produit):
+    a = creer_produit(prix_achat=100, quantite=50)
+    b = creer_produit(prix_achat=40, quantite=50)
+    Vente.creer(a, 2, 180, admin_id)
+    Vente.creer_panier([
+        {'produit_id': a, 'quantite': 1, 'prix_unitaire': 180},
+        {'produit_id': b, 'quantite': 5, 'prix_unitaire': 60},
+    ], admin_id)
+
+    jour = datetime.now().strftime("%Y-%m-%d")
+    resume = {row['produit_id']: row for row in base.fetch_all(
+        "SELECT * FROM ventes_journalieres WHERE jour = ?", (jour,))}
+    assert (resume[a]['nb_ventes'], resume[a]['quantite'], resume[a]['chiffre_affaires'], resume[a]['cout']) == (2, 3, 540, 300)
+    assert (resume[b]['nb_ventes'], resume[b]['quantite'], resume[b]['chiffre_affaires'], resume[b]['cout']) == (1, 5, 300, 200)
+
+    total = Vente.obtenir_resume(jour, jour)[0]
+    assert (total['chiffre_affaires'], total['cout'], total['marge']) == (840, 500, 340)
+
+
+def test_suppression_apres_changement_de_prix_d_achat(base, admin_id, creer_produit):
+    produit_id = creer_produit(prix_achat=100, quantite=50)
+    premiere = Vente.creer(produit_id, 2, 150, admin_id)
+    base.execute_query("UPDATE produits SET prix_achat = 130 WHERE id = ?", (produit_id,))
+    Vente.creer(produit_id, 1, 150, admin_id)
+
+    base.execute_query("DELETE FROM ventes WHERE id = ?", (premiere,))
+    incremental, complet = _recalcul(base)
+    assert incremental == complet
+    assert [row[-1] for row in incremental] == [130]
+
+
+def test_derniere_vente_supprimee_retire_la_ligne(base, admin_id, creer_produit):
+    produit_id = creer_produit()
+    vente_id = Vente.creer(produit_id, 1, 150, admin_id)
+    base.execute_query("DELETE FROM ventes WHERE id = ?", (vente_id,))
+    assert _lignes(base) == []
+
+
+def test_vente_inseree_sans_cout(base, admin_id, creer_produit):
+    produit_id = creer_produit(prix_achat=70)
+    base.execute_query(
+        "INSERT INTO ventes (produit_id, quantite, prix_unitaire, montant_total, date, utilisateur_id) "
+        "VALUES (?, 2, 100, 200, ?, ?)", (produit_id, datetime.now().isoformat(), admin_id))
+    assert base.fetch_one("SELECT cout_unitaire FROM ventes")[0] == 70
+    incremental, complet = _recalcul(base)
+    assert incremental == complet
+
+
+
+def test_totaux_du_rapport_lus_dans_le_cumul(base, admin_id, creer_produit):
+    from utils.export import DefinitionRapport, ExportManager
+    a = creer_produit(quantite=50)
+    Vente.creer_panier([
+        {'produit_id': a, 'quantite': 2, 'prix_unitaire': 180},
+        {'produit_id': a, 'quantite': 1, 'prix_unitaire': 175},
+    ], admin_id)
+
+    rapport = ExportManager.rapport_ventes_journalieres()
+    # Cumul journalier et agrégation des ventes brutes donnent les mêmes totaux
+    assert rapport.lire_totaux() == (2, [2, 535])
+    assert DefinitionRapport.lire_totaux(rapport) == (2, [2, 535])
@@ -7,15 +7,59 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
 from kivy.uix.spinner import Spinner
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp
 from models.produit import Produit
 from models.achat import Achat
+from utils.catalogue import catalogue
+from config import TAILLE_PAGE_HISTORIQUE
+from utils.background import worker
 from datetime import datetime
 
 
+class AchatItem(RecycleDataViewBehavior, BoxLayout):
+    """Ligne de l'historique des achats, réutilisée par le RecycleView"""
+
+    def __init__(self, **kwargs):
+        super(AchatItem, self).__init__(spacing=dp(5), padding=dp(5), **kwargs)
+
+        # Informations de l'achat
+        info_layout = BoxLayout(orientation='vertical', size_hint=(1, 1))
+
+        self.produit_label = Label(
+            font_size='16sp',
+            bold=True,
+            halign='left',
+            valign='middle',
+            color=(1, 1, 1, 1)
+        )
+        self.produit_label.bind(size=self.produit_label.setter('text_size'))
+        info_layout.add_widget(self.produit_label)
+
+        self.details_label = Label(
+            font_size='14sp',
+            halign='left',
+            valign='middle',
+            color=(0.8, 0.8, 0.8, 1)
+        )
+        self.details_label.bind(size=self.details_label.setter('text_size'))
+        info_layout.add_widget(self.details_label)
+
+        self.add_widget(info_layout)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Afficher l'achat correspondant à la ligne recyclée"""
+        achat = data['achat']
+        date_str = datetime.fromisoformat(achat['date']).strftime("%d/%m/%Y %H:%M")
+        self.produit_label.text = f"{achat['produit_nom']} ({achat['produit_code']}) - {date_str}"
+        self.details_label.text = f"Quantité: {achat['quantite']} | Fournisseur: {achat['fournisseur'] or 'N/A'} | Par: {achat['utilisateur_nom']}"
+        return super(AchatItem, self).refresh_view_attrs(rv, index, {})
+
+
 class AchatsScreen(Screen):
     """Écran de gestion des achats"""
 
@@ -24,6 +68,10 @@ class AchatsScreen(Screen):
         self.name = 'achats'
         self.achats = []
         self.produits = []
+        self.page_complete = False  # Plus d'achats à charger
+        self.chargement_en_cours = False
+        self._generation = 0  # Incrémenté à chaque rechargement complet
+        self.nb_achats_total = None  # COUNT(*) lu à chaque rechargement complet
         self.build_ui()
 
     def build_ui(self):
@@ -62,13 +110,20 @@ class AchatsScreen(Screen):
 
         main_layout.add_widget(stats_layout)
 
-        # Liste des achats
-        self.achats_layout = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
-        self.achats_layout.bind(minimum_height=self.achats_layout.setter('height'))
-
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.achats_layout)
-        main_layout.add_widget(scroll)
+        # Liste des achats (virtualisée, chargée page par page au défilement)
+        self.achats_rv = RecycleView(size_hint=(1, 1))
+        achats_layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            size_hint_y=None,
+            default_size=(None, dp(70)),
+            default_size_hint=(1, None)
+        )
+        achats_layout.bind(minimum_height=achats_layout.setter('height'))
+        self.achats_rv.add_widget(achats_layout)
+        self.achats_rv.viewclass = AchatItem  # après l'ajout du layout, qui porte la valeur
+        self.achats_rv.bind(scroll_y=self.on_scroll)
+        main_layout.add_widget(self.achats_rv)
 
         self.add_widget(main_layout)
 
@@ -86,57 +141,73 @@ class AchatsScreen(Screen):
         self.refresh_list()
 
     def refresh_list(self):
-        """Rafraîchir la liste des achats"""
-        self.achats_layout.clear_widgets()
+        """Rafraîchir la liste des achats (première page)"""
+        self._generation += 1
+        self.achats = []
+        self.page_complete = False
+        self.chargement_en_cours = False
+        self.achats_rv.data = []
+        self.achats_rv.scroll_y = 1
+        self.nb_achats_total = None
+        self.charger_page_suivante()
 
-        # Obtenir tous les achats
-        self.achats = Achat.obtenir_tous()
+        # Nombre total d'achats, indépendant des pages chargées
+        generation = self._generation
 
-        # Mettre à jour les statistiques
-        self.nb_achats_label.text = f'Nombre d\'achats: {len(self.achats)}'
+        def total_charge(total):
+            if generation == self._generation:
+                self.nb_achats_total = total
+                self.afficher_nombre_achats()
 
-        # Afficher les achats
-        for achat in self.achats:
-            item = self.create_achat_item(achat)
-            self.achats_layout.add_widget(item)
+        worker.soumettre(Achat.compter, on_succes=total_charge)
 
         # Charger les produits pour les nouveaux achats
-        self.produits = Produit.obtenir_tous()
-
-    def create_achat_item(self, achat):
-        """Créer un widget pour un achat"""
-        layout = BoxLayout(size_hint_y=None, height=dp(70), spacing=dp(5), padding=dp(5))
-
-        # Informations de l'achat
-        info_layout = BoxLayout(orientation='vertical', size_hint=(1, 1))
-
-        dt = datetime.fromisoformat(achat['date'])
-        date_str = dt.strftime("%d/%m/%Y %H:%M")
-
-        produit_label = Label(
-            text=f"{achat['produit_nom']} ({achat['produit_code']}) - {date_str}",
-            font_size='16sp',
-            bold=True,
-            halign='left',
-            valign='middle',
-            color=(1, 1, 1, 1)
-        )
-        produit_label.bind(size=produit_label.setter('text_size'))
-        info_layout.add_widget(produit_label)
-
-        details_label = Label(
-            text=f"Quantité: {achat['quantite']} | Fournisseur: {achat['fournisseur'] or 'N/A'} | Par: {achat['utilisateur_nom']}",
-            font_size='14sp',
-            halign='left',
-            valign='middle',
-            color=(0.8, 0.8, 0.8, 1)
-        )
-        details_label.bind(size=details_label.setter('text_size'))
-        info_layout.add_widget(details_label)
-
-        layout.add_widget(info_layout)
-
-        return layout
+        def produits_charges(produits):
+            self.produits = produits
+
+        worker.soumettre(Produit.obtenir_tous, on_succes=produits_charges)
+
+    def charger_page_suivante(self):
+        """Charger en arrière-plan la page d'achats suivante et l'ajouter à la liste"""
+        if self.page_complete or self.chargement_en_cours:
+            return
+
+        dernier = self.achats[-1] if self.achats else None
+        apres = (dernier['date'], dernier['id']) if dernier else None
+        generation = self._generation
+        self.chargement_en_cours = True
+
+        def afficher(page):
+            if generation != self._generation:
+                return  # Liste rechargée entre-temps
+            self.chargement_en_cours = False
+            self.page_complete = len(page) < TAILLE_PAGE_HISTORIQUE
+            self.achats.extend(page)
+            self.achats_rv.data.extend({'achat': achat} for achat in page)
+
+            # Mettre à jour les statistiques
+            self.afficher_nombre_achats()
+
+        def echec(e):
+            self.chargement_en_cours = False
+            self.show_message('Erreur', f'Erreur lors du chargement: {str(e)}')
+
+        self.nb_achats_label.text = 'Chargement...'
+        worker.soumettre(Achat.obtenir_page, apres=apres, limite=TAILLE_PAGE_HISTORIQUE,
+                         on_succes=afficher, on_erreur=echec)
+
+    def afficher_nombre_achats(self):
+        """Afficher le nombre d'achats chargés et le total en base"""
+        if self.nb_achats_total is not None:
+            self.nb_achats_label.text = f'Nombre d\'achats: {len(self.achats)} affichés sur {self.nb_achats_total}'
+        else:
+            suite = '' if self.page_complete else '+'
+            self.nb_achats_label.text = f'Nombre d\'achats: {len(self.achats)}{suite}'
+
+    def on_scroll(self, instance, scroll_y):
+        """Charger la page suivante à l'approche du bas de la liste"""
+        if scroll_y <= 0.05 and self.achats_rv.data and not self.page_complete:
+            self.charger_page_suivante()
 
     def show_nouvel_achat_popup(self, instance):
         """Afficher le popup de nouvel achat"""
@@ -247,12 +318,16 @@ class AchatsScreen(Screen):
 
             utilisateur_id = app.current_user['id']
 
-            # Créer l'achat
-            Achat.creer(produit['id'], quantite, fournisseur, utilisateur_id)
+            # Créer l'achat en arrière-plan
+            def termine(achat_id):
+                catalogue.ajuster_stock(produit['id'], quantite)
+                popup.dismiss()
+                self.show_message('Succès', f'Achat enregistré avec succès!\nNouveau stock: {produit["quantite"] + quantite}')
+                self.refresh_list()
 
-            popup.dismiss()
-            self.show_message('Succès', f'Achat enregistré avec succès!\nNouveau stock: {produit["quantite"] + quantite}')
-            self.refresh_list()
+            worker.soumettre(Achat.creer, produit['id'], quantite, fournisseur, utilisateur_id, ecriture=True,
+                             on_succes=termine,
+                             on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de l\'achat: {str(e)}'))
 
         except ValueError as e:
             self.show_message('Erreur', str(e))
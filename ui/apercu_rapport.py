@@ -0,0 +1,113 @@
+"""
+Aperçu paginé d'un rapport
+"""
+from kivy.uix.popup import Popup
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.textinput import TextInput
+from kivy.metrics import dp
+from utils.export import ExportManager
+from utils.background import worker
+from config import EXPORT_SEPARATOR, TAILLE_PAGE_APERCU
+
+
+class ApercuRapport(Popup):
+    """Fenêtre de prévisualisation n'affichant qu'une page du rapport à la fois
+
+    Le nombre de lignes et les totaux sont calculés par SQL à l'ouverture ;
+    chaque page est ensuite lue et mise en forme à la demande, en arrière-plan,
+    à partir de la clé de la dernière ligne de la page précédente.
+    """
+
+    def __init__(self, rapport, totaux, libelle_export='Exporter', **kwargs):
+        """
+        Args:
+            rapport (DefinitionRapport): Rapport à prévisualiser
+            totaux (tuple): (nombre de lignes, valeurs des totaux) de ExportManager.calculer_totaux
+            libelle_export (str): Texte du bouton d'export
+        """
+        super(ApercuRapport, self).__init__(**kwargs)
+        self.size_hint = (0.9, 0.9)
+        self.rapport = rapport
+        self.nb_lignes, valeurs = totaux
+        self.nb_pages = max(1, -(-self.nb_lignes // TAILLE_PAGE_APERCU))
+        self.page = 0
+        self._requete = 0  # Numéro de la dernière page demandée
+        self._debuts = [None]  # Clé après laquelle commence chaque page déjà atteinte
+
+        content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+
+        # Totaux calculés par la base
+        resume = Label(
+            text='\n'.join(rapport.formater_totaux(valeurs)),
+            size_hint=(1, None),
+            height=dp(25) * len(rapport.totaux),
+            halign='left',
+            valign='middle'
+        )
+        resume.bind(size=resume.setter('text_size'))
+        content.add_widget(resume)
+
+        self.text_input = TextInput(
+            text='',
+            readonly=True,
+            background_color=(0.1, 0.1, 0.1, 1),
+            foreground_color=(1, 1, 1, 1)
+        )
+        content.add_widget(self.text_input)
+
+        # Navigation entre les pages
+        navigation = BoxLayout(size_hint=(1, None), height=dp(40), spacing=dp(10))
+        self.precedent_btn = Button(text='< Précédent')
+        self.precedent_btn.bind(on_press=lambda x: self.afficher_page(self.page - 1))
+        navigation.add_widget(self.precedent_btn)
+
+        self.page_label = Label(text='')
+        navigation.add_widget(self.page_label)
+
+        self.suivant_btn = Button(text='Suivant >')
+        self.suivant_btn.bind(on_press=lambda x: self.afficher_page(self.page + 1))
+        navigation.add_widget(self.suivant_btn)
+        content.add_widget(navigation)
+
+        buttons_layout = BoxLayout(size_hint=(1, None), height=dp(50), spacing=dp(10))
+
+        retour_btn = Button(text='Retour')
+        retour_btn.bind(on_press=self.dismiss)
+        buttons_layout.add_widget(retour_btn)
+
+        self.exporter_btn = Button(text=libelle_export, background_color=(0.2, 0.8, 0.4, 1))
+        buttons_layout.add_widget(self.exporter_btn)
+
+        content.add_widget(buttons_layout)
+        self.content = content
+
+        self.afficher_page(0)
+
+    def afficher_page(self, page):
+        """Charger et afficher une page du rapport"""
+        if page < 0 or page >= self.nb_pages or page >= len(self._debuts):
+            return
+        self.page = page
+        self._requete += 1
+        requete = self._requete
+
+        self.page_label.text = f'Page {page + 1} / {self.nb_pages} ({self.nb_lignes} lignes)'
+        self.precedent_btn.disabled = page == 0
+        self.suivant_btn.disabled = True  # Jusqu'à la clé de fin de cette page
+
+        entete = EXPORT_SEPARATOR.join(self.rapport.colonnes) + "\n" + "-" * 80 + "\n"
+
+        def afficher(resultat):
+            texte, fin = resultat
+            if fin is not None and len(self._debuts) == page + 1:
+                self._debuts.append(fin)
+            if requete == self._requete:  # Ignorer une page dépassée entre-temps
+                self.text_input.text = entete + texte
+                self.text_input.cursor = (0, 0)
+                self.suivant_btn.disabled = page >= self.nb_pages - 1 or page + 1 >= len(self._debuts)
+
+        worker.soumettre(ExportManager.generer_page, self.rapport, self._debuts[page], TAILLE_PAGE_APERCU,
+                         on_succes=afficher,
+                         on_erreur=lambda e: setattr(self.text_input, 'text', f'Erreur: {str(e)}'))
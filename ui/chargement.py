@@ -0,0 +1,17 @@
+"""
+Indicateur de chargement pendant les travaux en arrière-plan
+"""
+from kivy.uix.popup import Popup
+from kivy.uix.label import Label
+
+
+class IndicateurChargement(Popup):
+    """Fenêtre modale affichée pendant un travail en arrière-plan"""
+
+    def __init__(self, message='Chargement en cours...', **kwargs):
+        super(IndicateurChargement, self).__init__(**kwargs)
+        self.title = 'Veuillez patienter'
+        self.size_hint = (0.6, 0.25)
+        self.auto_dismiss = False
+        self.content = Label(text=message, halign='center', valign='middle', color=(1, 1, 1, 1))
+        self.content.bind(size=self.content.setter('text_size'))
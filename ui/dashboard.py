@@ -7,9 +7,11 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.metrics import dp
-from models.produit import Produit
-from models.vente import Vente
+from models.statistiques import Statistiques
+from models.utilisateur import Utilisateur
 from config import SEUIL_STOCK_FAIBLE
+from utils.background import worker
+from utils.monnaie import formater_montant
 from datetime import datetime
 
 
@@ -189,23 +191,21 @@ class DashboardScreen(Screen):
                     self.menu_layout.add_widget(self.rapport_vendeur_btn)
 
     def refresh_stats(self):
-        """Rafraîchir les statistiques"""
-        # Total des produits
-        produits = Produit.obtenir_tous()
-        self.total_produits_label.text = f'Total produits: {len(produits)}'
-
-        # Ventes du jour
+        """Rafraîchir les statistiques (calculées en arrière-plan)"""
         date_aujourd_hui = datetime.now().strftime("%Y-%m-%d")
-        total_ventes = Vente.calculer_total_jour(date_aujourd_hui)
-        self.ventes_jour_label.text = f'Ventes du jour: {total_ventes:.2f}'
 
-        # Produits en rupture
-        produits_rupture = Produit.obtenir_stock_faible(SEUIL_STOCK_FAIBLE)
-        self.stock_faible_label.text = f'Produits en rupture: {len(produits_rupture)}'
+        def afficher(stats):
+            # Total des produits
+            self.total_produits_label.text = f'Total produits: {stats["nb_produits"]}'
+            # Ventes du jour
+            self.ventes_jour_label.text = f'Ventes du jour: {formater_montant(stats["total_ventes_jour"])}'
+            # Produits en rupture
+            self.stock_faible_label.text = f'Produits en rupture: {stats["nb_stock_faible"]}'
+            # Valeur du stock
+            self.valeur_stock_label.text = f'Valeur du stock: {formater_montant(stats["valeur_stock"])}'
 
-        # Valeur du stock
-        valeur_stock = sum(p['quantite'] * p['prix_achat'] for p in produits)
-        self.valeur_stock_label.text = f'Valeur du stock: {valeur_stock:.2f}'
+        worker.soumettre(Statistiques.obtenir_tableau_de_bord, date_aujourd_hui, SEUIL_STOCK_FAIBLE,
+                         on_succes=afficher)
 
     def navigate_to(self, screen_name):
         """Naviguer vers un autre écran"""
@@ -215,6 +215,7 @@ class DashboardScreen(Screen):
         """Gérer la déconnexion"""
         from kivy.app import App
         app = App.get_running_app()
-        if hasattr(app, 'current_user'):
+        if getattr(app, 'current_user', None):
+            Utilisateur.deconnecter(app.current_user)
             app.current_user = None
         self.manager.current = 'login'
@@ -0,0 +1,59 @@
+"""
+Gestionnaire d'écrans à construction différée
+"""
+import importlib
+import time
+from kivy.uix.screenmanager import ScreenManager
+
+
+class GestionnaireEcrans(ScreenManager):
+    """ScreenManager dont les écrans sont construits à la première navigation
+
+    Les écrans sont enregistrés par nom avec le chemin de leur classe
+    ('ui.ventes_screen:VentesScreen') : ni le module (widgets KivyMD,
+    ExportManager et modèles qu'il importe) ni l'interface (build_ui) ne
+    sont chargés tant que l'écran n'est pas affiché. La navigation
+    existante (manager.current = 'ventes', get_screen) est inchangée.
+    """
+
+    def __init__(self, **kwargs):
+        super(GestionnaireEcrans, self).__init__(**kwargs)
+        self._a_construire = {}
+        self.temps_construction = {}
+
+    def enregistrer(self, nom, chemin):
+        """
+        Enregistrer un écran sans le construire
+
+        Args:
+            nom (str): Nom de l'écran (valeur de manager.current)
+            chemin (str): 'module:Classe' de l'écran
+        """
+        self._a_construire[nom] = chemin
+
+    def construire(self, nom):
+        """
+        Construire un écran enregistré et l'ajouter au gestionnaire
+
+        Args:
+            nom (str): Nom de l'écran
+
+        Returns:
+            Screen: Écran construit
+        """
+        chemin = self._a_construire.pop(nom)
+        debut = time.perf_counter()
+        module, classe = chemin.split(':')
+        ecran = getattr(importlib.import_module(module), classe)()
+        self.add_widget(ecran)
+        self.temps_construction[nom] = (time.perf_counter() - debut) * 1000
+        print(f"Écran '{nom}' construit en {self.temps_construction[nom]:.0f} ms")
+        return ecran
+
+    def get_screen(self, name):
+        if name in self._a_construire:
+            return self.construire(name)
+        return super(GestionnaireEcrans, self).get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._a_construire or super(GestionnaireEcrans, self).has_screen(name)
@@ -1,6 +1,7 @@
 """
 Écran de connexion
 """
+import math
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -8,7 +9,8 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.metrics import dp
-from models.utilisateur import Utilisateur
+from models.utilisateur import Utilisateur, ConnexionBloqueeError
+from utils.background import worker
 
 
 class LoginScreen(Screen):
@@ -17,6 +19,7 @@ class LoginScreen(Screen):
     def __init__(self, **kwargs):
         super(LoginScreen, self).__init__(**kwargs)
         self.name = 'login'
+        self.verification_en_cours = False
         self.build_ui()
 
     def build_ui(self):
@@ -75,7 +78,7 @@ class LoginScreen(Screen):
         form_layout.add_widget(self.password_input)
 
         # Bouton de connexion
-        login_btn = Button(
+        self.login_btn = login_btn = Button(
             text='Se connecter',
             size_hint=(1, None),
             height=dp(50),
@@ -98,6 +101,9 @@ class LoginScreen(Screen):
 
     def on_login(self, instance):
         """Gérer la tentative de connexion"""
+        if self.verification_en_cours:
+            return
+
         username = self.username_input.text.strip()
         password = self.password_input.text
 
@@ -105,10 +111,30 @@ class LoginScreen(Screen):
             self.show_error("Veuillez remplir tous les champs")
             return
 
-        # Authentifier l'utilisateur
-        user = Utilisateur.authentifier(username, password)
+        # Authentifier l'utilisateur en arrière-plan (hachage bcrypt)
+        self.afficher_verification(True)
+        worker.soumettre(
+            Utilisateur.authentifier, username, password,
+            on_succes=lambda user: self.connexion_terminee(user, password),
+            on_erreur=self.connexion_echouee
+        )
+
+    def afficher_verification(self, en_cours):
+        """Bloquer le formulaire pendant la vérification du mot de passe"""
+        self.verification_en_cours = en_cours
+        self.login_btn.text = 'Vérification...' if en_cours else 'Se connecter'
+        self.login_btn.disabled = en_cours
+        self.username_input.disabled = en_cours
+        self.password_input.disabled = en_cours
+
+    def connexion_terminee(self, user, password=None):
+        self.afficher_verification(False)
 
         if user:
+            if password is not None and Utilisateur.doit_rehacher(user):
+                # Écriture en base : thread d'écriture, sans attendre le résultat
+                worker.soumettre(Utilisateur.rehacher, user, password, ecriture=True)
+
             # Stocker les informations de l'utilisateur dans l'app
             from kivy.app import App
             app = App.get_running_app()
@@ -121,8 +147,17 @@ class LoginScreen(Screen):
             self.username_input.text = ''
             self.password_input.text = ''
         else:
+            self.password_input.text = ''
             self.show_error("Nom d'utilisateur ou mot de passe incorrect")
 
+    def connexion_echouee(self, erreur):
+        self.afficher_verification(False)
+        self.password_input.text = ''
+        if isinstance(erreur, ConnexionBloqueeError):
+            self.show_error(f"Trop de tentatives échouées.\nRéessayez dans {math.ceil(erreur.attente)} s")
+        else:
+            self.show_error(f"Erreur lors de la connexion: {str(erreur)}")
+
     def show_error(self, message):
         """Afficher un message d'erreur"""
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
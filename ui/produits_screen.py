@@ -7,13 +7,83 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
 from kivy.uix.spinner import Spinner
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp
 from kivy.core.window import Window
 from models.produit import Produit
 from models.categorie import Categorie
+from config import LIMITE_RESULTATS_RECHERCHE
+from utils.catalogue import catalogue
+from utils.background import worker
+from utils.monnaie import vers_centimes, formater_montant
+
+
+class ProduitItem(RecycleDataViewBehavior, BoxLayout):
+    """Ligne de la liste des produits, réutilisée par le RecycleView
+
+    Seules les lignes visibles existent en tant que widgets : le contenu est
+    renseigné à partir des données ({'produit', 'is_admin', 'screen'}) à
+    chaque fois que la ligne est recyclée.
+    """
+
+    def __init__(self, **kwargs):
+        super(ProduitItem, self).__init__(spacing=dp(5), padding=dp(5), **kwargs)
+        self.produit = None
+        self.screen = None
+
+        # Informations du produit
+        info_layout = BoxLayout(orientation='vertical', size_hint=(0.7, 1))
+
+        self.nom_label = Label(
+            font_size='16sp',
+            bold=True,
+            halign='left',
+            valign='middle',
+            color=(1, 1, 1, 1)
+        )
+        self.nom_label.bind(size=self.nom_label.setter('text_size'))
+        info_layout.add_widget(self.nom_label)
+
+        self.details_label = Label(
+            font_size='14sp',
+            halign='left',
+            valign='middle',
+            color=(0.8, 0.8, 0.8, 1)
+        )
+        self.details_label.bind(size=self.details_label.setter('text_size'))
+        info_layout.add_widget(self.details_label)
+
+        self.add_widget(info_layout)
+
+        # Boutons d'action (uniquement pour les admins)
+        self.actions_layout = BoxLayout(orientation='vertical', size_hint=(0.3, 1), spacing=dp(5))
+
+        modifier_btn = Button(text='Modifier', background_color=(0.2, 0.5, 0.9, 1), color=(1, 1, 1, 1))
+        modifier_btn.bind(on_press=lambda x: self.screen.show_edit_popup(self.produit))
+        self.actions_layout.add_widget(modifier_btn)
+
+        supprimer_btn = Button(text='Supprimer', background_color=(0.9, 0.3, 0.3, 1), color=(1, 1, 1, 1))
+        supprimer_btn.bind(on_press=lambda x: self.screen.confirm_delete(self.produit))
+        self.actions_layout.add_widget(supprimer_btn)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Afficher le produit correspondant à la ligne recyclée"""
+        produit = data['produit']
+        self.produit = produit
+        self.screen = data['screen']
+        self.nom_label.text = f"{produit['nom']} ({produit['code']})"
+        self.details_label.text = f"Stock: {produit['quantite']} | Prix vente: {formater_montant(produit['prix_vente'])} | Catégorie: {produit['categorie_nom'] or 'N/A'}"
+
+        if data['is_admin'] and self.actions_layout.parent is None:
+            self.add_widget(self.actions_layout)
+        elif not data['is_admin'] and self.actions_layout.parent is not None:
+            self.remove_widget(self.actions_layout)
+
+        return super(ProduitItem, self).refresh_view_attrs(rv, index, {})
 
 
 class ProduitsScreen(Screen):
@@ -24,6 +94,8 @@ class ProduitsScreen(Screen):
         self.name = 'produits'
         self.produits = []
         self.categories = []
+        self.is_admin = False
+        self._requete = 0  # Numéro du dernier chargement demandé
         self.build_ui()
 
     def build_ui(self):
@@ -67,13 +139,19 @@ class ProduitsScreen(Screen):
 
         main_layout.add_widget(search_layout)
 
-        # Liste des produits
-        self.produits_layout = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
-        self.produits_layout.bind(minimum_height=self.produits_layout.setter('height'))
-
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.produits_layout)
-        main_layout.add_widget(scroll)
+        # Liste des produits (virtualisée : seules les lignes visibles sont créées)
+        self.produits_rv = RecycleView(size_hint=(1, 1))
+        produits_layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            size_hint_y=None,
+            default_size=(None, dp(80)),
+            default_size_hint=(1, None)
+        )
+        produits_layout.bind(minimum_height=produits_layout.setter('height'))
+        self.produits_rv.add_widget(produits_layout)
+        self.produits_rv.viewclass = ProduitItem  # après l'ajout du layout, qui porte la valeur
+        main_layout.add_widget(self.produits_rv)
 
         self.add_widget(main_layout)
 
@@ -85,6 +163,7 @@ class ProduitsScreen(Screen):
         if hasattr(app, 'current_user') and app.current_user:
             # Les vendeurs peuvent seulement consulter, pas modifier
             is_admin = app.current_user['role'] == 'Administrateur'
+            self.is_admin = is_admin
             # Masquer le bouton Ajouter pour les vendeurs
             if not is_admin:
                 self.ajouter_btn.disabled = True
@@ -97,75 +176,45 @@ class ProduitsScreen(Screen):
 
     def refresh_list(self):
         """Rafraîchir la liste des produits"""
-        self.produits_layout.clear_widgets()
-        self.produits = Produit.obtenir_tous()
-        self.categories = Categorie.obtenir_toutes()
-
-        for produit in self.produits:
-            item = self.create_produit_item(produit)
-            self.produits_layout.add_widget(item)
+        self.charger(lambda: (Produit.obtenir_tous(), Categorie.obtenir_toutes()))
 
     def on_search(self, instance, value):
         """Rechercher des produits"""
         if value.strip():
-            self.produits = Produit.rechercher(value)
+            self.charger(lambda: (Produit.rechercher(value, limite=LIMITE_RESULTATS_RECHERCHE), None))
         else:
-            self.produits = Produit.obtenir_tous()
-
-        self.produits_layout.clear_widgets()
-        for produit in self.produits:
-            item = self.create_produit_item(produit)
-            self.produits_layout.add_widget(item)
-
-    def create_produit_item(self, produit):
-        """Créer un widget pour un produit"""
-        layout = BoxLayout(size_hint_y=None, height=dp(80), spacing=dp(5), padding=dp(5))
-
-        # Informations du produit
-        info_layout = BoxLayout(orientation='vertical', size_hint=(0.7, 1))
-
-        nom_label = Label(
-            text=f"{produit['nom']} ({produit['code']})",
-            font_size='16sp',
-            bold=True,
-            halign='left',
-            valign='middle',
-            color=(1, 1, 1, 1)
-        )
-        nom_label.bind(size=nom_label.setter('text_size'))
-        info_layout.add_widget(nom_label)
-
-        details_label = Label(
-            text=f"Stock: {produit['quantite']} | Prix vente: {produit['prix_vente']:.2f} | Catégorie: {produit['categorie_nom'] or 'N/A'}",
-            font_size='14sp',
-            halign='left',
-            valign='middle',
-            color=(0.8, 0.8, 0.8, 1)
-        )
-        details_label.bind(size=details_label.setter('text_size'))
-        info_layout.add_widget(details_label)
+            self.charger(lambda: (Produit.obtenir_tous(), None))
 
-        layout.add_widget(info_layout)
-
-        # Boutons d'action (uniquement pour les admins)
-        from kivy.app import App
-        app = App.get_running_app()
-        is_admin = hasattr(app, 'current_user') and app.current_user and app.current_user['role'] == 'Administrateur'
+    def charger(self, requete):
+        """
+        Exécuter une requête de liste en arrière-plan puis afficher son résultat
 
-        if is_admin:
-            actions_layout = BoxLayout(orientation='vertical', size_hint=(0.3, 1), spacing=dp(5))
+        Seul le résultat du dernier chargement demandé est affiché : une
+        recherche plus ancienne qui se termine après une plus récente est ignorée.
 
-            modifier_btn = Button(text='Modifier', background_color=(0.2, 0.5, 0.9, 1), color=(1, 1, 1, 1))
-            modifier_btn.bind(on_press=lambda x: self.show_edit_popup(produit))
-            actions_layout.add_widget(modifier_btn)
+        Args:
+            requete (callable): Retourne (produits, categories ou None)
+        """
+        self._requete += 1
+        numero = self._requete
 
-            supprimer_btn = Button(text='Supprimer', background_color=(0.9, 0.3, 0.3, 1), color=(1, 1, 1, 1))
-            supprimer_btn.bind(on_press=lambda x: self.confirm_delete(produit))
-            actions_layout.add_widget(supprimer_btn)
+        def afficher(resultat):
+            if numero != self._requete:
+                return
+            self.produits, categories = resultat
+            if categories is not None:
+                self.categories = categories
+            self.afficher_produits()
 
-            layout.add_widget(actions_layout)
+        worker.soumettre(requete, on_succes=afficher,
+                         on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors du chargement: {str(e)}'))
 
-        return layout
+    def afficher_produits(self):
+        """Alimenter la liste virtualisée avec les produits courants"""
+        self.produits_rv.data = [
+            {'produit': produit, 'is_admin': self.is_admin, 'screen': self}
+            for produit in self.produits
+        ]
 
     def show_add_popup(self, instance):
         """Afficher le popup d'ajout de produit"""
@@ -189,12 +238,12 @@ class ProduitsScreen(Screen):
 
         # Prix d'achat
         form.add_widget(Label(text='Prix d\'achat:'))
-        prix_achat_input = TextInput(multiline=False, input_filter='float', text=str(produit['prix_achat']) if produit else '')
+        prix_achat_input = TextInput(multiline=False, input_filter='float', text=formater_montant(produit['prix_achat']) if produit else '')
         form.add_widget(prix_achat_input)
 
         # Prix de vente
         form.add_widget(Label(text='Prix de vente:'))
-        prix_vente_input = TextInput(multiline=False, input_filter='float', text=str(produit['prix_vente']) if produit else '')
+        prix_vente_input = TextInput(multiline=False, input_filter='float', text=formater_montant(produit['prix_vente']) if produit else '')
         form.add_widget(prix_vente_input)
 
         # Quantité
@@ -277,8 +326,8 @@ class ProduitsScreen(Screen):
                 self.show_message('Erreur', 'Le nom est obligatoire')
                 return
 
-            prix_achat = float(prix_achat) if prix_achat else 0.0
-            prix_vente = float(prix_vente) if prix_vente else 0.0
+            prix_achat = vers_centimes(prix_achat)
+            prix_vente = vers_centimes(prix_vente)
             quantite = int(quantite) if quantite else 0
 
             # Trouver l'ID de la catégorie
@@ -291,23 +340,30 @@ class ProduitsScreen(Screen):
 
             date_expiration = date_exp if date_exp else None
 
-            # Sauvegarder
-            if produit:
-                # Modification
-                Produit.modifier(produit['id'], nom, produit['code'], prix_achat, prix_vente, quantite, categorie_id, date_expiration)
-                self.show_message('Succès', 'Produit modifié avec succès')
-            else:
-                # Création
-                Produit.creer(nom, prix_achat, prix_vente, quantite, categorie_id, date_expiration)
-                self.show_message('Succès', 'Produit ajouté avec succès')
-
-            popup.dismiss()
-            self.refresh_list()
+            # Sauvegarder en arrière-plan
+            def sauvegarder():
+                if produit:
+                    # Modification
+                    Produit.modifier(produit['id'], nom, produit['code'], prix_achat, prix_vente, quantite, categorie_id, date_expiration)
+                    produit_id = produit['id']
+                else:
+                    # Création
+                    produit_id = Produit.creer(nom, prix_achat, prix_vente, quantite, categorie_id, date_expiration)
+                return Produit.obtenir_par_id(produit_id)
+
+            def termine(produit_enregistre):
+                # Tenir à jour l'index de recherche de la caisse
+                if catalogue.construit:
+                    catalogue.mettre_a_jour(produit_enregistre)
+                popup.dismiss()
+                self.show_message('Succès', 'Produit modifié avec succès' if produit else 'Produit ajouté avec succès')
+                self.refresh_list()
+
+            worker.soumettre(sauvegarder, ecriture=True, on_succes=termine,
+                             on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de la sauvegarde: {str(e)}'))
 
         except ValueError as e:
             self.show_message('Erreur', f'Valeurs invalides: {str(e)}')
-        except Exception as e:
-            self.show_message('Erreur', f'Erreur lors de la sauvegarde: {str(e)}')
 
     def confirm_delete(self, produit):
         """Confirmer la suppression d'un produit"""
@@ -338,13 +394,14 @@ class ProduitsScreen(Screen):
 
     def delete_produit(self, popup, produit):
         """Supprimer un produit"""
-        try:
-            Produit.supprimer(produit['id'])
+        def termine(resultat):
+            catalogue.retirer(produit['id'])
             self.show_message('Succès', 'Produit supprimé avec succès')
             popup.dismiss()
             self.refresh_list()
-        except Exception as e:
-            self.show_message('Erreur', f'Erreur lors de la suppression: {str(e)}')
+
+        worker.soumettre(Produit.supprimer, produit['id'], ecriture=True, on_succes=termine,
+                         on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de la suppression: {str(e)}'))
 
     def show_message(self, titre, message):
         """Afficher un message"""
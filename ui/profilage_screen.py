@@ -0,0 +1,135 @@
+"""
+Écran de diagnostic des requêtes SQL (statistiques du profileur)
+"""
+from kivy.uix.screenmanager import Screen
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.metrics import dp
+from database.db_manager import db
+
+
+class RequeteItem(RecycleDataViewBehavior, BoxLayout):
+    """Ligne de statistiques d'une requête normalisée ({'stats'})"""
+
+    def __init__(self, **kwargs):
+        super(RequeteItem, self).__init__(orientation='vertical', padding=dp(5), **kwargs)
+
+        self.mesures_label = Label(font_size='14sp', bold=True, halign='left', valign='middle', color=(1, 1, 1, 1))
+        self.mesures_label.bind(size=self.mesures_label.setter('text_size'))
+        self.add_widget(self.mesures_label)
+
+        self.requete_label = Label(font_size='12sp', halign='left', valign='top', shorten=True,
+                                   shorten_from='right', color=(0.8, 0.8, 0.8, 1))
+        self.requete_label.bind(size=self.requete_label.setter('text_size'))
+        self.add_widget(self.requete_label)
+
+        self.appelant_label = Label(font_size='12sp', halign='left', valign='middle', color=(0.6, 0.7, 0.9, 1))
+        self.appelant_label.bind(size=self.appelant_label.setter('text_size'))
+        self.add_widget(self.appelant_label)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Afficher les statistiques de la requête correspondant à la ligne"""
+        s = data['stats']
+        self.mesures_label.text = (
+            f"{s['nb']} appel(s) | total {s['total_ms']:.1f} ms | moy. {s['moyenne_ms']:.2f} ms | "
+            f"p95 {s['p95_ms']:.2f} ms | max {s['max_ms']:.1f} ms | {s['lignes']} ligne(s)"
+        )
+        self.requete_label.text = s['requete']
+        self.appelant_label.text = ', '.join(f"{appelant} (x{nb})" for appelant, nb in s['appelants'])
+        return super(RequeteItem, self).refresh_view_attrs(rv, index, {})
+
+
+class ProfilageScreen(Screen):
+    """Écran de diagnostic des requêtes (administrateurs)"""
+
+    def __init__(self, **kwargs):
+        super(ProfilageScreen, self).__init__(**kwargs)
+        self.name = 'profilage'
+        self.tri = 'total_ms'
+        self.build_ui()
+
+    def build_ui(self):
+        """Construire l'interface"""
+        main_layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+
+        # Barre supérieure
+        top_bar = BoxLayout(size_hint=(1, None), height=dp(50), spacing=dp(10))
+
+        titre = Label(text='Diagnostic des requêtes', font_size='20sp', bold=True, size_hint=(0.7, 1), color=(1, 1, 1, 1))
+        top_bar.add_widget(titre)
+
+        retour_btn = Button(text='Retour', size_hint=(0.3, 1), background_color=(0.4, 0.4, 0.45, 1), color=(1, 1, 1, 1))
+        retour_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'rapports'))
+        top_bar.add_widget(retour_btn)
+
+        main_layout.add_widget(top_bar)
+
+        # Commandes du profileur
+        actions_layout = BoxLayout(size_hint=(1, None), height=dp(45), spacing=dp(10))
+
+        self.activer_btn = Button(background_color=(0.2, 0.8, 0.4, 1), color=(1, 1, 1, 1))
+        self.activer_btn.bind(on_press=self.basculer)
+        actions_layout.add_widget(self.activer_btn)
+
+        self.tri_btn = Button(background_color=(0.2, 0.5, 0.9, 1), color=(1, 1, 1, 1))
+        self.tri_btn.bind(on_press=self.changer_tri)
+        actions_layout.add_widget(self.tri_btn)
+
+        rafraichir_btn = Button(text='Rafraîchir', background_color=(0.2, 0.5, 0.9, 1), color=(1, 1, 1, 1))
+        rafraichir_btn.bind(on_press=lambda x: self.refresh_list())
+        actions_layout.add_widget(rafraichir_btn)
+
+        reinitialiser_btn = Button(text='Réinitialiser', background_color=(0.9, 0.3, 0.3, 1), color=(1, 1, 1, 1))
+        reinitialiser_btn.bind(on_press=self.reinitialiser)
+        actions_layout.add_widget(reinitialiser_btn)
+
+        main_layout.add_widget(actions_layout)
+
+        self.etat_label = Label(size_hint=(1, None), height=dp(30), font_size='13sp', color=(0.9, 0.9, 0.9, 1))
+        main_layout.add_widget(self.etat_label)
+
+        # Liste des requêtes (virtualisée)
+        self.requetes_rv = RecycleView(size_hint=(1, 1))
+        requetes_layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            size_hint_y=None,
+            default_size=(None, dp(75)),
+            default_size_hint=(1, None)
+        )
+        requetes_layout.bind(minimum_height=requetes_layout.setter('height'))
+        self.requetes_rv.add_widget(requetes_layout)
+        self.requetes_rv.viewclass = RequeteItem  # après l'ajout du layout, qui porte la valeur
+        main_layout.add_widget(self.requetes_rv)
+
+        self.add_widget(main_layout)
+
+    def on_enter(self):
+        self.refresh_list()
+
+    def refresh_list(self):
+        """Afficher les statistiques accumulées par le profileur"""
+        profiler = db.profiler
+        self.activer_btn.text = 'Désactiver' if profiler.actif else 'Activer'
+        self.tri_btn.text = {'total_ms': 'Tri: temps total', 'p95_ms': 'Tri: p95', 'nb': 'Tri: appels'}[self.tri]
+        etat = 'actif' if profiler.actif else 'inactif'
+        self.etat_label.text = (f"Profileur {etat} - requêtes lentes (> {profiler.seuil_lent_ms:.0f} ms) "
+                                f"dans {profiler.fichier_lent}")
+        self.requetes_rv.data = [{'stats': s} for s in profiler.statistiques(tri=self.tri)]
+
+    def basculer(self, instance):
+        db.profiler.activer(not db.profiler.actif)
+        self.refresh_list()
+
+    def changer_tri(self, instance):
+        ordre = ['total_ms', 'p95_ms', 'nb']
+        self.tri = ordre[(ordre.index(self.tri) + 1) % len(ordre)]
+        self.refresh_list()
+
+    def reinitialiser(self, instance):
+        db.profiler.reinitialiser()
+        self.refresh_list()
@@ -6,10 +6,11 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.textinput import TextInput
 from kivy.metrics import dp
 from utils.export import ExportManager
+from utils.background import worker
+from ui.chargement import IndicateurChargement
+from ui.apercu_rapport import ApercuRapport
 from datetime import datetime
 import functools
 
@@ -111,51 +112,44 @@ class RapportVendeurScreen(Screen):
         """Afficher la prévisualisation du rapport des ventes du jour"""
         self.show_preview_popup(
             "Prévisualisation des Ventes du Jour",
-            ExportManager.generer_contenu_ventes_journalieres,
+            ExportManager.rapport_ventes_journalieres(),
             ExportManager.exporter_ventes_journalieres
         )
 
-    def show_preview_popup(self, title, content_generator, export_function):
+    def show_preview_popup(self, title, rapport, export_function):
         """Afficher une fenêtre de prévisualisation pour un rapport"""
-        try:
-            report_content = content_generator()
-            
-            content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
-            
-            text_input = TextInput(text=report_content, readonly=True, size_hint=(1, 0.8), background_color=(0.1, 0.1, 0.1, 1), foreground_color=(1, 1, 1, 1))
-            scroll = ScrollView()
-            scroll.add_widget(text_input)
-            content.add_widget(scroll)
-            
-            buttons_layout = BoxLayout(size_hint=(1, None), height=dp(50), spacing=dp(10))
-            
-            retour_btn = Button(text='Retour')
-            buttons_layout.add_widget(retour_btn)
-            
-            exporter_btn = Button(text='Imprimer', background_color=(0.2, 0.8, 0.4, 1))
-            buttons_layout.add_widget(exporter_btn)
-            
-            content.add_widget(buttons_layout)
-            
-            popup = Popup(title=title, content=content, size_hint=(0.9, 0.9))
-            
-            retour_btn.bind(on_press=popup.dismiss)
-            
+        indicateur = IndicateurChargement(message='Génération du rapport...')
+        indicateur.open()
+
+        def afficher(totaux):
+            indicateur.dismiss()
+            popup = ApercuRapport(rapport, totaux, libelle_export='Imprimer', title=title)
+
             def do_export(*args):
-                try:
-                    chemin = export_function()
+                indicateur = IndicateurChargement(message='Export en cours...')
+                indicateur.open()
+
+                def exporte(chemin):
+                    indicateur.dismiss()
                     popup.dismiss()
                     self.show_message('Succès', f'Rapport imprimé avec succès!\n\nFichier:\n{chemin}')
-                except Exception as e:
+
+                def echec(e):
+                    indicateur.dismiss()
                     self.show_message('Erreur', f'Erreur lors de l\'impression:\n{str(e)}')
 
-            exporter_btn.bind(on_press=do_export)
-            
+                worker.soumettre(export_function, on_succes=exporte, on_erreur=echec)
+
+            popup.exporter_btn.bind(on_press=do_export)
             popup.open()
 
-        except Exception as e:
+        def echec(e):
+            indicateur.dismiss()
             self.show_message('Erreur', f'Erreur lors de la génération du rapport:\n{str(e)}')
 
+        # Seuls le nombre de lignes et les totaux sont calculés à l'ouverture
+        worker.soumettre(ExportManager.calculer_totaux, rapport, on_succes=afficher, on_erreur=echec)
+
     def show_message(self, titre, message):
         """Afficher un message"""
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
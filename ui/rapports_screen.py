@@ -8,9 +8,11 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from utils.export import ExportManager
+from utils.background import worker
+from ui.chargement import IndicateurChargement
+from ui.apercu_rapport import ApercuRapport
 from config import SEUIL_STOCK_FAIBLE
 from datetime import datetime
 from ui.date_picker import DatePicker
@@ -135,6 +137,17 @@ class RapportsScreen(Screen):
 
         custom_layout.add_widget(ventes_date_layout)
 
+        # Diagnostic des performances de la base
+        profilage_btn = Button(
+            text='Diagnostic des requêtes SQL',
+            size_hint=(1, None),
+            height=dp(50),
+            background_color=(0.4, 0.4, 0.45, 1),
+            color=(1, 1, 1, 1)
+        )
+        profilage_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'profilage'))
+        custom_layout.add_widget(profilage_btn)
+
         main_layout.add_widget(custom_layout)
 
         self.add_widget(main_layout)
@@ -146,57 +159,50 @@ class RapportsScreen(Screen):
             self.show_message('Accès refusé', 'Seuls les administrateurs peuvent accéder aux rapports')
             self.manager.current = 'dashboard'
 
-    def show_preview_popup(self, title, content_generator, export_function):
-        try:
-            report_content = content_generator()
-            
-            content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
-            
-            text_input = TextInput(text=report_content, readonly=True, size_hint=(1, 0.8), background_color=(0.1, 0.1, 0.1, 1), foreground_color=(1, 1, 1, 1))
-            scroll = ScrollView()
-            scroll.add_widget(text_input)
-            content.add_widget(scroll)
-            
-            buttons_layout = BoxLayout(size_hint=(1, None), height=dp(50), spacing=dp(10))
-            
-            retour_btn = Button(text='Retour')
-            buttons_layout.add_widget(retour_btn)
-            
-            exporter_btn = Button(text='Exporter', background_color=(0.2, 0.8, 0.4, 1))
-            buttons_layout.add_widget(exporter_btn)
-            
-            content.add_widget(buttons_layout)
-            
-            popup = Popup(title=title, content=content, size_hint=(0.9, 0.9))
-            
-            retour_btn.bind(on_press=popup.dismiss)
-            
+    def show_preview_popup(self, title, rapport, export_function):
+        indicateur = IndicateurChargement(message='Génération du rapport...')
+        indicateur.open()
+
+        def afficher(totaux):
+            indicateur.dismiss()
+            popup = ApercuRapport(rapport, totaux, libelle_export='Exporter', title=title)
+
             def do_export(*args):
-                try:
-                    chemin = export_function()
+                indicateur = IndicateurChargement(message='Export en cours...')
+                indicateur.open()
+
+                def exporte(chemin):
+                    indicateur.dismiss()
                     popup.dismiss()
                     self.show_message('Succès', f'Rapport exporté avec succès!\n\nFichier:\n{chemin}')
-                except Exception as e:
+
+                def echec(e):
+                    indicateur.dismiss()
                     self.show_message('Erreur', f'Erreur lors de l\'export:\n{str(e)}')
 
-            exporter_btn.bind(on_press=do_export)
-            
+                worker.soumettre(export_function, on_succes=exporte, on_erreur=echec)
+
+            popup.exporter_btn.bind(on_press=do_export)
             popup.open()
 
-        except Exception as e:
+        def echec(e):
+            indicateur.dismiss()
             self.show_message('Erreur', f'Erreur lors de la génération du rapport:\n{str(e)}')
 
+        # Seuls le nombre de lignes et les totaux sont calculés à l'ouverture
+        worker.soumettre(ExportManager.calculer_totaux, rapport, on_succes=afficher, on_erreur=echec)
+
     def preview_inventaire(self, instance):
         self.show_preview_popup(
             "Prévisualisation de l'Inventaire",
-            ExportManager.generer_contenu_inventaire,
+            ExportManager.rapport_inventaire(),
             ExportManager.exporter_inventaire
         )
 
     def preview_ventes_jour(self, instance):
         self.show_preview_popup(
             "Prévisualisation des Ventes du Jour",
-            ExportManager.generer_contenu_ventes_journalieres,
+            ExportManager.rapport_ventes_journalieres(),
             ExportManager.exporter_ventes_journalieres
         )
 
@@ -211,28 +217,28 @@ class RapportsScreen(Screen):
             self.show_message('Erreur', 'Format de date invalide.\nUtilisez le format YYYY-MM-DD')
             return
         
-        content_generator = functools.partial(ExportManager.generer_contenu_ventes_journalieres, date=date)
+        rapport = ExportManager.rapport_ventes_journalieres(date)
         export_function = functools.partial(ExportManager.exporter_ventes_journalieres, date=date)
         
         self.show_preview_popup(
             f"Prévisualisation des Ventes du {date}",
-            content_generator,
+            rapport,
             export_function
         )
 
     def preview_rupture(self, instance):
-        content_generator = functools.partial(ExportManager.generer_contenu_produits_rupture, seuil=SEUIL_STOCK_FAIBLE)
+        rapport = ExportManager.rapport_produits_rupture(SEUIL_STOCK_FAIBLE)
         export_function = functools.partial(ExportManager.exporter_produits_rupture, seuil=SEUIL_STOCK_FAIBLE)
         self.show_preview_popup(
             "Prévisualisation des Produits en Rupture",
-            content_generator,
+            rapport,
             export_function
         )
 
     def preview_journal(self, instance):
         self.show_preview_popup(
             "Prévisualisation du Journal des Opérations",
-            ExportManager.generer_contenu_journal,
+            ExportManager.rapport_journal(),
             ExportManager.exporter_journal
         )
 
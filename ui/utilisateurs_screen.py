@@ -12,6 +12,7 @@ from kivy.uix.popup import Popup
 from kivy.uix.spinner import Spinner
 from kivy.metrics import dp
 from models.utilisateur import Utilisateur
+from utils.background import worker
 from config import MIN_PASSWORD_LENGTH
 
 
@@ -80,13 +81,16 @@ class UtilisateursScreen(Screen):
         self.refresh_list()
 
     def refresh_list(self):
-        """Rafraîchir la liste des utilisateurs"""
-        self.utilisateurs_layout.clear_widgets()
-        self.utilisateurs = Utilisateur.obtenir_tous()
+        """Rafraîchir la liste des utilisateurs (lecture en arrière-plan)"""
+        def afficher(utilisateurs):
+            self.utilisateurs = utilisateurs
+            self.utilisateurs_layout.clear_widgets()
+            for utilisateur in self.utilisateurs:
+                item = self.create_utilisateur_item(utilisateur)
+                self.utilisateurs_layout.add_widget(item)
 
-        for utilisateur in self.utilisateurs:
-            item = self.create_utilisateur_item(utilisateur)
-            self.utilisateurs_layout.add_widget(item)
+        worker.soumettre(Utilisateur.obtenir_tous, on_succes=afficher,
+                         on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors du chargement: {str(e)}'))
 
     def create_utilisateur_item(self, utilisateur):
         """Créer un widget pour un utilisateur"""
@@ -233,11 +237,14 @@ class UtilisateursScreen(Screen):
                 self.show_message('Erreur', 'Les mots de passe ne correspondent pas')
                 return
 
-            # Créer l'utilisateur
-            Utilisateur.creer(nom, role, password)
-            self.show_message('Succès', f'Utilisateur "{nom}" créé avec succès')
-            popup.dismiss()
-            self.refresh_list()
+            def termine(resultat):
+                self.show_message('Succès', f'Utilisateur "{nom}" créé avec succès')
+                popup.dismiss()
+                self.refresh_list()
+
+            # Créer l'utilisateur (hachage du mot de passe hors du thread de l'interface)
+            worker.soumettre(Utilisateur.creer, nom, role, password, ecriture=True, on_succes=termine,
+                             on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de la création: {str(e)}'))
 
         except Exception as e:
             self.show_message('Erreur', f'Erreur lors de la création: {str(e)}')
@@ -332,10 +339,14 @@ class UtilisateursScreen(Screen):
                 self.show_message('Erreur', 'Les mots de passe ne correspondent pas')
                 return
 
-            # Modifier le mot de passe
-            Utilisateur.modifier_mot_de_passe(utilisateur_id, new_password)
-            self.show_message('Succès', 'Mot de passe modifié avec succès')
-            popup.dismiss()
+            def termine(resultat):
+                self.show_message('Succès', 'Mot de passe modifié avec succès')
+                popup.dismiss()
+
+            # Modifier le mot de passe (hachage hors du thread de l'interface)
+            worker.soumettre(Utilisateur.modifier_mot_de_passe, utilisateur_id, new_password, ecriture=True,
+                             on_succes=termine,
+                             on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de la modification: {str(e)}'))
 
         except Exception as e:
             self.show_message('Erreur', f'Erreur lors de la modification: {str(e)}')
@@ -379,13 +390,13 @@ class UtilisateursScreen(Screen):
 
     def delete_utilisateur(self, popup, utilisateur):
         """Supprimer un utilisateur"""
-        try:
-            Utilisateur.supprimer(utilisateur['id'])
+        def termine(resultat):
             self.show_message('Succès', 'Utilisateur supprimé avec succès')
             popup.dismiss()
             self.refresh_list()
-        except Exception as e:
-            self.show_message('Erreur', f'Erreur lors de la suppression: {str(e)}')
+
+        worker.soumettre(Utilisateur.supprimer, utilisateur['id'], ecriture=True, on_succes=termine,
+                         on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de la suppression: {str(e)}'))
 
     def show_message(self, titre, message):
         """Afficher un message"""
@@ -6,6 +6,9 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp
 from kivy.core.window import Window
 from kivymd.uix.label import MDLabel
@@ -13,12 +16,64 @@ from kivymd.uix.textfield import MDTextField
 from kivymd.uix.button import MDRaisedButton, MDIconButton, MDFlatButton
 from kivymd.uix.card import MDCard
 from kivymd.app import MDApp
-from models.produit import Produit
+from models.produit import Produit, StockInsuffisantError
 from models.vente import Vente
 from utils.export import ExportManager
+from utils.catalogue import catalogue
+from utils.background import worker
+from utils.monnaie import vers_centimes, formater_montant
+from ui.chargement import IndicateurChargement
 from datetime import datetime
 
 
+class VenteItem(RecycleDataViewBehavior, MDCard):
+    """Carte d'une vente du jour, réutilisée par le RecycleView
+
+    Les données de chaque ligne sont {'vente', 'screen'} ; seules les cartes
+    visibles existent et sont remplies au moment où elles sont recyclées.
+    """
+
+    def __init__(self, **kwargs):
+        super(VenteItem, self).__init__(padding=dp(5), **kwargs)
+        self.vente = None
+        self.screen = None
+        layout = BoxLayout(spacing=dp(5))
+
+        # Informations de la vente
+        info_layout = BoxLayout(orientation='vertical', size_hint=(0.8, 1))
+
+        self.produit_label = MDLabel(
+            font_style='Subtitle1',
+            bold=True,
+        )
+        info_layout.add_widget(self.produit_label)
+
+        self.details_label = MDLabel(
+            font_style='Body2',
+            theme_text_color="Secondary"
+        )
+        info_layout.add_widget(self.details_label)
+
+        layout.add_widget(info_layout)
+
+        # Bouton d'export du ticket
+        ticket_btn = MDIconButton(icon='receipt', on_press=lambda x: self.screen.export_ticket(self.vente['id']))
+        layout.add_widget(ticket_btn)
+        self.add_widget(layout)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Afficher la vente correspondant à la carte recyclée"""
+        vente = data['vente']
+        self.vente = vente
+        self.screen = data['screen']
+
+        heure = datetime.fromisoformat(vente['date']).strftime("%H:%M:%S")
+        self.produit_label.text = f"{vente['produit_nom']} ({vente['produit_code']}) - {heure}"
+        self.details_label.text = f"Qté: {vente['quantite']} x {formater_montant(vente['prix_unitaire'])} = {formater_montant(vente['montant_total'])} | Vendeur: {vente['utilisateur_nom']}"
+
+        return super(VenteItem, self).refresh_view_attrs(rv, index, {})
+
+
 class VentesScreen(Screen):
     """Écran de gestion des ventes"""
 
@@ -26,7 +81,8 @@ class VentesScreen(Screen):
         super(VentesScreen, self).__init__(**kwargs)
         self.name = 'ventes'
         self.ventes = []
-        self.produits = []
+        self.date_ventes = None  # Jour des ventes actuellement affichées
+        self.total_jour = 0  # centimes
         self.panier = []  # Liste des produits dans le panier
         self.build_ui()
 
@@ -70,13 +126,19 @@ class VentesScreen(Screen):
 
         main_layout.add_widget(stats_layout)
 
-        # Liste des ventes
-        self.ventes_layout = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
-        self.ventes_layout.bind(minimum_height=self.ventes_layout.setter('height'))
-
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.ventes_layout)
-        main_layout.add_widget(scroll)
+        # Liste des ventes (virtualisée : seules les cartes visibles sont créées)
+        self.ventes_rv = RecycleView(size_hint=(1, 1))
+        ventes_layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            size_hint_y=None,
+            default_size=(None, dp(70)),
+            default_size_hint=(1, None)
+        )
+        ventes_layout.bind(minimum_height=ventes_layout.setter('height'))
+        self.ventes_rv.add_widget(ventes_layout)
+        self.ventes_rv.viewclass = VenteItem  # après l'ajout du layout, qui porte la valeur
+        main_layout.add_widget(self.ventes_rv)
 
         self.add_widget(main_layout)
 
@@ -86,58 +148,52 @@ class VentesScreen(Screen):
 
     def refresh_list(self):
         """Rafraîchir la liste des ventes"""
-        self.ventes_layout.clear_widgets()
-
-        # Obtenir les ventes du jour
         date_aujourd_hui = datetime.now().strftime("%Y-%m-%d")
-        self.ventes = Vente.obtenir_par_jour(date_aujourd_hui)
-        total = Vente.calculer_total_jour(date_aujourd_hui)
-
-        # Mettre à jour les statistiques
-        self.total_jour_label.text = f'Total du jour: {total:.2f}'
-        self.nb_ventes_label.text = f'Nombre de ventes: {len(self.ventes)}'
-
-        # Afficher les ventes
-        for vente in self.ventes:
-            item = self.create_vente_item(vente)
-            self.ventes_layout.add_widget(item)
 
-        # Charger les produits pour les nouvelles ventes
-        self.produits = Produit.obtenir_tous()
-
-    def create_vente_item(self, vente):
-        """Créer un widget pour une vente"""
-        card = MDCard(size_hint_y=None, height=dp(70), padding=dp(5))
-        layout = BoxLayout(spacing=dp(5))
-
-        # Informations de la vente
-        info_layout = BoxLayout(orientation='vertical', size_hint=(0.8, 1))
-
-        dt = datetime.fromisoformat(vente['date'])
-        heure = dt.strftime("%H:%M:%S")
-
-        produit_label = MDLabel(
-            text=f"{vente['produit_nom']} ({vente['produit_code']}) - {heure}",
-            font_style='Subtitle1',
-            bold=True,
-        )
-        info_layout.add_widget(produit_label)
-
-        details_label = MDLabel(
-            text=f"Qté: {vente['quantite']} x {vente['prix_unitaire']:.2f} = {vente['montant_total']:.2f} | Vendeur: {vente['utilisateur_nom']}",
-            font_style='Body2',
-            theme_text_color="Secondary"
-        )
-        info_layout.add_widget(details_label)
-
-        layout.add_widget(info_layout)
-
-        # Bouton d'export du ticket
-        ticket_btn = MDIconButton(icon='receipt', on_press=lambda x: self.export_ticket(vente['id']))
-        layout.add_widget(ticket_btn)
-        card.add_widget(layout)
+        def charger():
+            # Obtenir les ventes du jour
+            ventes = Vente.obtenir_par_jour(date_aujourd_hui)
+            total = Vente.calculer_total_jour(date_aujourd_hui)
+            # Le catalogue est tenu à jour par incréments pour les opérations de
+            # cette caisse. Produit créé ou modifié ailleurs : reconstruction ;
+            # stock modifié (ventes, achats, autres caisses) : relecture des
+            # seules quantités. Versions lues avant les données : une écriture
+            # concurrente provoque une relecture de plus, jamais de moins.
+            version, version_stock = Produit.versions_catalogue()
+            if not catalogue.est_a_jour(version):
+                catalogue.construire(Produit.obtenir_tous(), version, version_stock)
+            elif catalogue.version_stock != version_stock:
+                catalogue.rafraichir_stocks(Produit.obtenir_quantites(), version_stock)
+            return ventes, total
+
+        def afficher(resultat):
+            self.ventes, self.total_jour = resultat
+            self.date_ventes = date_aujourd_hui
+            self.ventes_rv.data = [{'vente': vente, 'screen': self} for vente in self.ventes]
+            self.update_stats()
+
+        worker.soumettre(charger, on_succes=afficher,
+                         on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors du chargement: {str(e)}'))
+
+    def ajouter_ventes(self, nouvelles):
+        """Ajouter en tête de liste les ventes venant d'être enregistrées"""
+        if self.date_ventes != datetime.now().strftime("%Y-%m-%d"):
+            # Changement de jour : la liste affichée n'est plus celle du jour
+            self.refresh_list()
+            return
 
-        return card
+        self.ventes[0:0] = nouvelles
+        # insert() est signalé comme tel au RecycleView (une affectation de tranche
+        # le forcerait à tout recalculer)
+        for vente in reversed(nouvelles):
+            self.ventes_rv.data.insert(0, {'vente': vente, 'screen': self})
+        self.total_jour += sum(vente['montant_total'] for vente in nouvelles)
+        self.update_stats()
+
+    def update_stats(self):
+        """Mettre à jour les statistiques du jour"""
+        self.total_jour_label.text = f'Total du jour: {formater_montant(self.total_jour)}'
+        self.nb_ventes_label.text = f'Nombre de ventes: {len(self.ventes)}'
 
     def show_nouvelle_vente_popup(self, instance):
         """Afficher le popup de nouvelle vente avec panier"""
@@ -237,7 +293,11 @@ class VentesScreen(Screen):
         self.search_results = []
 
         def on_search_text_validate(instance):
-            if self.search_results:
+            # Code-barres scanné : correspondance exacte sur le code
+            produit = catalogue.par_code(instance.text) if instance.text else None
+            if produit:
+                select_produit(produit)
+            elif self.search_results:
                 select_produit(self.search_results[0])
             elif not instance.text:
                 ajouter_au_panier(None)
@@ -246,11 +306,11 @@ class VentesScreen(Screen):
             self.search_results_layout.clear_widgets()
             self.search_results = []
             if len(value) < 2: return
-            self.search_results = [p for p in self.produits if value.lower() in p['nom'].lower() or value.lower() in p['code'].lower()]
+            self.search_results = catalogue.rechercher(value, limite=10)
             if not self.search_results:
                 self.search_results_layout.add_widget(MDLabel(text='Aucun produit trouvé', halign='center', theme_text_color="Secondary"))
             else:
-                for p in self.search_results[:10]:
+                for p in self.search_results:
                     btn = MDRaisedButton(text=f"{p['nom']} ({p['code']}) - Stock: {p['quantite']}", on_press=lambda x, prod=p: select_produit(prod))
                     self.search_results_layout.add_widget(btn)
 
@@ -258,7 +318,7 @@ class VentesScreen(Screen):
             self.selected_produit = produit
             self.produit_selected_label.text = f"{produit['nom']} ({produit['code']})"
             self.produit_selected_label.theme_text_color = "Primary"
-            prix_input.text = str(produit['prix_vente'])
+            prix_input.text = formater_montant(produit['prix_vente'])
             self.search_results_layout.clear_widgets()
             self.produit_search_input.text = ""
             update_total_ligne(None, None)
@@ -267,8 +327,8 @@ class VentesScreen(Screen):
         def update_total_ligne(instance, value):
             try:
                 qte = int(quantite_input.text) if quantite_input.text else 0
-                prix = float(prix_input.text) if prix_input.text else 0.0
-                total_ligne_label.text = f"Total ligne: {qte * prix:.2f}"
+                prix = vers_centimes(prix_input.text)
+                total_ligne_label.text = f"Total ligne: {formater_montant(qte * prix)}"
             except:
                 total_ligne_label.text = "Total ligne: 0.00"
 
@@ -278,7 +338,7 @@ class VentesScreen(Screen):
                 return
             try:
                 quantite = int(quantite_input.text)
-                prix_unitaire = float(prix_input.text)
+                prix_unitaire = vers_centimes(prix_input.text)
                 if quantite <= 0 or prix_unitaire <= 0:
                     self.show_message('Erreur', 'La quantité et le prix doivent être supérieurs à 0')
                     return
@@ -302,13 +362,13 @@ class VentesScreen(Screen):
             total_panier = 0
             for idx, item in enumerate(self.panier):
                 item_layout = BoxLayout(size_hint_y=None, height=dp(40))
-                info_label = MDLabel(text=f"{item['produit']['nom']} - Qté: {item['quantite']} x {item['prix_unitaire']:.2f} = {item['total']:.2f}", adaptive_height=True)
+                info_label = MDLabel(text=f"{item['produit']['nom']} - Qté: {item['quantite']} x {formater_montant(item['prix_unitaire'])} = {formater_montant(item['total'])}", adaptive_height=True)
                 del_btn = MDIconButton(icon='delete', theme_text_color="Error", on_press=lambda x, i=idx: supprimer_du_panier(i))
                 item_layout.add_widget(info_label)
                 item_layout.add_widget(del_btn)
                 self.panier_layout.add_widget(item_layout)
                 total_panier += item['total']
-            self.total_panier_label.text = f"{total_panier:.2f}"
+            self.total_panier_label.text = formater_montant(total_panier)
 
         def supprimer_du_panier(index):
             if 0 <= index < len(self.panier):
@@ -349,31 +409,57 @@ class VentesScreen(Screen):
         if not self.panier:
             self.show_message('Erreur', 'Le panier est vide.')
             return
-        try:
-            from kivy.app import App
-            app = App.get_running_app()
-            utilisateur_id = app.current_user['id']
-            ventes_ids = [Vente.creer(item['produit']['id'], item['quantite'], item['prix_unitaire'], utilisateur_id) for item in self.panier]
+        from kivy.app import App
+        app = App.get_running_app()
+        utilisateur_id = app.current_user['id']
+        lignes = [
+            {'produit_id': item['produit']['id'], 'quantite': item['quantite'], 'prix_unitaire': item['prix_unitaire']}
+            for item in self.panier
+        ]
+        total_panier = sum(item['total'] for item in self.panier)
+        nb_articles = len(self.panier)
+
+        def enregistrer():
+            ventes_ids = Vente.creer_panier(lignes, utilisateur_id)
+            return ventes_ids, Vente.obtenir_par_ids(ventes_ids)
+
+        def termine(resultat):
+            indicateur.dismiss()
+            ventes_ids, nouvelles = resultat
+            for ligne in lignes:
+                catalogue.ajuster_stock(ligne['produit_id'], -ligne['quantite'])
             popup.dismiss()
-            total_panier = sum(item['total'] for item in self.panier)
-            self.show_message('Succès', f'Vente enregistrée!\n{len(self.panier)} article(s) - Total: {total_panier:.2f}', lambda: self.export_ticket_panier(ventes_ids))
-            self.refresh_list()
-        except Exception as e:
+            self.show_message('Succès', f'Vente enregistrée!\n{nb_articles} article(s) - Total: {formater_montant(total_panier)}', lambda: self.export_ticket_panier(ventes_ids))
+            self.ajouter_ventes(nouvelles)
+
+        def echec(e):
+            indicateur.dismiss()
+            if isinstance(e, StockInsuffisantError):
+                # Une autre caisse a vendu entre-temps : corriger le stock affiché
+                produit = catalogue.obtenir(e.produit_id)
+                if produit is not None:
+                    catalogue.ajuster_stock(e.produit_id, e.disponible - produit['quantite'])
+                self.show_message('Stock insuffisant', f'{str(e)}\nAucun article du panier n\'a été vendu.')
+                return
             self.show_message('Erreur', f'Erreur lors de la validation: {str(e)}')
 
+        indicateur = IndicateurChargement('Enregistrement de la vente...')
+        indicateur.open()
+        worker.soumettre(enregistrer, ecriture=True, on_succes=termine, on_erreur=echec)
+
     def export_ticket(self, vente_id):
-        try:
-            chemin = ExportManager.generer_ticket_vente(vente_id)
-            self.show_message('Succès', f'Ticket exporté:\n{chemin}')
-        except Exception as e:
-            self.show_message('Erreur', f'Erreur lors de l\'export: {str(e)}')
+        worker.soumettre(
+            ExportManager.generer_ticket_vente, vente_id,
+            on_succes=lambda chemin: self.show_message('Succès', f'Ticket exporté:\n{chemin}'),
+            on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de l\'export: {str(e)}')
+        )
 
     def export_ticket_panier(self, ventes_ids):
-        try:
-            chemin = ExportManager.generer_ticket_panier(ventes_ids)
-            self.show_message('Succès', f'Ticket exporté:\n{chemin}')
-        except Exception as e:
-            self.show_message('Erreur', f'Erreur lors de l\'export: {str(e)}')
+        worker.soumettre(
+            ExportManager.generer_ticket_panier, ventes_ids,
+            on_succes=lambda chemin: self.show_message('Succès', f'Ticket exporté:\n{chemin}'),
+            on_erreur=lambda e: self.show_message('Erreur', f'Erreur lors de l\'export: {str(e)}')
+        )
 
     def show_message(self, titre, message, callback=None):
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
@@ -0,0 +1,61 @@
+"""
+Exécution des travaux de base de données et d'export hors du thread Kivy
+"""
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+
+
+class BackgroundWorker:
+    """Pool de threads pour les lectures et thread dédié pour les écritures
+
+    Les lectures (listes, rapports, exports) s'exécutent en parallèle ; les
+    écritures passent toutes par un unique thread, ce qui les sérialise sans
+    bloquer l'interface. Le résultat (ou l'exception) est remis au thread
+    principal via Clock.schedule_once.
+    """
+
+    def __init__(self, nb_lecteurs=2):
+        self._lecteurs = ThreadPoolExecutor(max_workers=nb_lecteurs, thread_name_prefix='agib-lecture')
+        self._ecrivain = ThreadPoolExecutor(max_workers=1, thread_name_prefix='agib-ecriture')
+
+    def soumettre(self, fonction, *args, on_succes=None, on_erreur=None, ecriture=False, **kwargs):
+        """
+        Exécuter une fonction en arrière-plan
+
+        Args:
+            fonction (callable): Travail à exécuter
+            *args, **kwargs: Arguments transmis à la fonction
+            on_succes (callable, optional): Appelé sur le thread principal avec le résultat
+            on_erreur (callable, optional): Appelé sur le thread principal avec l'exception
+            ecriture (bool): True si le travail écrit en base (thread d'écriture dédié)
+
+        Returns:
+            concurrent.futures.Future: Travail soumis
+        """
+        executor = self._ecrivain if ecriture else self._lecteurs
+        future = executor.submit(fonction, *args, **kwargs)
+
+        def terminer(f):
+            try:
+                resultat = f.result()
+            except Exception as e:
+                if on_erreur:
+                    Clock.schedule_once(lambda dt: on_erreur(e))
+                else:
+                    traceback.print_exception(e)
+                return
+            if on_succes:
+                Clock.schedule_once(lambda dt: on_succes(resultat))
+
+        future.add_done_callback(terminer)
+        return future
+
+    def arreter(self):
+        """Attendre la fin des travaux en cours et arrêter les threads"""
+        self._lecteurs.shutdown(wait=True, cancel_futures=True)
+        self._ecrivain.shutdown(wait=True)
+
+
+# Instance globale partagée par les écrans
+worker = BackgroundWorker()
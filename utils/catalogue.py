@@ -0,0 +1,191 @@
+"""
+Index en mémoire du catalogue produits pour la recherche en caisse
+"""
+import heapq
+
+
+def _trigrammes(texte):
+    """Ensemble des sous-chaînes de 3 caractères d'un texte"""
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+class _Instantane:
+    """Structures d'un index complet, jamais modifiées une fois publiées
+
+    Seule la quantité des produits (valeur d'un champ, pas la structure)
+    change après publication.
+    """
+
+    __slots__ = ('produits', 'cles', 'par_code', 'trigrammes')
+
+    def __init__(self, produits=None, cles=None, par_code=None, trigrammes=None):
+        self.produits = produits if produits is not None else {}        # id -> produit
+        self.cles = cles if cles is not None else {}                    # id -> (nom, code) en minuscules
+        self.par_code = par_code if par_code is not None else {}        # code en minuscules -> id
+        self.trigrammes = trigrammes if trigrammes is not None else {}  # trigramme -> ensemble d'ids
+
+    def copie(self):
+        return _Instantane(dict(self.produits), dict(self.cles), dict(self.par_code),
+                           {t: set(ids) for t, ids in self.trigrammes.items()})
+
+    def indexer(self, produit):
+        produit_id = produit['id']
+        nom = produit['nom'].lower()
+        code = produit['code'].lower()
+        self.produits[produit_id] = produit
+        self.cles[produit_id] = (nom, code)
+        self.par_code[code] = produit_id
+        for trigramme in _trigrammes(nom) | _trigrammes(code):
+            self.trigrammes.setdefault(trigramme, set()).add(produit_id)
+
+    def retirer(self, produit_id):
+        if produit_id not in self.produits:
+            return
+        nom, code = self.cles.pop(produit_id)
+        del self.produits[produit_id]
+        if self.par_code.get(code) == produit_id:
+            del self.par_code[code]
+        for trigramme in _trigrammes(nom) | _trigrammes(code):
+            ids = self.trigrammes.get(trigramme)
+            if ids is not None:
+                ids.discard(produit_id)
+                if not ids:
+                    del self.trigrammes[trigramme]
+
+
+class CatalogueIndex:
+    """Index des produits construit une fois puis tenu à jour par incréments
+
+    Les clés de recherche (nom et code en minuscules) sont calculées à
+    l'insertion ; une table de trigrammes limite la vérification aux produits
+    candidats et un dictionnaire des codes retrouve directement un code-barres
+    scanné.
+
+    L'index est un instantané publié par une seule affectation : une
+    construction en arrière-plan ne montre jamais aux lectures du thread
+    de l'interface un mélange d'ancien et de nouvel index. Les ajouts et
+    retraits de produits publient une copie modifiée.
+
+    version et version_stock mémorisent les compteurs versions_donnees lus
+    avant la construction : 'catalogue' (définition des produits et
+    catégories) impose une reconstruction ; 'produits', qui change aussi à
+    chaque vente ou achat, seulement une relecture des quantités.
+    """
+
+    def __init__(self):
+        self._index = _Instantane()
+        self.construit = False
+        self.version = None
+        self.version_stock = None
+
+    def construire(self, produits, version=None, version_stock=None):
+        """
+        (Re)construire l'index à partir de la liste complète des produits
+
+        Peut être appelée depuis un thread d'arrière-plan : le nouvel index est
+        construit à part puis substitué à l'ancien en une seule affectation.
+
+        Args:
+            produits (list): Produits tels que retournés par Produit.obtenir_tous
+            version (int, optional): Version du catalogue lue avant Produit.obtenir_tous
+            version_stock (int, optional): Version des produits lue avant Produit.obtenir_tous
+        """
+        nouveau = _Instantane()
+        for produit in produits:
+            nouveau.indexer(produit)
+        self._index = nouveau
+        self.version = version
+        self.version_stock = version_stock
+        self.construit = True
+
+    def est_a_jour(self, version):
+        """Indiquer si l'index a été construit à partir de cette version du catalogue"""
+        return self.construit and self.version == version
+
+    def rafraichir_stocks(self, quantites, version_stock=None):
+        """
+        Reporter les quantités lues en base sans réindexer
+
+        Args:
+            quantites (dict): Quantité par ID de produit (Produit.obtenir_quantites)
+            version_stock (int, optional): Version des produits lue avant les quantités
+        """
+        for produit_id, produit in self._index.produits.items():
+            quantite = quantites.get(produit_id)
+            if quantite is not None:
+                produit['quantite'] = quantite
+        self.version_stock = version_stock
+
+    def retirer(self, produit_id):
+        """Retirer un produit de l'index"""
+        if produit_id not in self._index.produits:
+            return
+        copie = self._index.copie()
+        copie.retirer(produit_id)
+        self._index = copie
+
+    def mettre_a_jour(self, produit):
+        """Ajouter ou remplacer un produit (après création ou modification)"""
+        copie = self._index.copie()
+        copie.retirer(produit['id'])
+        copie.indexer(produit)
+        self._index = copie
+
+    def ajuster_stock(self, produit_id, delta):
+        """Répercuter une variation de stock sans réindexer le produit"""
+        produit = self._index.produits.get(produit_id)
+        if produit is not None:
+            produit['quantite'] += delta
+
+    def obtenir(self, produit_id):
+        """Obtenir un produit indexé par son ID"""
+        return self._index.produits.get(produit_id)
+
+    def par_code(self, code):
+        """Retrouver un produit par son code exact (code-barres scanné)"""
+        index = self._index
+        produit_id = index.par_code.get(code.strip().lower())
+        return index.produits.get(produit_id) if produit_id is not None else None
+
+    def rechercher(self, terme, limite=10):
+        """
+        Rechercher des produits dont le nom ou le code contient le terme
+
+        Args:
+            terme (str): Terme de recherche
+            limite (int): Nombre maximum de résultats
+
+        Returns:
+            list: Produits triés par nom, le code exact éventuel en premier
+        """
+        terme = terme.strip().lower()
+        if not terme:
+            return []
+        index = self._index  # Le même instantané pour toute la recherche
+
+        if len(terme) >= 3:
+            # Intersection des trigrammes, en partant de l'ensemble le plus petit
+            ensembles = sorted((index.trigrammes.get(t, set()) for t in _trigrammes(terme)), key=len)
+            candidats = set(ensembles[0])
+            for ids in ensembles[1:]:
+                candidats &= ids
+                if not candidats:
+                    break
+        else:
+            # Trop court pour les trigrammes : parcours des clés précalculées
+            candidats = index.cles.keys()
+
+        trouves = [pid for pid in candidats if terme in index.cles[pid][0] or terme in index.cles[pid][1]]
+        meilleurs = heapq.nsmallest(limite, trouves, key=lambda pid: index.cles[pid][0])
+
+        exact = index.par_code.get(terme)
+        if exact is not None:
+            if exact in meilleurs:
+                meilleurs.remove(exact)
+            meilleurs = [exact] + meilleurs[:limite - 1]
+
+        return [index.produits[pid] for pid in meilleurs]
+
+
+# Instance globale partagée par les écrans
+catalogue = CatalogueIndex()
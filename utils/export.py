@@ -4,12 +4,143 @@ Fonctions d'export en format .txt pour l'application AGIB
 import os
 from datetime import datetime
 from config import EXPORT_DIR, EXPORT_ENCODING, EXPORT_SEPARATOR, BOUTIQUE_NOM
-from models.produit import Produit
-from models.vente import Vente
-from models.achat import Achat
 from database.db_manager import db
+from utils.monnaie import formater_montant
+from models.journal import Journal
+from models.vente import Vente
 import io
 
+
+class DefinitionRapport:
+    """Description d'un rapport tabulaire : requête, colonnes, mise en forme et totaux
+
+    Chaque total est un tuple (libellé, expression SQL, valeur par ligne,
+    mise en forme) : l'expression sert quand le total est calculé par la
+    base, la valeur par ligne quand il est cumulé pendant l'écriture du
+    rapport. Les montants sont des centimes entiers : les deux calculs
+    sont exacts et identiques.
+
+    Les lignes sont triées sur une clé unique (cle, dernière colonne
+    unique, dans le sens de descendant) : l'aperçu lit chaque page à
+    partir de la clé de la dernière ligne de la précédente, sans OFFSET.
+
+    Les tables lues par la requête déterminent quand les totaux et les
+    pages d'aperçu mis en cache (db.cache) doivent être recalculés.
+    """
+
+    def __init__(self, titre, colonnes, source, champs, cle, formater, totaux, tables,
+                 descendant=False, condition=None, params=()):
+        self.titre = titre
+        self.colonnes = colonnes
+        self.source = source
+        self.champs = champs
+        self.cle = cle
+        self.descendant = descendant
+        self.ordre = ", ".join(f"{colonne} {'DESC' if descendant else 'ASC'}" for colonne in cle)
+        self.condition = condition
+        self.params = params
+        self.formater = formater
+        self.totaux = totaux
+        self.tables = tables
+
+    def requete(self):
+        """Requête SELECT des lignes du rapport"""
+        where = f"WHERE {self.condition}" if self.condition else ""
+        return f"SELECT {self.champs} FROM {self.source} {where} ORDER BY {self.ordre}"
+
+    def requete_page(self, suite=False):
+        """
+        Requête SELECT d'une page de lignes (paramètre LIMIT en fin)
+
+        Args:
+            suite (bool): Page suivant une autre : les valeurs de la clé de
+                sa dernière ligne précèdent le paramètre LIMIT
+        """
+        conditions = [self.condition] if self.condition else []
+        if suite:
+            colonnes = ", ".join(self.cle)
+            marques = ", ".join("?" for _ in self.cle)
+            conditions.append(f"({colonnes}) {'<' if self.descendant else '>'} ({marques})")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT {self.champs} FROM {self.source} {where} ORDER BY {self.ordre} LIMIT ?"
+
+    def cle_ligne(self, ligne):
+        """Valeurs de la clé de tri d'une ligne (champ du même nom que la colonne)"""
+        return tuple(ligne[colonne.split('.')[-1]] for colonne in self.cle)
+
+    def requete_totaux(self):
+        """Requête calculant le nombre de lignes et les totaux du rapport"""
+        where = f"WHERE {self.condition}" if self.condition else ""
+        expressions = ", ".join(expression for _, expression, _, _ in self.totaux)
+        return f"SELECT COUNT(*), {expressions} FROM {self.source} {where}"
+
+    def formater_totaux(self, valeurs):
+        """Lignes de totaux du pied de rapport"""
+        return [f"{libelle}: {mettre_en_forme(valeur or 0)}"
+                for (libelle, _, _, mettre_en_forme), valeur in zip(self.totaux, valeurs)]
+
+    def ecrire_totaux(self, f, valeurs):
+        """Écrire les lignes de totaux du pied de rapport"""
+        for ligne in self.formater_totaux(valeurs):
+            f.write(ligne + "\n")
+
+    def lignes(self):
+        """Parcourir toutes les lignes du rapport, par lots"""
+        return db.iterer(self.requete(), self.params)
+
+    def lire_totaux(self):
+        """Nombre de lignes et valeurs des totaux, calculés par la base"""
+        resultat = db.fetch_one(self.requete_totaux(), self.params)
+        return resultat[0], list(resultat)[1:]
+
+    def lire_page(self, apres, taille_page):
+        """Lignes d'une page du rapport, après la clé apres (None : première page)"""
+        return db.fetch_all(self.requete_page(apres is not None), (*self.params, *(apres or ()), taille_page))
+
+
+class RapportJournal(DefinitionRapport):
+    """Rapport du journal, base principale et archives mensuelles comprises
+
+    Les mois archivés (database.archives_journal) ne sont pas dans la
+    table journal de la base principale : lignes, totaux et pages sont
+    lus partition par partition par le modèle Journal.
+    """
+
+    def __init__(self, date_debut=None, date_fin=None, **kwargs):
+        super().__init__(**kwargs)
+        self.date_debut = date_debut
+        self.date_fin = date_fin
+
+    def lignes(self):
+        return Journal.obtenir_periode(self.date_debut, self.date_fin)
+
+    def lire_totaux(self):
+        nb = Journal.compter_periode(self.date_debut, self.date_fin)
+        return nb, [nb]
+
+    def lire_page(self, apres, taille_page):
+        return Journal.obtenir_page(apres, taille_page, self.date_debut, self.date_fin)
+
+
+class RapportVentes(DefinitionRapport):
+    """Rapport des ventes d'une période, totaux lus dans le cumul journalier
+
+    Les lignes viennent de la table ventes ; le nombre de ventes et le
+    chiffre d'affaires sont lus dans ventes_journalieres (Vente.obtenir_resume),
+    quelques lignes par jour au lieu d'une agrégation de toutes les ventes.
+    """
+
+    def __init__(self, jour_debut, jour_fin, **kwargs):
+        super().__init__(**kwargs)
+        self.jour_debut = jour_debut
+        self.jour_fin = jour_fin
+
+    def lire_totaux(self):
+        resume = Vente.obtenir_resume(self.jour_debut, self.jour_fin)
+        nb = sum(jour['nb_ventes'] for jour in resume)
+        return nb, [nb, sum(jour['chiffre_affaires'] for jour in resume)]
+
+
 class ExportManager:
     """Classe pour gérer les exports en format .txt"""
 
@@ -25,127 +156,248 @@ class ExportManager:
         f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
         f.write("=" * 80 + "\n\n")
 
-    # --- Fonctions de génération de contenu ---
+    # --- Définition des rapports ---
 
     @staticmethod
-    def generer_contenu_inventaire():
-        produits = Produit.obtenir_tous()
-        output = io.StringIO()
-        ExportManager._ecrire_entete(output, "INVENTAIRE COMPLET")
-        colonnes = ["CODE", "NOM", "QTE", "PRIX_VENTE", "PRIX_ACHAT", "CATEGORIE", "DATE_EXP"]
-        output.write(EXPORT_SEPARATOR.join(colonnes) + "\n")
-        output.write("-" * 80 + "\n")
-        for produit in produits:
-            ligne = [
+    def rapport_inventaire():
+        def formater(produit):
+            return [
                 produit['code'],
                 produit['nom'],
                 str(produit['quantite']),
-                f"{produit['prix_vente']:.2f}",
-                f"{produit['prix_achat']:.2f}",
+                formater_montant(produit['prix_vente']),
+                formater_montant(produit['prix_achat']),
                 produit['categorie_nom'] if produit['categorie_nom'] else "N/A",
                 produit['date_expiration'] if produit['date_expiration'] else "N/A"
             ]
-            output.write(EXPORT_SEPARATOR.join(ligne) + "\n")
-        output.write("\n" + "=" * 80 + "\n")
-        output.write(f"TOTAL PRODUITS: {len(produits)}\n")
-        valeur_stock = sum(p['quantite'] * p['prix_achat'] for p in produits)
-        output.write(f"VALEUR TOTALE DU STOCK: {valeur_stock:.2f}\n")
-        return output.getvalue()
+        return DefinitionRapport(
+            titre="INVENTAIRE COMPLET",
+            colonnes=["CODE", "NOM", "QTE", "PRIX_VENTE", "PRIX_ACHAT", "CATEGORIE", "DATE_EXP"],
+            source="produits p LEFT JOIN categories c ON p.categorie_id = c.id",
+            champs="p.*, c.nom as categorie_nom",
+            cle=("p.nom", "p.id"),
+            formater=formater,
+            totaux=[
+                ("TOTAL PRODUITS", "COUNT(*)", lambda p: 1, str),
+                ("VALEUR TOTALE DU STOCK", "SUM(p.quantite * p.prix_achat)", lambda p: p['quantite'] * p['prix_achat'], formater_montant),
+            ],
+            tables=('produits', 'categories')
+        )
 
     @staticmethod
-    def generer_contenu_ventes_journalieres(date=None):
+    def rapport_ventes_journalieres(date=None):
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
-        ventes = Vente.obtenir_par_jour(date)
-        total = Vente.calculer_total_jour(date)
-        output = io.StringIO()
-        ExportManager._ecrire_entete(output, f"VENTES DU {date}")
-        colonnes = ["HEURE", "CODE", "PRODUIT", "QTE", "PRIX_UNIT", "TOTAL", "VENDEUR"]
-        output.write(EXPORT_SEPARATOR.join(colonnes) + "\n")
-        output.write("-" * 80 + "\n")
-        for vente in ventes:
+
+        def formater(vente):
             heure = datetime.fromisoformat(vente['date']).strftime("%H:%M:%S")
-            ligne = [heure, vente['produit_code'], vente['produit_nom'], str(vente['quantite']), f"{vente['prix_unitaire']:.2f}", f"{vente['montant_total']:.2f}", vente['utilisateur_nom']]
-            output.write(EXPORT_SEPARATOR.join(ligne) + "\n")
-        output.write("\n" + "=" * 80 + "\n")
-        output.write(f"NOMBRE DE VENTES: {len(ventes)}\n")
-        output.write(f"TOTAL DES VENTES: {total:.2f}\n")
+            return [heure, vente['produit_code'], vente['produit_nom'], str(vente['quantite']), formater_montant(vente['prix_unitaire']), formater_montant(vente['montant_total']), vente['utilisateur_nom']]
+        return RapportVentes(
+            jour_debut=date,
+            jour_fin=date,
+            titre=f"VENTES DU {date}",
+            colonnes=["HEURE", "CODE", "PRODUIT", "QTE", "PRIX_UNIT", "TOTAL", "VENDEUR"],
+            source="ventes v JOIN produits p ON v.produit_id = p.id JOIN utilisateurs u ON v.utilisateur_id = u.id",
+            champs="v.*, p.nom as produit_nom, p.code as produit_code, u.nom as utilisateur_nom",
+            cle=("v.date", "v.id"),
+            descendant=True,
+            condition="v.date BETWEEN ? AND ?",
+            params=(f"{date}T00:00:00", f"{date}T23:59:59"),
+            formater=formater,
+            totaux=[
+                ("NOMBRE DE VENTES", "COUNT(*)", lambda v: 1, str),
+                ("TOTAL DES VENTES", "SUM(v.montant_total)", lambda v: v['montant_total'], formater_montant),
+            ],
+            tables=('ventes', 'produits', 'utilisateurs')
+        )
+
+    @staticmethod
+    def rapport_produits_rupture(seuil):
+        def formater(produit):
+            return [produit['code'], produit['nom'], str(produit['quantite']), produit['categorie_nom'] if produit['categorie_nom'] else "N/A"]
+        return DefinitionRapport(
+            titre=f"PRODUITS EN RUPTURE (Seuil: {seuil})",
+            colonnes=["CODE", "NOM", "QTE_ACTUELLE", "CATEGORIE"],
+            source="produits p LEFT JOIN categories c ON p.categorie_id = c.id",
+            champs="p.*, c.nom as categorie_nom",
+            cle=("p.quantite", "p.id"),
+            condition="p.quantite <= ?",
+            params=(seuil,),
+            formater=formater,
+            totaux=[("TOTAL PRODUITS EN RUPTURE", "COUNT(*)", lambda p: 1, str)],
+            tables=('produits', 'categories')
+        )
+
+    @staticmethod
+    def rapport_journal(date_debut=None, date_fin=None):
+        def formater(entry):
+            dt = datetime.fromisoformat(entry['date'])
+            return [dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S"), entry['action'], entry['utilisateur_nom'] if entry['utilisateur_nom'] else "N/A", entry['details'] if entry['details'] else ""]
+        periode = date_debut and date_fin
+        return RapportJournal(
+            date_debut=date_debut if periode else None,
+            date_fin=date_fin if periode else None,
+            titre="JOURNAL DES OPERATIONS",
+            colonnes=["DATE", "HEURE", "ACTION", "UTILISATEUR", "DETAILS"],
+            source="journal j LEFT JOIN utilisateurs u ON j.utilisateur_id = u.id",
+            champs="j.*, u.nom as utilisateur_nom",
+            cle=("j.date", "j.id"),
+            descendant=True,
+            condition="j.date BETWEEN ? AND ?" if periode else None,
+            params=(date_debut, date_fin) if periode else (),
+            formater=formater,
+            totaux=[("TOTAL OPERATIONS", "COUNT(*)", lambda j: 1, str)],
+            tables=('journal', 'utilisateurs')
+        )
+
+    # --- Écriture des rapports en flux ---
+
+    @staticmethod
+    def _ecrire_rapport(f, rapport):
+        """
+        Écrire un rapport ligne par ligne dans un objet fichier
+
+        Les lignes sont lues par lots et les totaux cumulés au fil de
+        l'écriture : la mémoire utilisée ne dépend pas de la taille du rapport.
+
+        Args:
+            f: Fichier ou tout objet disposant d'une méthode write
+            rapport (DefinitionRapport): Rapport à écrire
+        """
+        ExportManager._ecrire_entete(f, rapport.titre)
+        f.write(EXPORT_SEPARATOR.join(rapport.colonnes) + "\n")
+        f.write("-" * 80 + "\n")
+        cumuls = [0] * len(rapport.totaux)
+        for ligne in rapport.lignes():
+            f.write(EXPORT_SEPARATOR.join(rapport.formater(ligne)) + "\n")
+            for i, (_, _, valeur, _) in enumerate(rapport.totaux):
+                cumuls[i] += valeur(ligne)
+        f.write("\n" + "=" * 80 + "\n")
+        rapport.ecrire_totaux(f, cumuls)
+
+    # --- Aperçu paginé ---
+
+    @staticmethod
+    def calculer_totaux(rapport):
+        """
+        Calculer par SQL le nombre de lignes et les totaux d'un rapport
+
+        Le résultat est mis en cache jusqu'à la prochaine écriture dans
+        les tables du rapport : rouvrir un aperçu sans modification entre-temps
+        ne relit pas la base.
+
+        Args:
+            rapport (DefinitionRapport): Rapport à résumer
+
+        Returns:
+            tuple: (nombre de lignes, liste des valeurs des totaux)
+        """
+        cle = (rapport.requete_totaux(), rapport.params)
+        return db.cache.obtenir(cle, rapport.tables, rapport.lire_totaux)
+
+    @staticmethod
+    def generer_page(rapport, apres, taille_page):
+        """
+        Générer le texte d'une seule page de lignes d'un rapport
+
+        Pagination par clé : la page commence après la ligne de clé apres,
+        sans parcourir les pages précédentes. Les pages déjà affichées sont
+        reprises du cache tant que les tables du rapport n'ont pas été modifiées.
+
+        Args:
+            rapport (DefinitionRapport): Rapport à afficher
+            apres (tuple): Clé de la dernière ligne de la page précédente
+                (retournée pour celle-ci) ; None pour la première page
+            taille_page (int): Nombre de lignes par page
+
+        Returns:
+            tuple: (lignes de la page, une par ligne de texte ; clé de sa
+                dernière ligne, None si la page est vide)
+        """
+        cle = (rapport.requete_page(apres is not None), (*rapport.params, *(apres or ()), taille_page))
+
+        def generer():
+            lignes = rapport.lire_page(apres, taille_page)
+            texte = "".join(EXPORT_SEPARATOR.join(rapport.formater(ligne)) + "\n" for ligne in lignes)
+            return texte, rapport.cle_ligne(lignes[-1]) if lignes else None
+        return db.cache.obtenir(cle, rapport.tables, generer)
+
+    @staticmethod
+    def ecrire_inventaire(f):
+        ExportManager._ecrire_rapport(f, ExportManager.rapport_inventaire())
+
+    @staticmethod
+    def ecrire_ventes_journalieres(f, date=None):
+        ExportManager._ecrire_rapport(f, ExportManager.rapport_ventes_journalieres(date))
+
+    @staticmethod
+    def ecrire_produits_rupture(f, seuil):
+        ExportManager._ecrire_rapport(f, ExportManager.rapport_produits_rupture(seuil))
+
+    @staticmethod
+    def ecrire_journal(f, date_debut=None, date_fin=None):
+        ExportManager._ecrire_rapport(f, ExportManager.rapport_journal(date_debut, date_fin))
+
+    # --- Fonctions de génération de contenu ---
+
+    @staticmethod
+    def generer_contenu_inventaire():
+        output = io.StringIO()
+        ExportManager.ecrire_inventaire(output)
+        return output.getvalue()
+
+    @staticmethod
+    def generer_contenu_ventes_journalieres(date=None):
+        output = io.StringIO()
+        ExportManager.ecrire_ventes_journalieres(output, date)
         return output.getvalue()
 
     @staticmethod
     def generer_contenu_produits_rupture(seuil):
-        produits = Produit.obtenir_stock_faible(seuil)
         output = io.StringIO()
-        ExportManager._ecrire_entete(output, f"PRODUITS EN RUPTURE (Seuil: {seuil})")
-        colonnes = ["CODE", "NOM", "QTE_ACTUELLE", "CATEGORIE"]
-        output.write(EXPORT_SEPARATOR.join(colonnes) + "\n")
-        output.write("-" * 80 + "\n")
-        for produit in produits:
-            ligne = [produit['code'], produit['nom'], str(produit['quantite']), produit['categorie_nom'] if produit['categorie_nom'] else "N/A"]
-            output.write(EXPORT_SEPARATOR.join(ligne) + "\n")
-        output.write("\n" + "=" * 80 + "\n")
-        output.write(f"TOTAL PRODUITS EN RUPTURE: {len(produits)}\n")
+        ExportManager.ecrire_produits_rupture(output, seuil)
         return output.getvalue()
 
     @staticmethod
     def generer_contenu_journal(date_debut=None, date_fin=None):
-        if date_debut and date_fin:
-            query = "SELECT j.*, u.nom as utilisateur_nom FROM journal j LEFT JOIN utilisateurs u ON j.utilisateur_id = u.id WHERE j.date BETWEEN ? AND ? ORDER BY j.date DESC"
-            journal = db.fetch_all(query, (date_debut, date_fin))
-        else:
-            query = "SELECT j.*, u.nom as utilisateur_nom FROM journal j LEFT JOIN utilisateurs u ON j.utilisateur_id = u.id ORDER BY j.date DESC"
-            journal = db.fetch_all(query)
         output = io.StringIO()
-        ExportManager._ecrire_entete(output, "JOURNAL DES OPERATIONS")
-        colonnes = ["DATE", "HEURE", "ACTION", "UTILISATEUR", "DETAILS"]
-        output.write(EXPORT_SEPARATOR.join(colonnes) + "\n")
-        output.write("-" * 80 + "\n")
-        for entry in journal:
-            dt = datetime.fromisoformat(entry['date'])
-            ligne = [dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S"), entry['action'], entry['utilisateur_nom'] if entry['utilisateur_nom'] else "N/A", entry['details'] if entry['details'] else ""]
-            output.write(EXPORT_SEPARATOR.join(ligne) + "\n")
-        output.write("\n" + "=" * 80 + "\n")
-        output.write(f"TOTAL OPERATIONS: {len(journal)}\n")
+        ExportManager.ecrire_journal(output, date_debut, date_fin)
         return output.getvalue()
 
     # --- Fonctions d'export de fichier ---
 
     @staticmethod
     def exporter_inventaire():
-        contenu = ExportManager.generer_contenu_inventaire()
         nom_fichier = ExportManager._generer_nom_fichier("INVENTAIRE")
         chemin_fichier = os.path.join(EXPORT_DIR, nom_fichier)
         with open(chemin_fichier, 'w', encoding=EXPORT_ENCODING) as f:
-            f.write(contenu)
+            ExportManager.ecrire_inventaire(f)
         return chemin_fichier
 
     @staticmethod
     def exporter_ventes_journalieres(date=None):
-        contenu = ExportManager.generer_contenu_ventes_journalieres(date)
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         nom_fichier = f"VENTES_{date.replace('-', '')}.txt"
         chemin_fichier = os.path.join(EXPORT_DIR, nom_fichier)
         with open(chemin_fichier, 'w', encoding=EXPORT_ENCODING) as f:
-            f.write(contenu)
+            ExportManager.ecrire_ventes_journalieres(f, date)
         return chemin_fichier
 
     @staticmethod
     def exporter_produits_rupture(seuil):
-        contenu = ExportManager.generer_contenu_produits_rupture(seuil)
         nom_fichier = ExportManager._generer_nom_fichier("RUPTURE_STOCK")
         chemin_fichier = os.path.join(EXPORT_DIR, nom_fichier)
         with open(chemin_fichier, 'w', encoding=EXPORT_ENCODING) as f:
-            f.write(contenu)
+            ExportManager.ecrire_produits_rupture(f, seuil)
         return chemin_fichier
 
     @staticmethod
     def exporter_journal(date_debut=None, date_fin=None):
-        contenu = ExportManager.generer_contenu_journal(date_debut, date_fin)
         nom_fichier = ExportManager._generer_nom_fichier("JOURNAL")
         chemin_fichier = os.path.join(EXPORT_DIR, nom_fichier)
         with open(chemin_fichier, 'w', encoding=EXPORT_ENCODING) as f:
-            f.write(contenu)
+            ExportManager.ecrire_journal(f, date_debut, date_fin)
         return chemin_fichier
 
     @staticmethod
@@ -171,9 +423,9 @@ class ExportManager:
             f.write(f"Produit: {vente['produit_nom']}\n")
             f.write(f"Code: {vente['produit_code']}\n")
             f.write(f"Quantité: {vente['quantite']}\n")
-            f.write(f"Prix unitaire: {vente['prix_unitaire']:.2f}\n")
+            f.write(f"Prix unitaire: {formater_montant(vente['prix_unitaire'])}\n")
             f.write("-" * 50 + "\n\n")
-            f.write(f"TOTAL: {vente['montant_total']:.2f}\n\n")
+            f.write(f"TOTAL: {formater_montant(vente['montant_total'])}\n\n")
             f.write("=" * 50 + "\n")
             f.write("Merci de votre visite!\n")
             f.write("=" * 50 + "\n")
@@ -205,12 +457,12 @@ class ExportManager:
             total_general = 0
             for vente in ventes:
                 f.write(f"\n{vente['produit_nom']} ({vente['produit_code']})\n")
-                f.write(f"  Quantité: {vente['quantite']} x {vente['prix_unitaire']:.2f}\n")
-                f.write(f"  Sous-total: {vente['montant_total']:.2f}\n")
+                f.write(f"  Quantité: {vente['quantite']} x {formater_montant(vente['prix_unitaire'])}\n")
+                f.write(f"  Sous-total: {formater_montant(vente['montant_total'])}\n")
                 total_general += vente['montant_total']
             f.write("\n" + "-" * 50 + "\n")
             f.write(f"\nNOMBRE D'ARTICLES: {len(ventes)}\n")
-            f.write(f"TOTAL A PAYER: {total_general:.2f}\n\n")
+            f.write(f"TOTAL A PAYER: {formater_montant(total_general)}\n\n")
             f.write("=" * 50 + "\n")
             f.write("Merci de votre visite!\n")
             f.write("=" * 50 + "\n")
@@ -0,0 +1,50 @@
+"""
+Montants monétaires : stockés et calculés en centimes (entiers)
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+def vers_centimes(valeur):
+    """
+    Convertir un montant exprimé en unités en centimes
+
+    Les chaînes saisies sont converties sans passer par un float
+    ("19.99" donne exactement 1999) ; la virgule est acceptée comme
+    séparateur décimal. Arrondi au centime le plus proche.
+
+    Args:
+        valeur (str, int, float, Decimal): Montant en unités ("12.50", 12.5)
+
+    Returns:
+        int: Montant en centimes (0 pour une saisie vide)
+
+    Raises:
+        ValueError: Si le montant n'est pas un nombre
+    """
+    if isinstance(valeur, str):
+        valeur = valeur.strip().replace(',', '.') or '0'
+    elif isinstance(valeur, float):
+        valeur = repr(valeur)  # 0.1 + 0.2 -> '0.30000000000000004', pas l'écriture binaire exacte
+    try:
+        montant = Decimal(valeur)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Montant invalide: {valeur}") from None
+    if not montant.is_finite():
+        raise ValueError(f"Montant invalide: {valeur}")
+    return int((montant * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def formater_montant(centimes):
+    """
+    Mettre en forme un montant en centimes avec deux décimales
+
+    Args:
+        centimes (int): Montant en centimes (None est traité comme 0)
+
+    Returns:
+        str: Montant en unités, par exemple "1234.05" ou "-0.50"
+    """
+    centimes = int(centimes or 0)
+    unites, reste = divmod(abs(centimes), 100)
+    signe = '-' if centimes < 0 else ''
+    return f"{signe}{unites}.{reste:02d}"
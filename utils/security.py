@@ -1,21 +1,25 @@
 """
 Fonctions de sécurité pour l'application AGIB
 """
+import threading
+import time
 import bcrypt
+from config import BCRYPT_ROUNDS, CONNEXION_ECHECS_TOLERES, CONNEXION_ATTENTE_INITIALE, CONNEXION_ATTENTE_MAX
 
 
-def hash_password(password):
+def hash_password(password, rounds=BCRYPT_ROUNDS):
     """
     Hacher un mot de passe avec bcrypt
 
     Args:
         password (str): Mot de passe en clair
+        rounds (int): Facteur de coût bcrypt (BCRYPT_ROUNDS par défaut)
 
     Returns:
         str: Mot de passe haché
     """
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -34,3 +38,103 @@ def verify_password(password, hashed_password):
     password_bytes = password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def doit_rehacher(hashed_password):
+    """
+    Indiquer si un hash a été calculé avec un autre coût que BCRYPT_ROUNDS
+
+    Args:
+        hashed_password (str): Mot de passe haché ($2b$12$...)
+
+    Returns:
+        bool: True si le mot de passe doit être re-haché
+    """
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+# Hash bcrypt bien formé au coût courant, sans mot de passe correspondant
+# connu : le vérifier coûte autant qu'un vrai hash, sans le calculer au démarrage
+_HASH_FACTICE = f"$2b${BCRYPT_ROUNDS:02d}$" + "agibutilisateurinconnu" + "u" * 31
+
+
+def verifier_factice(password):
+    """
+    Vérifier un mot de passe contre un hash factice, au même coût
+
+    Appelé pour un utilisateur inconnu : la réponse prend le même temps
+    qu'un mauvais mot de passe et ne révèle pas si le nom existe.
+
+    Args:
+        password (str): Mot de passe saisi
+
+    Returns:
+        bool: Toujours False
+    """
+    verify_password(password, _HASH_FACTICE)
+    return False
+
+
+class LimiteurConnexions:
+    """Échecs de connexion récents par nom d'utilisateur (en mémoire)
+
+    Après CONNEXION_ECHECS_TOLERES échecs consécutifs, chaque nouvel
+    échec impose une attente qui double (CONNEXION_ATTENTE_INITIALE,
+    plafonnée à CONNEXION_ATTENTE_MAX) avant la tentative suivante pour
+    ce nom ; une connexion réussie remet le compteur à zéro. Les noms
+    inconnus sont comptés comme les autres.
+    """
+
+    def __init__(self):
+        self._echecs = {}  # nom -> (nombre d'échecs, instant où une tentative redevient possible)
+        self._verrou = threading.Lock()
+
+    def attente_restante(self, nom):
+        """
+        Secondes à attendre avant de pouvoir tenter une connexion
+
+        Args:
+            nom (str): Nom d'utilisateur
+
+        Returns:
+            float: 0 si une tentative est possible
+        """
+        with self._verrou:
+            debloque = self._echecs.get(nom, (0, 0.0))[1]
+        return max(0.0, debloque - time.monotonic())
+
+    def echec(self, nom):
+        """
+        Enregistrer un échec de connexion
+
+        Args:
+            nom (str): Nom d'utilisateur
+
+        Returns:
+            float: Attente imposée avant la tentative suivante (secondes)
+        """
+        maintenant = time.monotonic()
+        with self._verrou:
+            nb = self._echecs.get(nom, (0, 0.0))[0] + 1
+            attente = 0.0
+            if nb >= CONNEXION_ECHECS_TOLERES:
+                attente = min(CONNEXION_ATTENTE_MAX,
+                              CONNEXION_ATTENTE_INITIALE * 2 ** min(nb - CONNEXION_ECHECS_TOLERES, 20))
+            self._echecs[nom] = (nb, maintenant + attente)
+            if len(self._echecs) > 1000:
+                # Oublier les noms dont l'attente est terminée depuis longtemps
+                limite = maintenant - CONNEXION_ATTENTE_MAX
+                self._echecs = {n: e for n, e in self._echecs.items() if e[1] > limite}
+        return attente
+
+    def reussite(self, nom):
+        """Remettre à zéro les échecs d'un utilisateur connecté"""
+        with self._verrou:
+            self._echecs.pop(nom, None)
+
+
+# Instance globale partagée par l'authentification
+limiteur_connexions = LimiteurConnexions()